@@ -88,7 +88,7 @@ from app.navigation import (
     OrgNavigation,
     SecondaryNavigation,
 )
-from app.notify_client import InviteTokenError
+from app.notify_client import InviteTokenError, cache, log_coalesced_api_calls
 from app.notify_client.api_key_api_client import api_key_api_client
 from app.notify_client.billing_api_client import billing_api_client
 from app.notify_client.complaint_api_client import complaint_api_client
@@ -110,15 +110,19 @@ from app.notify_client.template_statistics_api_client import template_statistics
 from app.notify_client.upload_api_client import upload_api_client
 from app.notify_client.user_api_client import user_api_client
 from app.url_converters import SimpleDateTypeConverter, TemplateTypeConverter
-from app.utils.api_health import is_api_down
+from app.utils.api_health import api_health_monitor
 from app.utils.nunjucks_jinja.flask_ext import init_nunjucks_environment
+from app.utils.process_pool import process_pool
+from app.utils.spool import upload_spool
 from notifications_python_client.errors import HTTPError
 from notifications_utils import logging, request_helper
 from notifications_utils.formatters import (
     formatted_list,
     get_lines_with_normalised_whitespace,
 )
+from notifications_utils.json_codec import CodecJSONProvider
 from notifications_utils.recipients import format_phone_number_human_readable
+from notifications_utils.s3 import s3_resources
 from notifications_utils.url_safe_token import generate_token
 
 login_manager = LoginManager()
@@ -143,6 +147,17 @@ navigation = {
 def _csp(config):
     asset_domain = config["ASSET_DOMAIN"]
     api_public_url = config["API_PUBLIC_URL"]
+    # browsers upload spreadsheets straight to the CSV bucket, through the
+    # same FIPS endpoint the app uses
+    direct_upload_origins = (
+        [
+            "https://{bucket}.s3-fips.{region}.amazonaws.com".format(
+                **config["CSV_UPLOAD_BUCKET"]
+            )
+        ]
+        if config["CSV_DIRECT_UPLOADS"]
+        else []
+    )
 
     return {
         "default-src": ["'self'", asset_domain],
@@ -169,6 +184,7 @@ def _csp(config):
                     "https://gov-bam.nr-data.net",
                     "https://www.google-analytics.com",
                     f"{api_public_url}",
+                    *direct_upload_origins,
                 ]
             )
         ),
@@ -185,7 +201,7 @@ def create_app(application):
 
     @application.context_processor
     def inject_is_api_down():
-        return {"is_api_down": is_api_down()}
+        return {"is_api_down": api_health_monitor.is_api_down()}
 
     # @application.context_processor
     # def inject_feature_flags():
@@ -221,6 +237,7 @@ def create_app(application):
     notify_environment = os.environ["NOTIFY_ENVIRONMENT"]
 
     application.config.from_object(configs[notify_environment])
+    application.json = CodecJSONProvider(application)
     asset_fingerprinter._asset_root = application.config["ASSET_PATH"]
 
     init_app(application)
@@ -257,6 +274,11 @@ def create_app(application):
         user_api_client,
         # External API clients
         redis_client,
+        cache,
+        api_health_monitor,
+        process_pool,
+        upload_spool,
+        s3_resources,
     ):
         client.init_app(application)
 
@@ -329,6 +351,7 @@ def init_app(application):
     application.before_request(request_helper.check_proxy_header_before_request)
     application.before_request(make_session_permanent)
     application.after_request(save_service_or_org_after_request)
+    application.after_request(log_coalesced_api_calls)
 
     start = len(asset_fingerprinter._filesystem_path)
     font_paths = [
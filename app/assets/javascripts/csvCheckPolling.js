@@ -0,0 +1,46 @@
+(function(window) {
+  "use strict";
+
+  const POLL_INTERVAL_MS = 2000;
+
+  window.NotifyModules['csv-check-polling'] = function() {
+
+    this.start = component => {
+      this.component = component;
+      this.statusUrl = component.dataset.statusUrl;
+      this.checkUrl = component.dataset.checkUrl;
+      this.poll();
+    };
+
+    this.poll = () => {
+      fetch(this.statusUrl, { headers: { 'Cache-Control': 'no-cache' } })
+        .then(response => {
+          if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+          }
+          return response.json();
+        })
+        .then(data => {
+          if (data.finished) {
+            window.location.assign(this.checkUrl);
+            return;
+          }
+          this.updateRowsChecked(data);
+          setTimeout(this.poll, POLL_INTERVAL_MS);
+        })
+        .catch(error => {
+          console.debug('CSV check polling failed, trying again', error.message);
+          setTimeout(this.poll, POLL_INTERVAL_MS * 2);
+        });
+    };
+
+    this.updateRowsChecked = data => {
+      const rowsChecked = this.component.querySelector('.csv-check-rows-checked');
+      if (rowsChecked && data.rows_checked !== null) {
+        rowsChecked.textContent = data.rows_checked.toLocaleString();
+      }
+    };
+
+  };
+
+})(window);
@@ -28,7 +28,65 @@ function initUploadStatusAnnouncer() {
   "use strict";
 
   window.NotifyModules['file-upload'] = function() {
-    this.submit = () => this.form.submit();
+    this.submit = () => {
+      const file = this.fileInput()?.files?.[0];
+      if (!this.form.dataset.directUploadUrl || !file) {
+        this.form.submit();
+        return;
+      }
+      this.uploadToS3(file).catch(error => {
+        console.debug('Direct upload failed, sending the file through Notify instead', error.message);
+        this.form.submit();
+      });
+    };
+
+    this.fileInput = () => this.form.querySelector('.file-upload-field');
+
+    // Uploads the file straight to S3, with a pre-signed POST, then tells
+    // Notify where it is, so the file isn't sent through Notify as well
+    this.uploadToS3 = file => fetch(this.form.dataset.directUploadUrl, { headers: { 'Cache-Control': 'no-cache' } })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        return response.json();
+      })
+      .then(upload => {
+        const body = new FormData();
+        Object.entries(upload.fields).forEach(([name, value]) => body.append(name, value));
+        // S3 ignores any fields after the file
+        body.append('file', file);
+        return fetch(upload.url, { method: 'POST', body }).then(response => {
+          if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+          }
+          this.submitFileName(upload.complete_url, file.name);
+        });
+      });
+
+    this.submitFileName = (completeUrl, fileName) => {
+      const fileNameInput = document.createElement('input');
+      fileNameInput.type = 'hidden';
+      fileNameInput.name = 'file_name';
+      fileNameInput.value = fileName;
+      fileNameInput.className = 'file-upload-file-name';
+      this.form.appendChild(fileNameInput);
+      // a disabled input isn't submitted, so the file isn't sent again
+      this.fileInput().disabled = true;
+      this.form.action = completeUrl;
+      this.form.submit();
+    };
+
+    this.resetDirectUpload = () => {
+      this.form.querySelectorAll('.file-upload-file-name').forEach(input => input.remove());
+      const fileInput = this.fileInput();
+      if (fileInput) fileInput.disabled = false;
+      if (this.formAction === null) {
+        this.form.removeAttribute('action');
+      } else {
+        this.form.setAttribute('action', this.formAction);
+      }
+    };
 
     this.showCancelButton = () => {
       const uploadButton = this.form.querySelector('.file-upload-button');
@@ -43,6 +101,7 @@ function initUploadStatusAnnouncer() {
 
     this.start = function(component) {
       this.form = component;
+      this.formAction = this.form.getAttribute('action');
 
       this.form.addEventListener('click', (event) => {
         const trigger = event.target.closest('[data-module="upload-trigger"]');
@@ -53,7 +112,10 @@ function initUploadStatusAnnouncer() {
         }
       });
 
-      window.addEventListener("pageshow", () => this.form.reset());
+      window.addEventListener("pageshow", () => {
+        this.form.reset();
+        if (this.form.dataset.directUploadUrl) this.resetDirectUpload();
+      });
 
       this.form.addEventListener('change', (event) => {
         if (event.target.closest('.file-upload-field')) {
@@ -72,6 +72,7 @@ import './errorTracking.js';
 import './templateFolderForm.js';
 import './collapsibleCheckboxes.js';
 import './updateStatus.js';
+import './csvCheckPolling.js';
 import './main.js';
 import './listEntry.js';
 import './totalMessagesChart.js';
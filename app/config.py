@@ -13,6 +13,8 @@ class Config(object):
     NOTIFY_ENVIRONMENT = getenv("NOTIFY_ENVIRONMENT", "development")
     API_HOST_NAME = getenv("API_HOST_NAME", "localhost")
     API_PUBLIC_URL = getenv("API_PUBLIC_URL", "localhost")
+    API_HEALTH_CHECK_ENABLED = True
+    API_HEALTH_CHECK_INTERVAL = int(getenv("API_HEALTH_CHECK_INTERVAL", "15"))
 
     ADMIN_BASE_URL = getenv("ADMIN_BASE_URL", "http://localhost:6012")
     HEADER_COLOUR = "#81878b"  # mix of dark-grey and mid-grey
@@ -28,6 +30,10 @@ class Config(object):
     # ZENDESK_API_KEY = getenv('ZENDESK_API_KEY')
     ROUTE_SECRET_KEY_1 = getenv("ROUTE_SECRET_KEY_1", "dev-route-secret-key-1")
     ROUTE_SECRET_KEY_2 = getenv("ROUTE_SECRET_KEY_2", "dev-route-secret-key-2")
+    # fraction of the API's 30 second token window for which a signed JWT is reused
+    API_TOKEN_REUSE_FRACTION = float(getenv("API_TOKEN_REUSE_FRACTION", "0.5"))
+    # most API calls a single page makes to the API at the same time
+    API_GATHER_POOL_SIZE = int(getenv("API_GATHER_POOL_SIZE", "6"))
 
     NR_ACCOUNT_ID = getenv("NR_ACCOUNT_ID")
     NR_TRUST_KEY = getenv("NR_TRUST_KEY")
@@ -74,6 +80,65 @@ class Config(object):
 
     REDIS_URL = cloud_config.redis_url
     REDIS_ENABLED = getenv("REDIS_ENABLED", "1") == "1"
+    # per-process cache in front of redis; entries are at most REDIS_LOCAL_CACHE_TTL seconds stale
+    REDIS_LOCAL_CACHE_ENABLED = getenv("REDIS_LOCAL_CACHE_ENABLED", "0") == "1"
+    REDIS_LOCAL_CACHE_MAX_SIZE = int(getenv("REDIS_LOCAL_CACHE_MAX_SIZE", "1000"))
+    REDIS_LOCAL_CACHE_TTL = int(getenv("REDIS_LOCAL_CACHE_TTL", "5"))
+    # also delete a namespace's keys by SCAN, for keys stored before namespaces
+    # were tracked. Only needs turning on for the first 7 days after the first
+    # deploy that tracks them, until those keys have expired.
+    REDIS_NAMESPACE_SCAN_FALLBACK = getenv("REDIS_NAMESPACE_SCAN_FALLBACK", "0") == "1"
+    # lets popular cached values set with stale_ttl_in_seconds be refreshed by one
+    # worker while the rest use the old value. Old workers can't read these
+    # values, so only turn it on once a release that reads them is fully deployed.
+    REDIS_STAMPEDE_PROTECTION_ENABLED = (
+        getenv("REDIS_STAMPEDE_PROTECTION_ENABLED", "0") == "1"
+    )
+    # cached values bigger than this many bytes are stored compressed, or none
+    # are if it's 0. Workers from before compression can't read these values, so
+    # only set it (2048 is a good start) once a release that reads them is fully
+    # deployed. The Key Families section of the platform admin redis report
+    # shows how many bytes each family of keys takes up, across all workers.
+    REDIS_COMPRESSION_THRESHOLD = int(getenv("REDIS_COMPRESSION_THRESHOLD", "0"))
+
+    # check and convert uploaded spreadsheets in a pool of processes, rather than
+    # in the request where they stop the worker from serving anyone else
+    PROCESS_POOL_ENABLED = getenv("PROCESS_POOL_ENABLED", "0") == "1"
+    # for each gunicorn worker, and each one takes about as much memory as a
+    # worker, so check the instance has room for them before turning the pool on
+    PROCESS_POOL_MAX_WORKERS = int(getenv("PROCESS_POOL_MAX_WORKERS", "2"))
+    # less than gunicorn's timeout, so the request can fail cleanly
+    PROCESS_POOL_TIMEOUT = int(getenv("PROCESS_POOL_TIMEOUT", "180"))
+    PROCESS_POOL_MAX_RESULT_SIZE = int(
+        getenv("PROCESS_POOL_MAX_RESULT_SIZE", str(64 * 1024 * 1024))
+    )
+
+    # uploads bigger than this many bytes are written to a temporary file and
+    # read from disk, so a worker's memory doesn't grow with the size of the file
+    CSV_SPOOL_THRESHOLD = int(getenv("CSV_SPOOL_THRESHOLD", str(2 * 1024 * 1024)))
+    # the system's temporary directory if not set
+    CSV_SPOOL_DIRECTORY = getenv("CSV_SPOOL_DIRECTORY")
+    # spooled files left behind by a worker which died are deleted after this many seconds
+    CSV_SPOOL_MAX_AGE = int(getenv("CSV_SPOOL_MAX_AGE", "3600"))
+
+    # connections each reused S3 client keeps open, enough for the requests a
+    # worker's greenlets make at once
+    S3_MAX_POOL_CONNECTIONS = int(getenv("S3_MAX_POOL_CONNECTIONS", "10"))
+
+    # send users to S3 to download the 1, 3, 5 and 7 day reports, through a
+    # pre-signed link which expires after this many seconds, rather than
+    # streaming them through a worker
+    REPORT_DOWNLOAD_PRESIGNED_URLS = (
+        getenv("REPORT_DOWNLOAD_PRESIGNED_URLS", "0") == "1"
+    )
+    REPORT_DOWNLOAD_URL_EXPIRY = int(getenv("REPORT_DOWNLOAD_URL_EXPIRY", "300"))
+
+    # let browsers upload spreadsheets straight to the CSV bucket, through a
+    # pre-signed POST which expires after this many seconds, so the file isn't
+    # sent through a worker before it's converted. The bucket needs a CORS
+    # rule allowing POSTs from the admin app.
+    CSV_DIRECT_UPLOADS = getenv("CSV_DIRECT_UPLOADS", "0") == "1"
+    CSV_DIRECT_UPLOAD_EXPIRY = int(getenv("CSV_DIRECT_UPLOAD_EXPIRY", "300"))
 
     # TODO: reassign this
     NOTIFY_SERVICE_ID = "d6aa2c68-a2d9-4437-ab19-3ae8eb202553"
@@ -139,6 +204,7 @@ class Test(Development):
     ASSET_PATH = "https://static.example.com/"
     API_HOST_NAME = "http://you-forgot-to-mock-an-api-call-to"
     API_PUBLIC_URL = "http://you-forgot-to-mock-an-api-call-to"
+    API_HEALTH_CHECK_ENABLED = False
     REDIS_URL = "redis://you-forgot-to-mock-a-redis-call-to"
     LOGO_CDN_DOMAIN = "static-logos.test.com"
 
@@ -1214,6 +1214,9 @@ class ChangePasswordForm(StripWhitespaceForm):
             raise ValidationError("Invalid password")
 
 
+CSV_UPLOAD_MAX_SIZE = 10_000_000  # 10Mb
+
+
 class CsvUploadForm(StripWhitespaceForm):
     file = FileField(
         "Add recipients",
@@ -1221,10 +1224,21 @@ class CsvUploadForm(StripWhitespaceForm):
             DataRequired(message="Please pick a file"),
             CsvFileValidator(),
             FileSize(
-                max_size=10e6,
+                max_size=CSV_UPLOAD_MAX_SIZE,
                 message="File must be smaller than 10Mb.  If you are trying to upload an Excel file, \
                 please export the contents in the CSV format and then try again.",
-            ),  # 10Mb
+            ),
+        ],
+    )
+
+
+class DirectCsvUploadForm(StripWhitespaceForm):
+    # the browser has already uploaded the file to S3, so only its name is sent
+    file_name = HiddenField(
+        "Add recipients",
+        validators=[
+            DataRequired(message="Please pick a file"),
+            CsvFileValidator(),
         ],
     )
 
@@ -28,11 +28,11 @@ class CsvFileValidator:
         self.message = message
 
     def __call__(self, form, field):
-        if not Spreadsheet.can_handle(field.data.filename):
+        # either an uploaded file or, for a direct upload, just its name
+        filename = getattr(field.data, "filename", field.data)
+        if not Spreadsheet.can_handle(filename):
             raise ValidationError(
-                "{} is not a spreadsheet that Notify can read".format(
-                    field.data.filename
-                )
+                "{} is not a spreadsheet that Notify can read".format(filename)
             )
 
 
@@ -17,6 +17,7 @@ from app import (
 from app.enums import JobStatus, NotificationStatus, ServicePermission
 from app.main import main
 from app.main.views.user_profile import set_timezone
+from app.notify_client import NotifyAdminAPIClient
 from app.statistics_utils import get_formatted_percentage
 from app.utils import DELIVERED_STATUSES, FAILURE_STATUSES, REQUESTED_STATUSES
 from app.utils.time import get_current_financial_year
@@ -40,7 +41,16 @@ def service_dashboard(service_id):
     if not current_user.has_permissions(ServicePermission.VIEW_ACTIVITY):
         return redirect(url_for("main.choose_template", service_id=service_id))
 
-    job_response = job_api_client.get_jobs(service_id)["data"]
+    jobs, total_messages, all_statistics = NotifyAdminAPIClient.gather(
+        partial(job_api_client.get_jobs, service_id),
+        partial(service_api_client.get_service_message_ratio, service_id),
+        partial(
+            template_statistics_client.get_template_statistics_for_service,
+            service_id,
+            limit_days=8,
+        ),
+    )
+    job_response = jobs["data"]
     service_data_retention_days = 8
 
     active_jobs = [
@@ -51,12 +61,8 @@ def service_dashboard(service_id):
         for job_dict in active_jobs
     ]
 
-    total_messages = service_api_client.get_service_message_ratio(service_id)
     messages_remaining = total_messages.get("messages_remaining", 0)
     messages_sent = total_messages.get("messages_sent", 0)
-    all_statistics = template_statistics_client.get_template_statistics_for_service(
-        service_id, limit_days=8
-    )
     template_statistics = aggregate_template_usage(all_statistics)
     return render_template(
         "views/dashboard/dashboard.html",
@@ -242,17 +248,20 @@ def template_usage(service_id):
 def usage(service_id):
     year, current_financial_year = requested_and_current_financial_year(request)
 
-    free_sms_allowance = billing_api_client.get_free_sms_fragment_limit_for_year(
-        service_id
+    free_sms_allowance, units, yearly_usage, monthly_stats = (
+        NotifyAdminAPIClient.gather(
+            partial(
+                billing_api_client.get_free_sms_fragment_limit_for_year, service_id
+            ),
+            partial(billing_api_client.get_monthly_usage_for_service, service_id, year),
+            partial(billing_api_client.get_annual_usage_for_service, service_id, year),
+            partial(
+                service_api_client.get_monthly_notification_stats, service_id, year
+            ),
+        )
     )
 
-    units = billing_api_client.get_monthly_usage_for_service(service_id, year)
-
-    yearly_usage = billing_api_client.get_annual_usage_for_service(service_id, year)
-
-    more_stats = format_monthly_stats_to_list(
-        service_api_client.get_monthly_notification_stats(service_id, year)["data"]
-    )
+    more_stats = format_monthly_stats_to_list(monthly_stats["data"])
     return render_template(
         "views/usage.html",
         months=list(get_monthly_usage_breakdown(year, units, more_stats)),
@@ -28,7 +28,7 @@ from app.utils import (
     set_status_filters,
 )
 from app.utils.csv import generate_notifications_csv, get_user_preferred_timezone
-from app.utils.s3_csv import convert_s3_csv_timestamps
+from app.utils.s3_csv import convert_s3_csv_timestamps, get_converted_report_url
 from app.utils.templates import get_template
 from app.utils.user import user_has_permissions
 from notifications_utils.s3 import S3ObjectNotFound
@@ -170,6 +170,17 @@ def download_notifications_csv(service_id):
             current_app.logger.info(
                 f"User is attempting to download {s3_report_id} for service {service_id}"
             )
+            filename = "{} - {} - {} report.csv".format(
+                file_time,
+                filter_args["message_type"][0],
+                current_service.name,
+            )
+            if current_app.config["REPORT_DOWNLOAD_PRESIGNED_URLS"]:
+                return redirect(
+                    get_converted_report_url(
+                        service_id, s3_report_id, user_tz_name, filename
+                    )
+                )
             s3_file_content = s3download(service_id, s3_report_id)
             return Response(
                 stream_with_context(
@@ -178,13 +189,7 @@ def download_notifications_csv(service_id):
                     )
                 ),
                 mimetype="text/csv",
-                headers={
-                    "Content-Disposition": 'inline; filename="{} - {} - {} report.csv"'.format(
-                        file_time,
-                        filter_args["message_type"][0],
-                        current_service.name,
-                    )
-                },
+                headers={"Content-Disposition": f'inline; filename="{filename}"'},
             )
         except S3ObjectNotFound:
             current_app.logger.warning(
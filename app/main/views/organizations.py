@@ -46,7 +46,7 @@ from app.main.views.dashboard import (
 from app.models.organization import AllOrganizations, Organization
 from app.models.service import Service
 from app.models.user import InvitedOrgUser, User
-from app.notify_client import cache
+from app.notify_client import NotifyAdminAPIClient, cache
 from app.utils.csv import Spreadsheet
 from app.utils.user import user_has_permissions, user_is_platform_admin
 from notifications_python_client.errors import HTTPError
@@ -165,7 +165,7 @@ def _handle_edit_service(org_id, service_id):
             current_status = "trial" if service.trial_mode else "live"
             if new_status != current_status:
                 service.update_status(live=(new_status == "live"))
-                cache.redis_client.delete("organizations")
+                cache.invalidate("organizations")
 
             flash("Service updated successfully", "default_with_tick")
             session["updated_service_id"] = str(service_id)
@@ -208,7 +208,7 @@ def _handle_delete_service(org_id, service_id):
     service_api_client.archive_service(service_id, cached_service_user_ids)
     create_archive_service_event(service_id=service_id, archived_by_id=current_user.id)
 
-    cache.redis_client.delete("organizations")
+    cache.invalidate("organizations")
 
     flash(f"'{service.name}' was deleted", "default_with_tick")
     return redirect(url_for(".organization_dashboard", org_id=org_id))
@@ -286,12 +286,19 @@ def organization_dashboard(org_id):
     elif action == "delete-service" and service_id:
         return _handle_delete_service(org_id, service_id)
 
-    messages_sent = get_organization_messages_sent(org_id)
+    messages_sent, services, current_organization.services = (
+        NotifyAdminAPIClient.gather(
+            partial(get_organization_messages_sent, org_id),
+            partial(get_services_dashboard_data, current_organization, year),
+            # for the counts below
+            partial(organizations_client.get_organization_services, org_id),
+        )
+    )
 
     return render_template(
         "views/organizations/organization/index.html",
         selected_year=year,
-        services=get_services_dashboard_data(current_organization, year),
+        services=services,
         live_services=len(current_organization.live_services),
         trial_services=len(current_organization.trial_services),
         suspended_services=len(current_organization.suspended_services),
@@ -1,8 +1,10 @@
 import csv
 import itertools
 import json
-from collections import OrderedDict
+import re
+from collections import Counter, OrderedDict
 from datetime import datetime
+from functools import partial
 from io import StringIO
 
 from flask import (
@@ -13,6 +15,7 @@ from flask import (
     render_template,
     request,
     session,
+    stream_with_context,
     url_for,
 )
 
@@ -35,6 +38,7 @@ from app.main.forms import (
     RequiredDateFilterForm,
 )
 from app.main.views.send import _send_notification
+from app.notify_client import NotifyAdminAPIClient, cache
 from app.statistics_utils import (
     get_formatted_percentage,
     get_formatted_percentage_two_dp,
@@ -52,6 +56,22 @@ COMPLAINT_THRESHOLD = 0.02
 FAILURE_THRESHOLD = 3
 ZERO_FAILURE_THRESHOLD = 0
 
+REDIS_REPORT_CHUNK_SIZE = 64 * 1024
+REDIS_TTL_LIMITS = [
+    ("Under A Minute", 60),
+    ("Under An Hour", 60 * 60),
+    ("Under A Day", 24 * 60 * 60),
+    ("Under A Week", 7 * 24 * 60 * 60),
+]
+REDIS_TTL_BUCKETS = [name for name, _ in REDIS_TTL_LIMITS] + [
+    "A Week Or More",
+    "No Expiry",
+]
+UUID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+STATIC_KEY_SEGMENT_PATTERN = re.compile(r"[a-z_]{1,15}")
+
 
 @main.route("/platform-admin")
 @user_is_platform_admin
@@ -73,8 +93,10 @@ def platform_admin():
         api_args["start_date"] = form.start_date.data
         api_args["end_date"] = form.end_date.data or datetime.utcnow().date()
 
-    platform_stats = platform_stats_api_client.get_aggregate_platform_stats(api_args)
-    number_of_complaints = complaint_api_client.get_complaint_count(api_args)
+    platform_stats, number_of_complaints = NotifyAdminAPIClient.gather(
+        partial(platform_stats_api_client.get_aggregate_platform_stats, api_args),
+        partial(complaint_api_client.get_complaint_count, api_args),
+    )
 
     return render_template(
         "views/platform-admin/index.html",
@@ -141,46 +163,103 @@ def get_redis_report():
     elif mem_fragmentation < 1.0:
         frag_note = "Allocate more RAM.\nSet max_memory."
 
-    keys = redis_client.keys("*")
-    key_details = []
-
-    for key in keys:
-        key_type = redis_client.type(key).decode("utf-8")
-        ttl = redis_client.ttl(key)
-        ttl_str = "No Expiry" if ttl == -1 else f"{ttl} seconds"
-        key_details.append(
-            {"Key": key.decode("utf-8"), "Type": key_type, "TTL": ttl_str}
-        )
-    output = StringIO()
-    writer = csv.writer(
-        output,
-    )
-    writer.writerow(["Redis Report"])
-    writer.writerow([])
-
-    writer.writerow(["Memory"])
-    writer.writerow(["", "Memory Used", memory_used])
-    writer.writerow(["", "Max Memory", max_memory])
-    writer.writerow(["", "Memory Fragmentation Ratio", mem_fragmentation])
-    writer.writerow(["", "Memory Fragmentation Quality", frag_quality, frag_note])
-    writer.writerow([])
-
-    writer.writerow(["Keys Overview"])
-    writer.writerow(["", "TTL", "Type", "Key"])
-    for key_detail in key_details:
-        writer.writerow(
-            ["", key_detail["TTL"], key_detail["Type"], key_detail["Key"][0:50]]
+    def generate_report():
+        output = StringIO()
+        writer = csv.writer(
+            output,
         )
 
-    csv_data = output.getvalue()
+        def flush():
+            rows = output.getvalue()
+            output.seek(0)
+            output.truncate()
+            return rows
+
+        writer.writerow(["Redis Report"])
+        writer.writerow([])
+
+        writer.writerow(["Memory"])
+        writer.writerow(["", "Memory Used", memory_used])
+        writer.writerow(["", "Max Memory", max_memory])
+        writer.writerow(["", "Memory Fragmentation Ratio", mem_fragmentation])
+        writer.writerow(["", "Memory Fragmentation Quality", frag_quality, frag_note])
+        writer.writerow([])
+
+        writer.writerow(["Keys Overview"])
+        writer.writerow(["", "TTL", "Type", "Key", "Bytes"])
+        yield flush()
+
+        families = {}
+        for key, key_type, ttl, size in redis_client.scan_key_details():
+            key = key.decode("utf-8")
+            ttl_str = "No Expiry" if ttl == -1 else f"{ttl} seconds"
+            writer.writerow(["", ttl_str, key_type.decode("utf-8"), key[0:50], size])
+
+            family = families.setdefault(
+                get_redis_key_family(key),
+                {"keys": 0, "bytes": 0, "ttls": Counter()},
+            )
+            family["keys"] += 1
+            family["bytes"] += size or 0
+            family["ttls"][get_ttl_bucket(ttl)] += 1
+
+            if output.tell() > REDIS_REPORT_CHUNK_SIZE:
+                yield flush()
+        writer.writerow([])
+
+        writer.writerow(["Key Families"])
+        writer.writerow(["", "Key Family", "Keys", "Total Bytes", *REDIS_TTL_BUCKETS])
+        for key_family, family in sorted(
+            families.items(), key=lambda item: item[1]["bytes"], reverse=True
+        ):
+            writer.writerow(
+                [
+                    "",
+                    key_family,
+                    family["keys"],
+                    family["bytes"],
+                    *(family["ttls"][bucket] for bucket in REDIS_TTL_BUCKETS),
+                ]
+            )
+        yield flush()
 
-    # Create a direct download response with the CSV data and appropriate headers
-    response = Response(csv_data, content_type="text/csv; charset=utf-8")
+    # Create a direct download response which streams the CSV data as redis is scanned
+    response = Response(
+        stream_with_context(generate_report()),
+        content_type="text/csv; charset=utf-8",
+    )
     response.headers["Content-Disposition"] = "attachment; filename=redis.csv"
 
     return response
 
 
+def get_ttl_bucket(ttl):
+    if ttl == -1:
+        return "No Expiry"
+    for bucket, limit in REDIS_TTL_LIMITS:
+        if ttl < limit:
+            return bucket
+    return "A Week Or More"
+
+
+def get_redis_key_family(key):
+    """
+    Groups keys which only differ by IDs, numbers or random tokens, for example
+    `service-*-template-*-version-*` or `login-state-*`
+    """
+    key = UUID_PATTERN.sub("*", key)
+    segments = [
+        segment if STATIC_KEY_SEGMENT_PATTERN.fullmatch(segment) else "*"
+        for segment in key.split("-")
+    ]
+    # collapse dates and tokens containing hyphens into a single wildcard
+    return "-".join(
+        segment
+        for index, segment in enumerate(segments)
+        if not (segment == "*" and index and segments[index - 1] == "*")
+    )
+
+
 def is_over_threshold(number, total, threshold):
     percentage = number / total * 100 if total else 0
     return percentage > threshold
@@ -730,9 +809,7 @@ def clear_cache():
         groups = map(CACHE_KEYS.get, group_keys)
         patterns = list(itertools.chain(*groups))
 
-        num_deleted = sum(
-            redis_client.delete_by_pattern(pattern) for pattern in patterns
-        )
+        num_deleted = sum(cache.invalidate_pattern(pattern) for pattern in patterns)
 
         msg = (
             f"Removed {num_deleted} objects "
@@ -1,14 +1,18 @@
 import os
 import time
 import uuid
+from functools import partial
 from string import ascii_uppercase
 from zipfile import BadZipFile
 
 import bleach
+import gevent
 from flask import (
     abort,
     current_app,
     flash,
+    json,
+    jsonify,
     redirect,
     render_template,
     request,
@@ -16,6 +20,7 @@ from flask import (
     url_for,
 )
 from flask_login import current_user
+from gevent import monkey
 from markupsafe import Markup
 from xlrd.biffh import XLRDError
 from xlrd.xldate import XLDateError
@@ -28,17 +33,30 @@ from app import (
     service_api_client,
 )
 from app.enums import ServicePermission
+from app.extensions import redis_client
 from app.main import main
 from app.main.forms import (
+    CSV_UPLOAD_MAX_SIZE,
     ChooseTimeForm,
     CsvUploadForm,
+    DirectCsvUploadForm,
     SetSenderForm,
     get_placeholder_form_instance,
 )
 from app.main.views.user_profile import set_timezone
+from app.models.spreadsheet import (
+    TooManyRowsError,
+    convert_file,
+    convert_spooled_file,
+)
 from app.models.user import Users
+from app.notify_client import cache
 from app.s3_client.s3_csv_client import (
+    delete_direct_upload,
+    download_direct_upload,
     get_csv_metadata,
+    get_csv_upload_rows,
+    get_direct_upload_form,
     s3download,
     s3upload,
     set_metadata_on_csv_upload,
@@ -49,15 +67,33 @@ from app.utils import (
     should_skip_template_page,
     unicode_truncate,
 )
-from app.utils.csv import Spreadsheet, get_errors_for_csv
+from app.utils.csv import (
+    CheckedRecipientCSV,
+    Spreadsheet,
+    get_csv_check_fingerprint,
+    get_csv_check_for_file,
+    report_csv_check_progress,
+)
+from app.utils.process_pool import process_pool
+from app.utils.spool import SpooledFile, upload_spool
 from app.utils.templates import get_template
 from app.utils.user import user_has_permissions
 from notifications_python_client.errors import HTTPError
 from notifications_utils import SMS_CHAR_COUNT_LIMIT
 from notifications_utils.insensitive_dict import InsensitiveDict
 from notifications_utils.recipients import RecipientCSV, first_column_headings
+from notifications_utils.s3 import S3ObjectNotFound
 from notifications_utils.sanitise_text import SanitiseASCII
 
+# long enough to cover someone checking, previewing and sending an upload
+CSV_CHECK_TTL = 4 * 60 * 60
+CSV_CHECK_KEY_FORMAT = "csv-check-{service_id}-{upload_id}-{fingerprint}"
+CSV_CHECK_PROGRESS_KEY_FORMAT = "csv-check-progress-{service_id}-{upload_id}"
+# if the worker checking a file goes away, stop waiting for it after this long
+CSV_CHECK_PROGRESS_TTL = 5 * 60
+# how often the worker waiting for a check says it's still there
+CSV_CHECK_PROGRESS_REFRESH_INTERVAL = 60
+
 
 def get_example_csv_fields(column_headers, use_example_as_example, submitted_fields):
     if use_example_as_example:
@@ -131,38 +167,14 @@ def send_messages(service_id, template_id):
     )
     form = CsvUploadForm()
     if form.validate_on_submit():
-        try:
-            upload_id = s3upload(
-                service_id,
-                Spreadsheet.from_file_form(form).as_dict,
-            )
-            file_name_metadata = unicode_truncate(
-                SanitiseASCII.encode(form.file.data.filename), 1600
-            )
-            set_metadata_on_csv_upload(
-                service_id, upload_id, original_file_name=file_name_metadata
-            )
-            return redirect(
-                url_for(
-                    ".check_messages",
-                    service_id=service_id,
-                    upload_id=upload_id,
-                    template_id=template.id,
-                )
-            )
-        except (UnicodeDecodeError, BadZipFile, XLRDError):
-            flash(
-                "Could not read {}. Try using a different file format.".format(
-                    form.file.data.filename
-                )
-            )
-        except XLDateError:
-            flash(
-                (
-                    "{} contains numbers or dates that Notify cannot understand. "
-                    "Try formatting all columns as ‘text’ or export your file as CSV."
-                ).format(form.file.data.filename)
-            )
+        response = _check_upload(
+            service_id,
+            template.id,
+            form.file.data.filename,
+            partial(_upload_file, service_id, form.file.data),
+        )
+        if response:
+            return response
     elif form.errors:
         # just show the first error, as we don't expect the form to have more
         # than one, since it only has one field
@@ -184,9 +196,158 @@ def send_messages(service_id, template_id):
         form=form,
         allowed_file_extensions=Spreadsheet.ALLOWED_FILE_EXTENSIONS,
         remaining_messages=remaining_messages,
+        direct_upload_url=(
+            url_for(
+                ".get_direct_csv_upload_form",
+                service_id=service_id,
+                template_id=template.id,
+            )
+            if current_app.config["CSV_DIRECT_UPLOADS"]
+            else None
+        ),
+    )
+
+
+@main.route(
+    "/services/<uuid:service_id>/send/<uuid:template_id>/csv/direct-upload",
+    methods=["GET"],
+)
+@user_has_permissions(ServicePermission.SEND_MESSAGES, restrict_admin_usage=True, allow_org_user=True)
+def get_direct_csv_upload_form(service_id, template_id):
+    """
+    Where the browser can upload a spreadsheet straight to S3, and where to
+    tell us once it has
+    """
+    if not current_app.config["CSV_DIRECT_UPLOADS"]:
+        abort(404)
+    current_service.get_template_with_user_permission_or_403(template_id, current_user)
+    upload_id = str(uuid.uuid4())
+    return jsonify(
+        **get_direct_upload_form(service_id, upload_id, max_size=CSV_UPLOAD_MAX_SIZE),
+        complete_url=url_for(
+            ".send_messages_from_direct_upload",
+            service_id=service_id,
+            template_id=template_id,
+            upload_id=upload_id,
+        ),
     )
 
 
+@main.route(
+    "/services/<uuid:service_id>/send/<uuid:template_id>/csv/direct-upload/<uuid:upload_id>",
+    methods=["POST"],
+)
+@user_has_permissions(ServicePermission.SEND_MESSAGES, restrict_admin_usage=True, allow_org_user=True)
+def send_messages_from_direct_upload(service_id, template_id, upload_id):
+    if not current_app.config["CSV_DIRECT_UPLOADS"]:
+        abort(404)
+    current_service.get_template_with_user_permission_or_403(template_id, current_user)
+    form = DirectCsvUploadForm()
+    if form.validate_on_submit():
+        try:
+            response = _check_upload(
+                service_id,
+                template_id,
+                form.file_name.data,
+                partial(
+                    _upload_direct_upload, service_id, upload_id, form.file_name.data
+                ),
+            )
+        except S3ObjectNotFound:
+            flash(
+                "Could not find {}. Try uploading it again.".format(form.file_name.data)
+            )
+        else:
+            if response:
+                return response
+    elif form.errors:
+        # only one field, so only one error to show
+        flash(list(form.errors.values())[0][0])
+    return redirect(
+        url_for(".send_messages", service_id=service_id, template_id=template_id)
+    )
+
+
+def _check_upload(service_id, template_id, file_name, upload):
+    """
+    Upload a spreadsheet with `upload`, which converts it to CSV and returns
+    its upload id, and start checking it. Returns a redirect to the check
+    page, or flashes what's wrong with the file and returns None.
+    """
+    try:
+        upload_id = upload()
+        file_name_metadata = unicode_truncate(SanitiseASCII.encode(file_name), 1600)
+        set_metadata_on_csv_upload(
+            service_id, upload_id, original_file_name=file_name_metadata
+        )
+        _start_csv_check(service_id, template_id, upload_id)
+        return redirect(
+            url_for(
+                ".check_messages",
+                service_id=service_id,
+                upload_id=upload_id,
+                template_id=template_id,
+            )
+        )
+    except (UnicodeDecodeError, BadZipFile, XLRDError):
+        flash("Could not read {}. Try using a different file format.".format(file_name))
+    except XLDateError:
+        flash(
+            (
+                "{} contains numbers or dates that Notify cannot understand. "
+                "Try formatting all columns as ‘text’ or export your file as CSV."
+            ).format(file_name)
+        )
+    except TooManyRowsError:
+        flash(
+            "{} has too many rows. Notify can process up to {:,} rows at once.".format(
+                file_name, RecipientCSV.max_rows
+            )
+        )
+
+
+def _upload_file(service_id, file):
+    # big files are spooled to disk, so they're never all in this worker's memory
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    if upload_spool.should_spool(size):
+        contents = upload_spool.spool(file.stream)
+    else:
+        contents = file.read()
+    return _upload_converted(service_id, _convert(contents, file.filename))
+
+
+def _upload_direct_upload(service_id, upload_id, file_name):
+    # the converted CSV keeps the same upload id as the original spreadsheet
+    contents = download_direct_upload(service_id, upload_id)
+    try:
+        _upload_converted(
+            service_id, _convert(contents, file_name), upload_id=str(upload_id)
+        )
+    finally:
+        # the user has to upload it again if it can't be converted, so don't
+        # leave the original behind
+        delete_direct_upload(service_id, upload_id)
+    return str(upload_id)
+
+
+def _convert(contents, file_name):
+    # a spooled file is deleted once it's converted, rather than kept while
+    # the CSV is uploaded
+    if isinstance(contents, SpooledFile):
+        with contents:
+            return process_pool.run(convert_spooled_file, contents, file_name)
+    return process_pool.run(convert_file, contents, file_name)
+
+
+def _upload_converted(service_id, filedata, **kwargs):
+    try:
+        return s3upload(service_id, filedata, **kwargs)
+    finally:
+        if isinstance(filedata["data"], SpooledFile):
+            filedata["data"].delete()
+
+
 @main.route("/services/<uuid:service_id>/send/<uuid:template_id>.csv", methods=["GET"])
 @user_has_permissions(
     ServicePermission.SEND_MESSAGES, ServicePermission.MANAGE_TEMPLATES, allow_org_user=True
@@ -492,29 +653,131 @@ def send_one_off_step(service_id, template_id, step_index):
     )
 
 
-def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
-    try:
-        # The happy path is that the job doesn’t already exist, so the
-        # API will return a 404 and the client will raise HTTPError.
-        job_api_client.get_job(service_id, upload_id)
+@cache.set(CSV_CHECK_KEY_FORMAT, ttl_in_seconds=CSV_CHECK_TTL)
+def _get_csv_check(
+    service_id, upload_id, fingerprint, recipient_csv_kwargs, report_progress=False
+):
+    file_data = s3download(service_id, upload_id, spool_if_large=True)
+    on_progress = None
 
-        # the job exists already - so go back to the templates page
-        # If we just return a `redirect` (302) object here, we'll get
-        # errors when we try and unpack in the check_messages route.
-        # Rasing a werkzeug.routing redirect means that doesn't happen.
-        raise PermanentRedirect(
-            url_for(
-                "main.send_messages", service_id=service_id, template_id=template_id
+    try:
+        if report_progress:
+            on_progress = partial(
+                report_csv_check_progress,
+                current_app.config["REDIS_URL"],
+                CSV_CHECK_PROGRESS_KEY_FORMAT.format(
+                    service_id=service_id, upload_id=upload_id
+                ),
+                CSV_CHECK_PROGRESS_TTL,
+                # roughly, because of the header row and any blank lines
+                file_data.count("\n"),
             )
+
+        return process_pool.run(
+            get_csv_check_for_file,
+            file_data,
+            recipient_csv_kwargs,
+            on_progress=on_progress,
         )
-    except HTTPError as e:
-        if e.status_code != 404:
-            raise
+    finally:
+        if isinstance(file_data, SpooledFile):
+            file_data.delete()
 
-    notification_count = service_api_client.get_notification_count(service_id)
-    remaining_messages = current_service.message_limit - notification_count
 
-    contents = s3download(service_id, upload_id)
+def _get_csv_check_progress(service_id, upload_id):
+    progress = redis_client.get(
+        CSV_CHECK_PROGRESS_KEY_FORMAT.format(service_id=service_id, upload_id=upload_id)
+    )
+    return json.loads(progress) if progress else None
+
+
+def _set_csv_check_progress(service_id, upload_id, **progress):
+    redis_client.set(
+        CSV_CHECK_PROGRESS_KEY_FORMAT.format(
+            service_id=service_id, upload_id=upload_id
+        ),
+        json.dumps(progress),
+        ex=CSV_CHECK_PROGRESS_TTL,
+    )
+
+
+def _start_csv_check(service_id, template_id, upload_id):
+    """
+    Start checking a file in the process pool as soon as it's uploaded, so
+    the check page can wait for the outcome rather than doing it all within
+    one request.
+
+    This needs redis to pass on the outcome, and gevent's monkey patching so
+    that waiting for the pool doesn't block the worker. Without them, or the
+    process pool, the check page does it instead.
+    """
+    if not (
+        process_pool.enabled
+        and redis_client.active
+        and monkey.is_module_patched("socket")
+    ):
+        return
+
+    _, _, recipient_csv_kwargs, fingerprint = _get_csv_check_inputs(
+        service_id, template_id
+    )
+    _set_csv_check_progress(
+        service_id, upload_id, status="checking", rows_checked=0, total_rows=None
+    )
+    gevent.spawn(
+        _run_csv_check,
+        current_app._get_current_object(),
+        service_id,
+        upload_id,
+        fingerprint,
+        recipient_csv_kwargs,
+    )
+
+
+def _run_csv_check(app, service_id, upload_id, fingerprint, recipient_csv_kwargs):
+    keep_alive = gevent.spawn(_keep_csv_check_progress, app, service_id, upload_id)
+    with app.app_context():
+        try:
+            csv_check = _get_csv_check(
+                service_id,
+                upload_id,
+                fingerprint,
+                recipient_csv_kwargs,
+                report_progress=True,
+            )
+        except Exception:
+            app.logger.exception(f"Error checking upload {upload_id}")
+            _set_csv_check_progress(service_id, upload_id, status="failed")
+        else:
+            _set_csv_check_progress(
+                service_id,
+                upload_id,
+                status="finished",
+                rows_checked=csv_check["row_count"],
+                total_rows=csv_check["row_count"],
+            )
+        finally:
+            keep_alive.kill()
+
+
+def _keep_csv_check_progress(app, service_id, upload_id):
+    """
+    Stops the progress expiring while the check waits for a free process, or
+    for a big file to be downloaded, so the check page doesn't give up on it
+    and check the file again itself
+    """
+    with app.app_context():
+        while True:
+            gevent.sleep(CSV_CHECK_PROGRESS_REFRESH_INTERVAL)
+            redis_client.expire(
+                CSV_CHECK_PROGRESS_KEY_FORMAT.format(
+                    service_id=service_id, upload_id=upload_id
+                ),
+                CSV_CHECK_PROGRESS_TTL,
+            )
+
+
+def _get_csv_check_inputs(service_id, template_id, **kwargs):
     db_template = current_service.get_template_with_user_permission_or_403(
         template_id, current_user
     )
@@ -551,17 +814,57 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
         )
     else:
         allow_list = None
-    recipients = RecipientCSV(
-        contents,
+    recipient_csv_kwargs = dict(
         template=template,
         max_initial_rows_shown=50,
         max_errors_shown=50,
         guestlist=allow_list,
-        remaining_messages=remaining_messages,
         allow_international_sms=current_service.has_permission(
             ServicePermission.INTERNATIONAL_SMS
         ),
     )
+    fingerprint = get_csv_check_fingerprint(
+        template_id,
+        db_template["version"],
+        email_reply_to,
+        sms_sender,
+        recipient_csv_kwargs["guestlist"],
+        recipient_csv_kwargs["allow_international_sms"],
+    )
+    return db_template, template, recipient_csv_kwargs, fingerprint
+
+
+def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
+    try:
+        # The happy path is that the job doesn’t already exist, so the
+        # API will return a 404 and the client will raise HTTPError.
+        job_api_client.get_job(service_id, upload_id)
+
+        # the job exists already - so go back to the templates page
+        # If we just return a `redirect` (302) object here, we'll get
+        # errors when we try and unpack in the check_messages route.
+        # Rasing a werkzeug.routing redirect means that doesn't happen.
+        raise PermanentRedirect(
+            url_for(
+                "main.send_messages", service_id=service_id, template_id=template_id
+            )
+        )
+    except HTTPError as e:
+        if e.status_code != 404:
+            raise
+
+    notification_count = service_api_client.get_notification_count(service_id)
+    remaining_messages = current_service.message_limit - notification_count
+
+    db_template, template, recipient_csv_kwargs, fingerprint = _get_csv_check_inputs(
+        service_id, template_id, **kwargs
+    )
+    csv_check = _get_csv_check(service_id, upload_id, fingerprint, recipient_csv_kwargs)
+    recipients = CheckedRecipientCSV(
+        csv_check,
+        remaining_messages=remaining_messages,
+        **recipient_csv_kwargs,
+    )
 
     if request.args.get("from_test"):
         back_link = {
@@ -611,7 +914,17 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
         abort(404)
 
     if preview_row < len(recipients) + 2:
-        template.values = recipients[preview_row - 2].recipient_and_personalisation
+        try:
+            row = recipients[preview_row - 2]
+        except IndexError:
+            # only the rows shown on the check page are kept, so read this one
+            # from the file, downloading only as far as it
+            row = RecipientCSV(
+                get_csv_upload_rows(service_id, upload_id).get_rows(preview_row - 1),
+                template=template,
+                should_validate=False,
+            )[preview_row - 2]
+        template.values = row.recipient_and_personalisation
     elif preview_row > 2:
         abort(404)
 
@@ -623,7 +936,7 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
         recipients=recipients,
         template=template,
         errors=recipients.has_errors,
-        row_errors=get_errors_for_csv(recipients, template.template_type),
+        row_errors=recipients.row_errors,
         count_of_recipients=len(recipients),
         count_of_displayed_recipients=len(list(recipients.displayed_rows)),
         original_file_name=original_file_name,
@@ -652,6 +965,15 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
 )
 @user_has_permissions(ServicePermission.SEND_MESSAGES, restrict_admin_usage=True, allow_org_user=True)
 def check_messages(service_id, template_id, upload_id, row_index=2):
+    progress = _get_csv_check_progress(service_id, upload_id)
+    if progress and progress["status"] == "checking":
+        return render_template(
+            "views/check/checking.html",
+            progress=progress,
+            template_id=template_id,
+            upload_id=upload_id,
+        )
+
     data = _check_messages(service_id, template_id, upload_id, row_index)
     data["allowed_file_extensions"] = Spreadsheet.ALLOWED_FILE_EXTENSIONS
 
@@ -686,6 +1008,19 @@ def check_messages(service_id, template_id, upload_id, row_index=2):
     return render_template("views/check/ok.html", **data)
 
 
+@main.route(
+    "/services/<uuid:service_id>/<uuid:template_id>/check/<uuid:upload_id>/status.json"
+)
+@user_has_permissions(ServicePermission.SEND_MESSAGES, restrict_admin_usage=True, allow_org_user=True)
+def check_messages_status(service_id, template_id, upload_id):
+    progress = _get_csv_check_progress(service_id, upload_id) or {}
+    return jsonify(
+        finished=progress.get("status") != "checking",
+        rows_checked=progress.get("rows_checked"),
+        total_rows=progress.get("total_rows"),
+    )
+
+
 @main.route(
     "/services/<uuid:service_id>/<uuid:template_id>/check/<uuid:upload_id>/preview",
     methods=["POST"],
@@ -1,10 +1,34 @@
 import csv
-from io import StringIO
+import re
+from io import BytesIO, StringIO, TextIOWrapper
 from os import path
 
+import openpyxl
 import pyexcel
 import pyexcel_xlsx
 
+try:
+    # isn't public, so openpyxl is pinned in pyproject.toml, and
+    # test_openpyxl_still_has_what_iter_xlsx_rows_uses checks it's as expected
+    from openpyxl.worksheet._reader import WorkSheetParser
+except ImportError:
+    WorkSheetParser = None
+
+from app.utils.spool import CHUNK_SIZE, SpooledFile
+from notifications_utils.recipients import RecipientCSV
+
+# the line boundaries `str.splitlines` recognises, other than \n and \r\n
+UNUSUAL_LINE_BOUNDARIES = re.compile(r"\r(?!\n)|[\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+BLANK_LINE = re.compile(r"\n[^\S\n]*\n")
+
+# how openpyxl and pyexcel treat the `hidden` attribute of rows and columns
+HIDDEN = ("1", "true")
+MERGE_CELLS = b"mergeCells"
+
+
+class TooManyRowsError(Exception):
+    pass
+
 
 class Spreadsheet:
     ALLOWED_FILE_EXTENSIONS = ("csv", "xlsx", "xls", "ods", "xlsm", "tsv")
@@ -42,7 +66,7 @@ class Spreadsheet:
 
     @staticmethod
     def normalise_newlines(file_content):
-        return "\r\n".join(file_content.read().decode("utf-8").splitlines())
+        return normalise_lines(file_content.read().decode("utf-8"))
 
     @classmethod
     def from_rows(cls, rows, filename=""):
@@ -64,23 +88,9 @@ class Spreadsheet:
                 csv_data=Spreadsheet.normalise_newlines(file_content), filename=filename
             )
 
-        if extension == "tsv":
-            file_content = StringIO(Spreadsheet.normalise_newlines(file_content))
-
-        if extension == "xlsm":
-            file_data = pyexcel_xlsx.get_data(file_content)
-            instance = cls.from_rows(
-                # Get the first sheet from the workbook
-                list(file_data.values())[0],
-                filename,
-            )
-            return instance
-
-        instance = cls.from_rows(
-            pyexcel.iget_array(file_type=extension, file_stream=file_content), filename
-        )
-        pyexcel.free_resources()
-        return instance
+        with StringIO() as converted:
+            write_rows(iter_rows(file_content, extension), converted)
+            return cls(csv_data=converted.getvalue(), filename=filename)
 
     @classmethod
     def from_file_form(cls, form):
@@ -88,3 +98,224 @@ class Spreadsheet:
             form.file.data,
             filename=form.file.data.filename,
         )
+
+
+def normalise_lines(data):
+    """
+    The lines of `data` which aren't blank, each ending with \r\n apart from
+    the last, with whitespace stripped from the start and end.
+
+    Most files only need their line endings changing, or nothing at all, so
+    that's done without splitting them into lines, which takes several times
+    as much memory as the file itself.
+    """
+    start, end = 0, len(data)
+    while start < end and data[start].isspace():
+        start += 1
+    while end > start and data[end - 1].isspace():
+        end -= 1
+
+    if UNUSUAL_LINE_BOUNDARIES.search(data, start, end) or BLANK_LINE.search(
+        data, start, end
+    ):
+        return "\r\n".join(line for line in data.splitlines() if line.strip()).strip()
+
+    data = data[start:end]
+    if "\r" not in data:
+        return data.replace("\n", "\r\n")
+    if data.count("\n") != data.count("\r\n"):
+        return data.replace("\r\n", "\n").replace("\n", "\r\n")
+    return data
+
+
+def iter_rows(file_content, extension):
+    """
+    The rows of the first sheet in a spreadsheet, stopping with
+    `TooManyRowsError` as soon as there are more than a CSV can have, rather
+    than reading the rest of a huge file first
+    """
+    rows = None
+    if extension in ("xlsx", "xlsm"):
+        rows = iter_xlsx_rows(file_content)
+
+    if rows is None and extension == "xlsm":
+        file_data = pyexcel_xlsx.get_data(file_content)
+        # Get the first sheet from the workbook
+        rows = list(file_data.values())[0]
+
+    if rows is None:
+        if extension == "tsv":
+            file_content = StringIO(Spreadsheet.normalise_newlines(file_content))
+        rows = pyexcel.iget_array(file_type=extension, file_stream=file_content)
+
+    try:
+        yield from limit_rows(rows, RecipientCSV.max_rows)
+    finally:
+        pyexcel.free_resources()
+
+
+def iter_xlsx_rows(file_content):
+    """
+    The rows of the first visible sheet in an xlsx or xlsm file, read one at a
+    time with openpyxl's read-only mode rather than loading the whole
+    workbook. Like pyexcel, it leaves out hidden rows and columns and empty
+    cells at the end of each row.
+
+    Read-only mode can't tell which cells are merged until it's read the
+    whole sheet, so returns None for a sheet with merged cells, which
+    pyexcel needs to read instead.
+
+    The public `iter_rows` can't tell which rows and columns are hidden, so
+    this uses the parser behind it and other private parts of openpyxl. If a
+    version of openpyxl doesn't have the parser, it returns None as well.
+    """
+    if WorkSheetParser is None:
+        return None
+    workbook = openpyxl.load_workbook(file_content, read_only=True, data_only=True)
+    sheet = next(
+        (sheet for sheet in workbook.worksheets if sheet.sheet_state != "hidden"),
+        None,
+    )
+    if sheet is None or _has_merged_cells(sheet):
+        workbook.close()
+        file_content.seek(0)
+        return None
+    return _iter_sheet_rows(workbook, sheet)
+
+
+def _has_merged_cells(sheet):
+    overlap = len(MERGE_CELLS) - 1
+    previous_chunk = b""
+    with sheet._get_source() as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            if MERGE_CELLS in previous_chunk[-overlap:] + chunk:
+                return True
+            previous_chunk = chunk
+    return False
+
+
+def _iter_sheet_rows(workbook, sheet):
+    try:
+        with sheet._get_source() as source:
+            # the parser read-only worksheets use, which also tells us
+            # which rows and columns are hidden
+            parser = WorkSheetParser(
+                source,
+                sheet._shared_strings,
+                data_only=True,
+                epoch=workbook.epoch,
+                date_formats=workbook._date_formats,
+                timedelta_formats=workbook._timedelta_formats,
+            )
+            hidden_columns = None
+            for index, cells in parser.parse():
+                if hidden_columns is None:
+                    # columns come before any rows in the file. pyexcel only
+                    # leaves out the first of a range of hidden columns, so
+                    # this does the same
+                    hidden_columns = {
+                        int(dimension["min"])
+                        for dimension in parser.column_dimensions.values()
+                        if dimension.get("hidden") in HIDDEN
+                    }
+                if parser.row_dimensions.get(str(index), {}).get("hidden") in HIDDEN:
+                    continue
+                values = {
+                    cell["column"]: cell["value"]
+                    for cell in cells
+                    if cell["value"] is not None
+                    and cell["value"] != ""
+                    and cell["column"] not in hidden_columns
+                }
+                if values:
+                    yield [
+                        values.get(column, "")
+                        for column in range(1, max(values) + 1)
+                        if column not in hidden_columns
+                    ]
+    finally:
+        workbook.close()
+
+
+def limit_rows(rows, max_rows):
+    """
+    Stops with `TooManyRowsError` at the first row beyond `max_rows`, not
+    counting the header or empty rows
+    """
+    count = -1
+    for row in rows:
+        if any(str(cell).strip() for cell in row):
+            count += 1
+            if count > max_rows:
+                raise TooManyRowsError(f"More than {max_rows:,} rows")
+        yield row
+
+
+def write_rows(rows, destination):
+    output = csv.writer(destination)
+    for row in rows:
+        output.writerow(row)
+
+
+def convert_file(file_content, filename):
+    """
+    The contents of an uploaded spreadsheet as CSV, from its bytes rather
+    than the uploaded file, so that it can be done in the process pool
+    """
+    return Spreadsheet.from_file(BytesIO(file_content), filename=filename).as_dict
+
+
+def write_normalised_lines(source, destination):
+    """
+    The same as `normalise_lines`, reading from one binary file and writing to
+    another a line at a time, so the file is never all in memory
+    """
+    text = TextIOWrapper(source, encoding="utf-8", newline="")
+    previous_line = None
+    try:
+        for lines in text:
+            for line in lines.splitlines():
+                if not line.strip():
+                    continue
+                if previous_line is None:
+                    line = line.lstrip()
+                else:
+                    destination.write(previous_line.encode("utf-8") + b"\r\n")
+                previous_line = line
+        if previous_line is not None:
+            destination.write(previous_line.rstrip().encode("utf-8"))
+    finally:
+        # otherwise closing the wrapper would close source
+        text.detach()
+
+
+def convert_spooled_file(spooled_file, filename):
+    """
+    The same as `convert_file`, for an upload which has been spooled to disk.
+    The CSV is written into another spooled file, which the caller needs to
+    delete.
+    """
+    extension = Spreadsheet.get_extension(filename)
+    directory = path.dirname(spooled_file.path)
+    converted_file = SpooledFile.create(directory)
+    try:
+        if extension == "csv":
+            with spooled_file.open() as source, converted_file.open(
+                "wb"
+            ) as destination:
+                write_normalised_lines(source, destination)
+        else:
+            # written as CSV, then normalised like an uploaded CSV file
+            with SpooledFile.create(directory) as unnormalised_file:
+                with spooled_file.open() as source, unnormalised_file.open(
+                    "w", encoding="utf-8", newline=""
+                ) as destination:
+                    write_rows(iter_rows(source, extension), destination)
+                with unnormalised_file.open() as source, converted_file.open(
+                    "wb"
+                ) as destination:
+                    write_normalised_lines(source, destination)
+    except BaseException:
+        converted_file.delete()
+        raise
+    return {"file_name": filename, "data": converted_file}
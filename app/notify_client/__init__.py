@@ -1,11 +1,17 @@
+import contextvars
 import os
+from functools import partial
 
+import gevent
 from flask import abort, current_app, has_request_context, request
 from flask_login import current_user
+from gevent.event import AsyncResult
+from gevent.pool import Pool
 
 from app.extensions import redis_client
 from notifications_python_client import __version__
 from notifications_python_client.base import BaseAPIClient
+from notifications_utils import json_codec
 from notifications_utils.clients.redis import RequestCache
 
 cache = RequestCache(redis_client)
@@ -15,7 +21,62 @@ def _attach_current_user(data):
     return dict(created_by=current_user.id, **data)
 
 
+class RequestGetMemo:
+    """
+    Responses to the API GETs made while handling the current request.
+
+    The same GET is often issued several times per request (by before_request
+    handlers, views and models each asking for the service, its jobs, etc.), so
+    the first response is shared with later callers. Greenlets asking for a GET
+    that is still in flight wait for it rather than issuing their own.
+
+    It lives on the request object rather than `g`, so that greenlets running in
+    a copy of the request context share it.
+    """
+
+    def __init__(self):
+        self.responses = {}
+        self.calls_saved = 0
+
+    @staticmethod
+    def key(url, params):
+        return url, repr(sorted(params.items())) if params else None
+
+    def invalidate(self):
+        # a write can change resources other than the one written (updating a
+        # service changes its organization's and users' GETs, for instance), so
+        # forget everything. The memo only lasts for this request, so it's cheap.
+        self.responses.clear()
+
+
+def _in_current_context(call):
+    # Flask keeps the app and request contexts in context variables, so running
+    # the call with a copy of them gives it the same request, `g` (and so
+    # current_user) and current_service as the view. Unlike pushing a copy of
+    # the request context, nothing is torn down (and the request closed) when
+    # the call finishes.
+    return partial(contextvars.copy_context().run, call)
+
+
+def _capture_outcome(call):
+    try:
+        return call(), None
+    except Exception as e:
+        return None, e
+
+
+def log_coalesced_api_calls(response):
+    memo = getattr(request, "api_get_memo", None)
+    if memo is not None and memo.calls_saved:
+        current_app.logger.debug(
+            f"Saved {memo.calls_saved} API GET calls for {request.endpoint}"
+        )
+    return response
+
+
 class NotifyAdminAPIClient(BaseAPIClient):
+    json_codec = json_codec
+
     def __init__(self):
         super().__init__("a" * 73, "b")
 
@@ -24,6 +85,7 @@ class NotifyAdminAPIClient(BaseAPIClient):
         self.service_id = app.config["ADMIN_CLIENT_USER_NAME"]
         self.api_key = app.config["ADMIN_CLIENT_SECRET"]
         self.route_secret = app.config["ROUTE_SECRET_KEY_1"]
+        self.token_reuse_fraction = app.config["API_TOKEN_REUSE_FRACTION"]
 
     def generate_headers(self, api_token):
         headers = {
@@ -42,6 +104,64 @@ class NotifyAdminAPIClient(BaseAPIClient):
         headers["X-B3-SpanId"] = request.span_id
         return headers
 
+    @staticmethod
+    def gather(*calls):
+        """
+        Make several independent API calls concurrently and return their results in order
+
+        Each call is a function taking no arguments, usually a functools.partial of a
+        client method. Calls run in greenlets from a pool of API_GATHER_POOL_SIZE, each
+        in the current request context so trace headers, current_user and
+        current_service work as they do in the view. Once every call has finished, the
+        exception from the first failing call (in argument order) is re-raised, just as
+        if the calls had been made one after another.
+        """
+        if len(calls) < 2:
+            return [call() for call in calls]
+
+        pool = Pool(current_app.config["API_GATHER_POOL_SIZE"])
+        greenlets = [
+            pool.spawn(_capture_outcome, _in_current_context(call)) for call in calls
+        ]
+        gevent.joinall(greenlets)
+
+        results = []
+        for result, exception in (greenlet.value for greenlet in greenlets):
+            if exception is not None:
+                raise exception
+            results.append(result)
+        return results
+
+    def _perform_request(self, method, url, kwargs):
+        if not has_request_context():
+            return super()._perform_request(method, url, kwargs)
+
+        if not hasattr(request, "api_get_memo"):
+            request.api_get_memo = RequestGetMemo()
+        memo = request.api_get_memo
+
+        if method != "GET":
+            memo.invalidate()
+            return super()._perform_request(method, url, kwargs)
+
+        key = memo.key(url, kwargs.get("params"))
+        pending = memo.responses.get(key)
+        if pending is not None:
+            memo.calls_saved += 1
+            # each caller decodes the JSON again, so nobody shares (and can mutate) another caller's dicts
+            return pending.get()
+
+        pending = memo.responses[key] = AsyncResult()
+        try:
+            response = super()._perform_request(method, url, kwargs)
+        except Exception as e:
+            if memo.responses.get(key) is pending:
+                del memo.responses[key]
+            pending.set_exception(e)
+            raise
+        pending.set(response)
+        return response
+
     def check_inactive_service(self):
         # this file is imported in app/__init__.py before current_service is initialised, so need to import later
         # to prevent cyclical imports
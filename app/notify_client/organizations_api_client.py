@@ -1,16 +1,15 @@
 from itertools import chain
 
-from app.extensions import redis_client
 from app.notify_client import NotifyAdminAPIClient, cache
 from notifications_python_client.errors import HTTPError
 
 
 class OrganizationsClient(NotifyAdminAPIClient):
-    @cache.set("organizations")
+    @cache.set("organizations", stale_ttl_in_seconds=300)
     def get_organizations(self):
         return self.get(url="/organizations")
 
-    @cache.set("domains")
+    @cache.set("domains", stale_ttl_in_seconds=300)
     def get_domains(self):
         return list(
             chain.from_iterable(
@@ -51,10 +50,10 @@ class OrganizationsClient(NotifyAdminAPIClient):
         api_response = self.post(url="/organizations/{}".format(org_id), data=kwargs)
 
         if cached_service_ids:
-            redis_client.delete(*map("service-{}".format, cached_service_ids))
+            cache.invalidate(*map("service-{}".format, cached_service_ids))
 
         if "name" in kwargs:
-            redis_client.delete(f"organization-{org_id}-name")
+            cache.invalidate(f"organization-{org_id}-name")
 
         return api_response
 
@@ -1,4 +1,3 @@
-from app.extensions import redis_client
 from app.notify_client import NotifyAdminAPIClient, cache
 
 
@@ -53,7 +52,7 @@ class TemplateFolderAPIClient(NotifyAdminAPIClient):
         )
 
         if template_ids:
-            redis_client.delete(
+            cache.invalidate(
                 *(
                     f"service-{service_id}-template-{id}-version-None"
                     for id in template_ids
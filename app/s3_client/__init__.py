@@ -1,11 +1,12 @@
+import csv
 import os
+from io import StringIO
 
 import botocore
-from boto3 import Session
 from botocore.config import Config
 from flask import current_app
 
-from notifications_utils.s3 import S3ObjectNotFound
+from notifications_utils.s3 import S3ObjectNotFound, s3_resources
 
 AWS_CLIENT_CONFIG = Config(
     # This config is required to enable S3 to connect to FIPS-enabled
@@ -15,8 +16,14 @@ AWS_CLIENT_CONFIG = Config(
         "addressing_style": "virtual",
     },
     use_fips_endpoint=True,
+    # otherwise pre-signed URLs use the older signature, which some regions,
+    # including GovCloud, don't accept
+    signature_version="s3v4",
 )
 
+# enough for the header and a few hundred rows of a typical CSV file
+FIRST_RANGE_SIZE = 64 * 1024
+
 
 def get_s3_object(
     bucket_name,
@@ -26,15 +33,7 @@ def get_s3_object(
     region,
 ):
     # To inspect contents: obj.get()['Body'].read().decode('utf-8')
-    session = Session(
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        region_name=region,
-    )
-    s3 = session.resource(
-        "s3",
-        config=AWS_CLIENT_CONFIG,
-    )
+    s3 = s3_resources.get(access_key, secret_key, region, config=AWS_CLIENT_CONFIG)
     obj = s3.Object(bucket_name, filename)
     # This 'proves' that use of moto in the relevant tests in test_send.py
     # mocks everything related to S3.  What you will see in the logs is:
@@ -85,10 +84,43 @@ def set_s3_metadata(obj, **kwargs):
     return copy_from_object_result
 
 
-def get_s3_contents(obj):
+def get_s3_presigned_url(obj, expires_in, **params):
+    """
+    A URL anyone can download obj from until it expires, after expires_in
+    seconds. params are added to the request, for example
+    ResponseContentDisposition to set the name of the downloaded file.
+    """
+    return obj.meta.client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": obj.bucket_name, "Key": obj.key, **params},
+        ExpiresIn=expires_in,
+    )
+
+
+def get_s3_presigned_post(obj, expires_in, max_size):
+    """
+    The URL and form fields for a browser to upload a file of up to max_size
+    bytes to obj, until they expire after expires_in seconds
+    """
+    return obj.meta.client.generate_presigned_post(
+        obj.bucket_name,
+        obj.key,
+        Fields={"x-amz-server-side-encryption": "AES256"},
+        Conditions=[
+            {"x-amz-server-side-encryption": "AES256"},
+            ["content-length-range", 1, max_size],
+        ],
+        ExpiresIn=expires_in,
+    )
+
+
+def get_s3_contents(obj, spool=None, decode=True):
     try:
         response = obj.get()
-        return response["Body"].read().decode("utf-8")
+        if spool and spool.should_spool(response["ContentLength"]):
+            return spool.spool(response["Body"])
+        contents = response["Body"].read()
+        return contents.decode("utf-8") if decode else contents
     except botocore.exceptions.ClientError as client_error:
         current_app.logger.error(
             f"Unable to download s3 file {obj.bucket_name}/{obj.key}"
@@ -96,3 +128,73 @@ def get_s3_contents(obj):
         if client_error.response["Error"]["Code"] == "NoSuchKey":
             raise S3ObjectNotFound(client_error.response, client_error.operation_name)
         raise client_error
+
+
+class S3CSVRows:
+    """
+    Reads the start of a CSV file in S3, for when only the header or the
+    first few rows are needed, with ranged GETs rather than downloading the
+    whole file. Each GET fetches twice as much as the one before, so that
+    reading far into a big file still only takes a few requests.
+    """
+
+    def __init__(self, obj, first_range_size=FIRST_RANGE_SIZE):
+        self.obj = obj
+        self.range_size = first_range_size
+        self.size = None
+        self._data = b""
+        self._text = ""
+        self._row_count = 0
+
+    @property
+    def complete(self):
+        return self.size is not None and len(self._data) >= self.size
+
+    def get_rows(self, row_count=0):
+        """
+        The header and at least the first row_count rows as CSV, or the whole
+        file if it's shorter. There may be more rows after them, the last of
+        which may be cut short.
+        """
+        # the last row read so far may be cut short, so only the ones
+        # before it are certain to be complete
+        while not self.complete and self._row_count < row_count + 2:
+            self._read_more()
+        return self._text
+
+    def _read_more(self):
+        start = len(self._data)
+        try:
+            response = self.obj.get(
+                Range=f"bytes={start}-{start + self.range_size - 1}"
+            )
+        except botocore.exceptions.ClientError as client_error:
+            if client_error.response["Error"]["Code"] == "InvalidRange":
+                # the file is empty, or ends exactly where the last range did
+                self.size = start
+                return
+            current_app.logger.error(
+                f"Unable to download s3 file {self.obj.bucket_name}/{self.obj.key}"
+            )
+            if client_error.response["Error"]["Code"] == "NoSuchKey":
+                raise S3ObjectNotFound(
+                    client_error.response, client_error.operation_name
+                )
+            raise client_error
+
+        self._data += response["Body"].read()
+        if "ContentRange" in response:
+            self.size = int(response["ContentRange"].rsplit("/", 1)[1])
+        else:
+            # the whole file was sent
+            self.size = len(self._data)
+        self.range_size *= 2
+
+        if self.complete:
+            self._text = self._data.decode("utf-8")
+        else:
+            # a newline can't be part of another character, so everything
+            # up to the last one can be decoded
+            end_of_last_line = self._data.rfind(b"\n") + 1
+            self._text = self._data[:end_of_last_line].decode("utf-8")
+        self._row_count = sum(1 for row in csv.reader(StringIO(self._text)))
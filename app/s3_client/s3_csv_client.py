@@ -1,18 +1,27 @@
 import os
 import uuid
+from functools import partial
 
 from flask import current_app
 
+from app.models.spreadsheet import normalise_lines
 from app.s3_client import (
+    AWS_CLIENT_CONFIG,
+    S3CSVRows,
     check_s3_file_exists,
     get_s3_contents,
     get_s3_metadata,
     get_s3_object,
+    get_s3_presigned_post,
     set_s3_metadata,
 )
+from app.utils.spool import SpooledFile, upload_spool
+from notifications_utils.s3 import s3_resources
 from notifications_utils.s3 import s3upload as utils_s3upload
 
 NEW_FILE_LOCATION_STRUCTURE = "{}-service-notify/{}.csv"
+# where a browser uploads a spreadsheet before it's converted to CSV
+DIRECT_UPLOAD_LOCATION_STRUCTURE = "{}-service-notify/{}-original"
 
 
 def get_csv_location(service_id, upload_id):
@@ -33,18 +42,24 @@ def get_csv_upload(service_id, upload_id):
     return get_s3_object(*get_csv_location(service_id, upload_id))
 
 
+def get_direct_upload(service_id, upload_id):
+    bucket, _, access_key, secret_key, region = get_csv_location(service_id, upload_id)
+    key = DIRECT_UPLOAD_LOCATION_STRUCTURE.format(service_id, upload_id)
+    return get_s3_object(bucket, key, access_key, secret_key, region)
+
+
 def remove_blank_lines(filedata):
     # sometimes people upload files with hundreds of blank lines at the end
-    data = filedata["data"]
-    cleaned_data = "\r\n".join(line for line in data.splitlines() if line.strip())
-    filedata["data"] = cleaned_data
+    if isinstance(filedata["data"], str):
+        # spooled files have already been normalised as they were written
+        filedata["data"] = normalise_lines(filedata["data"])
     return filedata
 
 
-def s3upload(service_id, filedata):
+def s3upload(service_id, filedata, upload_id=None, metadata=None, tags=None):
 
     filedata = remove_blank_lines(filedata)
-    upload_id = str(uuid.uuid4())
+    upload_id = upload_id or str(uuid.uuid4())
     bucket_name, file_location, access_key, secret_key, region = get_csv_location(
         service_id, upload_id
     )
@@ -56,19 +71,81 @@ def s3upload(service_id, filedata):
             f"NO BUCKET NAME SHOULD BE: {exp_bucket} WITH REGION {exp_region} TIER {tier}"
         )
 
-    utils_s3upload(
-        filedata=filedata["data"],
+    upload = partial(
+        utils_s3upload,
         region=region,
         bucket_name=bucket_name,
         file_location=file_location,
         access_key=access_key,
         secret_key=secret_key,
+        metadata=metadata,
+        tags=tags,
     )
+    if isinstance(filedata["data"], SpooledFile):
+        with filedata["data"].open() as file:
+            upload(filedata=file)
+    else:
+        upload(filedata=filedata["data"])
     return upload_id
 
 
-def s3download(service_id, upload_id):
-    return get_s3_contents(get_csv_upload(service_id, upload_id))
+def s3download(service_id, upload_id, spool_if_large=False):
+    """
+    The contents of an upload. With spool_if_large, an upload bigger than
+    CSV_SPOOL_THRESHOLD is returned as a SpooledFile, which the caller needs
+    to delete, instead of a string.
+    """
+    return get_s3_contents(
+        get_csv_upload(service_id, upload_id),
+        spool=upload_spool if spool_if_large else None,
+    )
+
+
+def get_direct_upload_form(service_id, upload_id, max_size):
+    """
+    A pre-signed POST for a browser to upload a spreadsheet straight to S3.
+    Once it has, `download_direct_upload` gets it back to be converted.
+    """
+    return get_s3_presigned_post(
+        get_direct_upload(service_id, upload_id),
+        expires_in=current_app.config["CSV_DIRECT_UPLOAD_EXPIRY"],
+        max_size=max_size,
+    )
+
+
+def download_direct_upload(service_id, upload_id):
+    """
+    The bytes of a spreadsheet a browser has uploaded, or a SpooledFile,
+    which the caller needs to delete, if it's bigger than CSV_SPOOL_THRESHOLD
+    """
+    return get_s3_contents(
+        get_direct_upload(service_id, upload_id), spool=upload_spool, decode=False
+    )
+
+
+def delete_direct_upload(service_id, upload_id):
+    get_direct_upload(service_id, upload_id).delete()
+
+
+def delete_csv_uploads(service_id, upload_id_prefix):
+    """
+    Deletes every upload whose id starts with upload_id_prefix
+    """
+    bucket_name, file_location, access_key, secret_key, region = get_csv_location(
+        service_id, upload_id_prefix
+    )
+    s3 = s3_resources.get(access_key, secret_key, region, config=AWS_CLIENT_CONFIG)
+    s3.Bucket(bucket_name).objects.filter(
+        Prefix=file_location.removesuffix(".csv")
+    ).delete()
+
+
+def get_csv_upload_rows(service_id, upload_id):
+    """
+    For reading the header or first few rows of an upload without
+    downloading all of it
+    """
+    return S3CSVRows(get_csv_upload(service_id, upload_id))
 
 
 def set_metadata_on_csv_upload(service_id, upload_id, **kwargs):
@@ -1,9 +1,9 @@
 import uuid
 
-from boto3 import Session
 from flask import current_app
 
 from app.s3_client import get_s3_object
+from notifications_utils.s3 import s3_resources
 from notifications_utils.s3 import s3upload as utils_s3upload
 
 TEMP_TAG = "temp-{user_id}_"
@@ -40,12 +40,11 @@ def persist_logo(old_name, new_name):
 
 def get_s3_objects_filter_by_prefix(prefix):
     bucket_name = bucket_creds("bucket")
-    session = Session(
-        aws_access_key_id=bucket_creds("access_key_id"),
-        aws_secret_access_key=bucket_creds("secret_access_key"),
-        region_name=bucket_creds("region"),
+    s3 = s3_resources.get(
+        bucket_creds("access_key_id"),
+        bucket_creds("secret_access_key"),
+        bucket_creds("region"),
     )
-    s3 = session.resource("s3")
     return s3.Bucket(bucket_name).objects.filter(Prefix=prefix)
 
 
@@ -1,14 +1,17 @@
 import logging
 import os
+from datetime import datetime, timezone
+from time import monotonic
 
+import gevent
 import requests
+from gevent import monkey
 from requests.exceptions import RequestException
 
 logger = logging.getLogger(__name__)
 
 
-def is_api_down():
-    api_base_url = os.getenv("API_HOST_NAME")
+def probe_api_health(api_base_url):
     try:
         response = requests.get(api_base_url, timeout=2)
         is_down = response.status_code != 200
@@ -20,3 +23,67 @@ def is_api_down():
     except RequestException as e:
         logger.error(f"API down when loading homepage {e}")
         return True
+
+
+class ApiHealthMonitor:
+    """
+    Knows whether the API was up the last time it was probed, so that rendering a
+    page never has to wait on the network to find out.
+
+    Under gunicorn's gevent workers each worker probes the API from a background
+    greenlet every API_HEALTH_CHECK_INTERVAL seconds. Without gevent's monkey
+    patching (the flask development server) a greenlet would never get to run, so
+    the probe happens inline instead, at most once per interval.
+    """
+
+    def __init__(self):
+        self.is_down = False
+        self.checked_at = None
+        self._api_base_url = None
+        self._interval = None
+        self._enabled = False
+        self._probe_pid = None
+        self._last_probe = None
+
+    def init_app(self, app):
+        self._api_base_url = app.config["API_HOST_NAME"]
+        self._interval = app.config["API_HEALTH_CHECK_INTERVAL"]
+        self._enabled = app.config["API_HEALTH_CHECK_ENABLED"]
+
+    def is_api_down(self):
+        if not self._enabled:
+            return self.is_down
+
+        if not monkey.is_module_patched("socket"):
+            if (
+                self._last_probe is None
+                or monotonic() - self._last_probe >= self._interval
+            ):
+                self.check()
+        elif self._probe_pid != os.getpid():
+            # start the probe on first use, which is after gunicorn has forked the worker
+            self._probe_pid = os.getpid()
+            gevent.spawn(self._probe_forever)
+
+        return self.is_down
+
+    def check(self):
+        self.is_down = probe_api_health(self._api_base_url)
+        self.checked_at = datetime.now(timezone.utc)
+        self._last_probe = monotonic()
+
+    def _probe_forever(self):
+        while True:
+            # the probe is only started once per worker, so it mustn't die
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Error probing API health")
+            gevent.sleep(self._interval)
+
+
+api_health_monitor = ApiHealthMonitor()
+
+
+def is_api_down():
+    return api_health_monitor.is_api_down()
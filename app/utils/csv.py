@@ -1,20 +1,27 @@
 import datetime
+import hashlib
+from collections import Counter
+from functools import cache
+from itertools import islice
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from flask import current_app, json
 from flask_login import current_user
+from redis import Redis
 
 from app.models.spreadsheet import Spreadsheet
 from app.utils import hilite
+from app.utils.spool import SpooledFile
 from app.utils.templates import get_sample_template
-from notifications_utils.recipients import RecipientCSV
+from notifications_utils.recipients import RecipientCSV, RecipientCSVSummary
 
 
 def get_errors_for_csv(recipients, template_type):
     errors = []
+    counts = recipients.summary.counts
 
-    if any(recipients.rows_with_bad_recipients):
-        number_of_bad_recipients = len(list(recipients.rows_with_bad_recipients))
+    number_of_bad_recipients = counts["has_bad_recipient"]
+    if number_of_bad_recipients:
         if "sms" == template_type:
             if 1 == number_of_bad_recipients:
                 errors.append("fix 1 phone number")
@@ -26,8 +33,8 @@ def get_errors_for_csv(recipients, template_type):
             else:
                 errors.append("fix {} email addresses".format(number_of_bad_recipients))
 
-    if any(recipients.rows_with_missing_data):
-        number_of_rows_with_missing_data = len(list(recipients.rows_with_missing_data))
+    number_of_rows_with_missing_data = counts["has_missing_data"]
+    if number_of_rows_with_missing_data:
         if 1 == number_of_rows_with_missing_data:
             errors.append("enter missing data in 1 row")
         else:
@@ -35,10 +42,8 @@ def get_errors_for_csv(recipients, template_type):
                 "enter missing data in {} rows".format(number_of_rows_with_missing_data)
             )
 
-    if any(recipients.rows_with_message_too_long):
-        number_of_rows_with_message_too_long = len(
-            list(recipients.rows_with_message_too_long)
-        )
+    number_of_rows_with_message_too_long = counts["message_too_long"]
+    if number_of_rows_with_message_too_long:
         if 1 == number_of_rows_with_message_too_long:
             errors.append("shorten the message in 1 row")
         else:
@@ -48,10 +53,8 @@ def get_errors_for_csv(recipients, template_type):
                 )
             )
 
-    if any(recipients.rows_with_empty_message):
-        number_of_rows_with_empty_message = len(
-            list(recipients.rows_with_empty_message)
-        )
+    number_of_rows_with_empty_message = counts["message_empty"]
+    if number_of_rows_with_empty_message:
         if 1 == number_of_rows_with_empty_message:
             errors.append("check you have content for the empty message in 1 row")
         else:
@@ -64,9 +67,161 @@ def get_errors_for_csv(recipients, template_type):
     return errors
 
 
+def get_csv_check_fingerprint(*inputs):
+    """
+    Identifies everything other than the file itself which affects the outcome
+    of checking an upload: the template and its version, the sender, the
+    service's permissions and who it's allowed to send to. Leave out anything
+    which only changes how the template is shown, so that every page showing
+    the same upload shares one check
+    """
+    return hashlib.sha256(
+        json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+def get_csv_check(recipients):
+    """
+    The outcome of checking every row of an upload, and the rows we need to
+    show the user, small enough to cache so that the check and preview pages
+    don't have to download and validate the whole file again
+    """
+    displayed_indexes = {
+        row.index for row in recipients.initial_rows if row is not None
+    } | {row.index for row in recipients.initial_rows_with_errors}
+    data_rows = islice(recipients._rows, 1, max(displayed_indexes, default=-1) + 2)
+    return {
+        "row_count": len(recipients),
+        "allowed_to_send_to": recipients.allowed_to_send_to,
+        "row_errors": get_errors_for_csv(recipients, recipients.template_type),
+        "error_counts": dict(recipients.summary.counts),
+        "column_error_counts": dict(recipients.summary.column_error_counts),
+        "column_headers": recipients._raw_column_headers,
+        "rows": [
+            [index, values]
+            for index, values in enumerate(data_rows)
+            if index in displayed_indexes
+        ],
+    }
+
+
+def get_csv_check_for_file(file_data, recipient_csv_kwargs, on_progress=None):
+    if isinstance(file_data, SpooledFile):
+        with file_data.mapped() as mapped_file_data:
+            return get_csv_check_for_file(
+                mapped_file_data, recipient_csv_kwargs, on_progress=on_progress
+            )
+    return get_csv_check(
+        RecipientCSV(file_data, on_progress=on_progress, **recipient_csv_kwargs)
+    )
+
+
+@cache
+def _get_redis(redis_url):
+    return Redis.from_url(redis_url)
+
+
+def report_csv_check_progress(redis_url, key, ttl_in_seconds, total_rows, rows_checked):
+    """
+    Records in redis how far checking a file has got. It connects to redis
+    itself, rather than through redis_client, so that it also works in the
+    process pool, where the app isn't set up.
+    """
+    _get_redis(redis_url).set(
+        key,
+        json.dumps(
+            {
+                "status": "checking",
+                "rows_checked": rows_checked,
+                "total_rows": total_rows,
+            }
+        ),
+        ex=ttl_in_seconds,
+    )
+
+
+class CheckedRecipientCSV(RecipientCSV):
+    """
+    A RecipientCSV rebuilt from the outcome of `get_csv_check`. It only holds
+    the rows which get displayed, which are validated again, and takes
+    everything else from the check.
+    """
+
+    def __init__(self, csv_check, **kwargs):
+        self.csv_check = csv_check
+        super().__init__(
+            Spreadsheet.from_rows(
+                # a blank line would be lost if it ended up at the end of the file
+                [csv_check["column_headers"]]
+                + [values or [""] for _, values in csv_check["rows"]]
+            ).as_csv_data,
+            **kwargs,
+        )
+        self.rows_as_list = list(self.get_rows())
+        for row, (index, _) in zip(self.rows_as_list, csv_check["rows"]):
+            row.index = index
+
+    def __getitem__(self, requested_index):
+        for row in self.rows:
+            if row.index == requested_index:
+                return row
+        raise IndexError(f"Row {requested_index} wasn't kept when the file was checked")
+
+    @property
+    def summary(self):
+        if self._summary is None:
+            summary = RecipientCSVSummary(self)
+            summary.row_count = self.csv_check["row_count"]
+            summary.allowed_to_send_to = self.csv_check["allowed_to_send_to"]
+            # checks cached before the counts were kept fall back to counting
+            # the displayed rows, which include every row with an error shown
+            if "error_counts" in self.csv_check:
+                summary.counts = Counter(self.csv_check["error_counts"])
+                summary.column_error_counts = Counter(
+                    self.csv_check["column_error_counts"]
+                )
+            self._summary = summary
+        return self._summary
+
+    @property
+    def row_errors(self):
+        return self.csv_check["row_errors"]
+
+
+class PartialRecipientCSV:
+    """
+    The rows of an upload in S3, downloaded only as far as the furthest one
+    asked for. When it needs more it reads at least twice as many rows as it
+    has. The rows it has are parsed once, when they're read, and not again
+    for every one asked for.
+    """
+
+    def __init__(self, s3_csv_rows, template):
+        self.s3_csv_rows = s3_csv_rows
+        self.template = template
+        self.row_count = 0
+        self.rows = []
+        self.recipients = RecipientCSV(s3_csv_rows.get_rows(), template=template)
+
+    @property
+    def column_headers(self):
+        return self.recipients.column_headers
+
+    def __getitem__(self, index):
+        if index >= self.row_count:
+            self.row_count = max(index + 1, self.row_count * 2)
+            # only the values are needed, so the rows aren't validated
+            self.rows = RecipientCSV(
+                self.s3_csv_rows.get_rows(self.row_count),
+                template=self.template,
+                should_validate=False,
+            ).rows
+        return self.rows[index]
+
+
 def generate_notifications_csv(**kwargs):
     from app import notification_api_client
-    from app.s3_client.s3_csv_client import s3download
+    from app.s3_client.s3_csv_client import get_csv_upload_rows
 
     if "page" not in kwargs:
         kwargs["page"] = 1
@@ -82,7 +237,8 @@ def generate_notifications_csv(**kwargs):
         except TypeError:
             pass
 
-        original_file_contents = s3download(kwargs["service_id"], kwargs["job_id"])
+        original_file = get_csv_upload_rows(kwargs["service_id"], kwargs["job_id"])
+        original_file_contents = original_file.get_rows()
         # This will verify that the user actually did successfully upload a csv for a one-off.  Limit the size
         # we display to 999 characters, because we don't want to show the contents for reports with thousands of rows.
         current_app.logger.info(
@@ -90,8 +246,8 @@ def generate_notifications_csv(**kwargs):
                 f"Original csv for job_id {kwargs['job_id']}: {original_file_contents[0:999]}"
             )
         )
-        original_upload = RecipientCSV(
-            original_file_contents,
+        original_upload = PartialRecipientCSV(
+            original_file,
             template=get_sample_template(kwargs["template_type"]),
         )
         original_column_headers = original_upload.column_headers
@@ -151,13 +307,10 @@ def generate_notifications_csv(**kwargs):
                     preferred_tz_created_at,
                     notification["carrier"],
                 ]
+                original_row = original_upload[notification["row_number"] - 1]
                 for header in original_column_headers:
                     if header.lower() != "phone number":
-                        values.append(
-                            original_upload[notification["row_number"] - 1]
-                            .get(header)
-                            .data
-                        )
+                        values.append(original_row.get(header).data)
 
             else:
                 values = [
@@ -0,0 +1,125 @@
+import os
+import pickle
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+
+class ProcessPoolError(Exception):
+    pass
+
+
+class ProcessPoolTimeoutError(ProcessPoolError):
+    pass
+
+
+class ResultTooLargeError(ProcessPoolError):
+    pass
+
+
+def _call_and_pickle(max_result_size, fn, args, kwargs):
+    result = pickle.dumps(fn(*args, **kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+    if len(result) > max_result_size:
+        raise ResultTooLargeError(
+            f"{fn.__name__} returned {len(result)} bytes, "
+            f"more than the limit of {max_result_size}"
+        )
+    return result
+
+
+def _terminate_workers(executor):
+    if hasattr(executor, "terminate_workers"):  # new in Python 3.14
+        executor.terminate_workers()
+        return
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+
+
+class ProcessPool:
+    """
+    Runs CPU-heavy work, like checking a big spreadsheet, in separate
+    processes, so that it doesn't stop the other greenlets in a gevent worker
+    from serving requests while it runs.
+
+    Each worker starts its own pool the first time it's used, which is after
+    gunicorn has forked it. Processes are spawned rather than forked so they
+    don't inherit the worker's gevent hub. Waiting for the result yields to
+    other greenlets, because gevent has patched the locks the future uses.
+
+    A spawned process starts a new interpreter and imports the app to unpickle
+    the function it's given, so each one takes about as much memory as a
+    worker does when it's idle (around 115MB). With PROCESS_POOL_MAX_WORKERS
+    of them for each gunicorn worker, an instance needs room for up to
+    workers * (1 + PROCESS_POOL_MAX_WORKERS) processes. They're only started
+    when there's work for them, and stopped when the worker exits or when a
+    call takes too long. Other calls which were using them are run again.
+
+    When PROCESS_POOL_ENABLED is off the work runs in the request, as before.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._max_workers = None
+        self._timeout = None
+        self._max_result_size = None
+        self._executor = None
+        self._executor_pid = None
+
+    def init_app(self, app):
+        self.enabled = app.config["PROCESS_POOL_ENABLED"]
+        self._max_workers = app.config["PROCESS_POOL_MAX_WORKERS"]
+        self._timeout = app.config["PROCESS_POOL_TIMEOUT"]
+        self._max_result_size = app.config["PROCESS_POOL_MAX_RESULT_SIZE"]
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) in the pool and return what it returns. fn,
+        its arguments and the result all need to be picklable.
+
+        :raises ProcessPoolTimeoutError: if it takes more than PROCESS_POOL_TIMEOUT seconds
+        :raises ResultTooLargeError: if the result is more than PROCESS_POOL_MAX_RESULT_SIZE bytes
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(
+                _call_and_pickle, self._max_result_size, fn, args, kwargs
+            )
+            return pickle.loads(future.result(timeout=self._timeout))
+        except (BrokenProcessPool, CancelledError):
+            if executor is not self._executor:
+                # another call timed out and stopped the pool this was using
+                return self.run(fn, *args, **kwargs)
+            # eg a process ran out of memory, which breaks the whole pool
+            self.shutdown()
+            raise
+        except FutureTimeoutError as e:
+            # a task can't be cancelled once it has started, so stop the pool
+            # rather than leave a process busy with it, and start a new one
+            if executor is self._executor:
+                self.shutdown()
+            raise ProcessPoolTimeoutError(
+                f"{fn.__name__} took more than {self._timeout} seconds"
+            ) from e
+
+    def _get_executor(self):
+        if self._executor_pid != os.getpid():
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=get_context("spawn"),
+            )
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None and self._executor_pid == os.getpid():
+            _terminate_workers(self._executor)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._executor_pid = None
+
+
+process_pool = ProcessPool()
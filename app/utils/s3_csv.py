@@ -1,10 +1,33 @@
 import csv
 import io
+from secrets import token_hex
+from time import monotonic
 
+import gevent
+from flask import current_app
+
+from app.extensions import redis_client
+from app.s3_client import check_s3_file_exists, get_s3_presigned_url
+from app.s3_client.s3_csv_client import (
+    delete_csv_uploads,
+    get_csv_upload,
+    s3download,
+    s3upload,
+)
 from app.utils.csv import (
     convert_report_date_to_preferred_timezone,
     get_user_preferred_timezone,
 )
+from app.utils.spool import SpooledFile, upload_spool
+
+CONVERTED_REPORT_ID = "{report_id}-{timezone}"
+# so that the bucket's lifecycle rules can expire converted reports, which
+# hold the same PII as the reports they're converted from
+CONVERTED_REPORT_TAGS = {"retention": "converted-report"}
+CONVERSION_LOCK_KEY_FORMAT = "report-conversion-lock-{service_id}-{converted_report_id}"
+# long enough to convert a big report, and less than gunicorn's timeout
+CONVERSION_LOCK_TTL = 120
+CONVERSION_POLL_INTERVAL_IN_SECONDS = 0.5
 
 
 def convert_s3_csv_timestamps(csv_content, user_timezone=None):
@@ -61,3 +84,96 @@ def convert_s3_csv_timestamps(csv_content, user_timezone=None):
         yield output.getvalue()
         output.truncate(0)
         output.seek(0)
+
+
+def get_converted_report_url(service_id, report_id, user_timezone, filename):
+    """
+    A pre-signed URL to download a report with its timestamps converted to
+    user_timezone, straight from S3.
+
+    Each report is converted once for each timezone and the result saved in
+    S3, with the ETag of the report it was converted from. It's converted
+    again when the report is replaced, and deleted once the report has been.
+
+    Converting still happens in the request which first asks for a report in
+    a timezone, so that request takes as long as streaming the report used
+    to. Other requests for the same report wait for it rather than
+    converting it too, as long as it takes less than CONVERSION_LOCK_TTL.
+    """
+    report = get_csv_upload(service_id, report_id)
+    converted_report_id = CONVERTED_REPORT_ID.format(
+        report_id=report_id, timezone=user_timezone.replace("/", "-")
+    )
+    converted_report = get_csv_upload(service_id, converted_report_id)
+
+    source_etag = report.e_tag if check_s3_file_exists(report) else None
+    if source_etag is None:
+        # converting below raises S3ObjectNotFound
+        delete_csv_uploads(
+            service_id, CONVERTED_REPORT_ID.format(report_id=report_id, timezone="")
+        )
+    if not _is_converted(converted_report, source_etag):
+        lock_key = CONVERSION_LOCK_KEY_FORMAT.format(
+            service_id=service_id, converted_report_id=converted_report_id
+        )
+        token = token_hex(16)
+        if redis_client.active and not redis_client.set(
+            lock_key, token, ex=CONVERSION_LOCK_TTL, nx=True
+        ):
+            _wait_for_lock(lock_key)
+            if _is_converted(converted_report, source_etag):
+                return _get_converted_report_url(converted_report, filename)
+        try:
+            _convert_report(
+                service_id,
+                report_id,
+                converted_report_id,
+                user_timezone,
+                source_etag,
+            )
+        finally:
+            redis_client.delete_if_equal(lock_key, token)
+
+    return _get_converted_report_url(converted_report, filename)
+
+
+def _is_converted(converted_report, source_etag):
+    return bool(
+        source_etag
+        and check_s3_file_exists(converted_report)
+        and converted_report.metadata.get("source-etag") == source_etag
+    )
+
+
+def _wait_for_lock(lock_key):
+    waited_until = monotonic() + CONVERSION_LOCK_TTL
+    while redis_client.get(lock_key) and monotonic() < waited_until:
+        gevent.sleep(CONVERSION_POLL_INTERVAL_IN_SECONDS)
+
+
+def _convert_report(
+    service_id, report_id, converted_report_id, user_timezone, source_etag
+):
+    # if the report doesn't exist this raises S3ObjectNotFound
+    report_content = s3download(service_id, report_id)
+    with SpooledFile.create(upload_spool.directory) as converted_file:
+        with converted_file.open("w", encoding="utf-8", newline="") as file:
+            file.writelines(
+                convert_s3_csv_timestamps(report_content, user_timezone=user_timezone)
+            )
+        s3upload(
+            service_id,
+            {"data": converted_file},
+            upload_id=converted_report_id,
+            metadata={"source-etag": source_etag or ""},
+            tags=CONVERTED_REPORT_TAGS,
+        )
+
+
+def _get_converted_report_url(converted_report, filename):
+    return get_s3_presigned_url(
+        converted_report,
+        current_app.config["REPORT_DOWNLOAD_URL_EXPIRY"],
+        ResponseContentType="text/csv",
+        ResponseContentDisposition=f'inline; filename="{filename}"',
+    )
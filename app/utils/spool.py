@@ -0,0 +1,122 @@
+import mmap
+import os
+import shutil
+import time
+from contextlib import contextmanager, suppress
+from tempfile import NamedTemporaryFile, gettempdir
+
+SPOOLED_FILE_PREFIX = "notify-upload-"
+CHUNK_SIZE = 1024 * 1024
+
+
+class SpooledFile:
+    """
+    An upload which has been written to a temporary file on disk. Only its
+    path is pickled, so it can be sent to the process pool, which runs on
+    the same machine.
+
+    Whoever spools a file deletes it, which using it as a context manager
+    does.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.delete()
+
+    @classmethod
+    def create(cls, directory=None):
+        with NamedTemporaryFile(
+            prefix=SPOOLED_FILE_PREFIX, dir=directory, delete=False
+        ) as file:
+            return cls(file.name)
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def open(self, mode="rb", **kwargs):
+        return open(self.path, mode, **kwargs)
+
+    @contextmanager
+    def mapped(self):
+        """
+        The contents of the file, mapped into memory with mmap, so that the
+        operating system only reads the parts which are used and can drop
+        them again when it needs the memory
+        """
+        with self.open() as file:
+            if not self.size:
+                # an empty file can't be mapped
+                yield b""
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def count(self, character):
+        """
+        How many times character appears in the file, like `str.count`,
+        reading it a chunk at a time
+        """
+        encoded = character.encode("utf-8")
+        with self.open() as file:
+            return sum(
+                chunk.count(encoded)
+                for chunk in iter(lambda: file.read(CHUNK_SIZE), b"")
+            )
+
+    def delete(self):
+        with suppress(FileNotFoundError):
+            os.remove(self.path)
+
+
+class UploadSpool:
+    """
+    Decides which uploads are big enough to write to disk, rather than keep
+    in a worker's memory while they're converted and checked, and where to
+    write them.
+
+    Spooled files are deleted as soon as they've been used. Any left behind
+    by a worker which died are deleted when the next one starts, once
+    they're older than CSV_SPOOL_MAX_AGE seconds.
+    """
+
+    def __init__(self):
+        self.threshold = None
+        self.directory = None
+        self.max_age = None
+
+    def init_app(self, app):
+        self.threshold = app.config["CSV_SPOOL_THRESHOLD"]
+        self.directory = app.config["CSV_SPOOL_DIRECTORY"]
+        self.max_age = app.config["CSV_SPOOL_MAX_AGE"]
+        self.remove_stale_files()
+
+    def should_spool(self, size):
+        return bool(self.threshold) and size > self.threshold
+
+    def spool(self, stream):
+        spooled_file = SpooledFile.create(self.directory)
+        try:
+            with spooled_file.open("wb") as file:
+                shutil.copyfileobj(stream, file, CHUNK_SIZE)
+        except BaseException:
+            spooled_file.delete()
+            raise
+        return spooled_file
+
+    def remove_stale_files(self):
+        with suppress(FileNotFoundError):
+            for entry in os.scandir(self.directory or gettempdir()):
+                if not entry.name.startswith(SPOOLED_FILE_PREFIX):
+                    continue
+                with suppress(FileNotFoundError):
+                    if time.time() - entry.stat().st_mtime > self.max_age:
+                        os.remove(entry.path)
+
+
+upload_spool = UploadSpool()
@@ -22,3 +22,11 @@ def worker_abort(worker):
     worker.log.info("worker received ABORT")
     for stack in sys._current_frames().values():
         worker.log.error("".join(traceback.format_stack(stack)))
+
+
+def worker_exit(server, worker):
+    # a worker which checked a spreadsheet has a pool of processes, which would
+    # otherwise stop it from exiting until gunicorn kills it
+    from app.utils.process_pool import process_pool
+
+    process_pool.shutdown()
@@ -15,9 +15,13 @@ from notifications_python_client.errors import (
 __algorithm__ = "HS256"
 __type__ = "JWT"
 __bound__ = 30
+__token_reuse_fraction__ = 0.5
 
 INVALID_FUTURE_TOKEN_ERROR_MESSAGE = "Token can not be in the future"
 
+# (client_id, secret) -> (issued at, signed token), shared by every client in the process
+_token_cache = {}
+
 
 def create_jwt_token(secret, client_id):
     """
@@ -37,12 +41,47 @@ def create_jwt_token(secret, client_id):
     :param client_id: Identifier for the client
     :return: JWT token for this request
     """
+    return _encode_jwt_token(secret, client_id, epoch_seconds())
+
+
+def create_cached_jwt_token(secret, client_id, reuse_fraction=__token_reuse_fraction__):
+    """
+    Get a JWT token for GOV.UK Notify, reusing a previously signed one if it is still fresh
+
+    The API accepts any token issued within __bound__ seconds, so there is no need to sign
+    a new one for every request. Tokens are cached per (client_id, secret) and re-signed
+    once reuse_fraction of that window has passed, leaving the rest as headroom for clock
+    skew and slow requests. A reuse_fraction of 0 signs a new token every time.
+
+    Nothing between the cache lookup and the store yields to the gevent hub, so greenlets
+    can't interleave here. Two OS threads racing will at worst both sign a token.
+
+    :param secret: Application signing secret
+    :param client_id: Identifier for the client
+    :param reuse_fraction: Fraction of __bound__ for which a signed token is reused
+    :return: JWT token for this request
+    """
+    now = epoch_seconds()
+    key = (client_id, secret)
+
+    cached = _token_cache.get(key)
+    if cached is not None:
+        issued_at, token = cached
+        if 0 <= now - issued_at < __bound__ * reuse_fraction:
+            return token
+
+    token = _encode_jwt_token(secret, client_id, now)
+    _token_cache[key] = (now, token)
+    return token
+
+
+def _encode_jwt_token(secret, client_id, issued_at):
     assert secret, "Missing secret key"
     assert client_id, "Missing client id"
 
     headers = {"typ": __type__, "alg": __algorithm__}
 
-    claims = {"iss": client_id, "iat": epoch_seconds()}
+    claims = {"iss": client_id, "iat": issued_at}
     t = jwt.encode(payload=claims, key=secret, headers=headers)
     if isinstance(t, str):
         return t
@@ -6,7 +6,10 @@ from os import getenv
 import requests
 
 from notifications_python_client import __version__
-from notifications_python_client.authentication import create_jwt_token
+from notifications_python_client.authentication import (
+    __token_reuse_fraction__,
+    create_cached_jwt_token,
+)
 from notifications_python_client.errors import HTTPError, InvalidResponse
 
 logger = logging.getLogger(__name__)
@@ -21,13 +24,23 @@ class BaseAPIClient:
     This class is not thread-safe.
     """
 
-    def __init__(self, api_key, base_url=API_PUBLIC_URL, timeout=30):
+    # anything with json-compatible dumps(obj, default=...) and loads(s) functions
+    json_codec = json
+
+    def __init__(
+        self,
+        api_key,
+        base_url=API_PUBLIC_URL,
+        timeout=30,
+        token_reuse_fraction=__token_reuse_fraction__,
+    ):
         """
         Initialise the client
         Error if either of base_url or secret missing
         :param base_url - base URL of Notify.gov API:
         :param secret - application secret - used to sign the request:
         :param timeout - request timeout on the client
+        :param token_reuse_fraction - fraction of the token lifetime a signed token is reused for:
         :return:
         """
         service_id = api_key[-73:-37]
@@ -40,6 +53,7 @@ class BaseAPIClient:
         self.service_id = service_id
         self.api_key = api_key
         self.timeout = timeout
+        self.token_reuse_fraction = token_reuse_fraction
         self.request_session = requests.Session()
 
     def put(self, url, data):
@@ -70,7 +84,9 @@ class BaseAPIClient:
         return self._process_json_response(response)
 
     def _create_request_objects(self, url, data, params):
-        api_token = create_jwt_token(self.api_key, self.service_id)
+        api_token = create_cached_jwt_token(
+            self.api_key, self.service_id, self.token_reuse_fraction
+        )
 
         kwargs = {"headers": self.generate_headers(api_token), "timeout": self.timeout}
 
@@ -85,7 +101,7 @@ class BaseAPIClient:
         return url, kwargs
 
     def _serialize_data(self, data):
-        return json.dumps(data, default=self._extended_json_encoder)
+        return self.json_codec.dumps(data, default=self._extended_json_encoder)
 
     def _extended_json_encoder(self, obj):
         if isinstance(obj, set):
@@ -113,7 +129,7 @@ class BaseAPIClient:
         try:
             if response.status_code == 204:
                 return
-            return response.json()
+            return self.json_codec.loads(response.content)
         except ValueError as e:
             raise InvalidResponse(
                 response, message="No JSON response object could be decoded"
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from time import monotonic
+
+
+def _redis_pattern_to_fnmatch(pattern):
+    # the only difference for the patterns we use is how a character class is negated
+    return pattern.replace("[^", "[!")
+
+
+class LocalCache:
+    """
+    A small cache of recently used values, held in this process's memory.
+
+    Entries expire after ttl_in_seconds and the least recently used entry is
+    evicted once there are more than max_size of them. Nothing here yields to
+    the gevent hub, so it's safe to share between the greenlets of a worker.
+    """
+
+    def __init__(self, max_size, ttl_in_seconds):
+        self.max_size = max_size
+        self.ttl_in_seconds = ttl_in_seconds
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if monotonic() >= expires_at:
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = (monotonic() + self.ttl_in_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def delete_by_pattern(self, pattern):
+        pattern = _redis_pattern_to_fnmatch(pattern)
+        self.delete(*[key for key in self._entries if fnmatchcase(key, pattern)])
+
+    def clear(self):
+        self._entries.clear()
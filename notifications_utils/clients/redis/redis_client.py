@@ -1,5 +1,6 @@
 import numbers
 import uuid
+from itertools import batched
 from time import time
 
 from flask import current_app
@@ -38,6 +39,8 @@ class RedisClient:
     active = False
     scripts = {}
 
+    SCAN_BATCH_SIZE = 1000
+
     def init_app(self, app):
         self.active = app.config.get("REDIS_ENABLED")
         if self.active:
@@ -46,19 +49,26 @@ class RedisClient:
             self.register_scripts()
 
     def register_scripts(self):
-        # delete keys matching a pattern supplied as a parameter. Does so in batches of 5000 to prevent unpack from
-        # exceeding lua's stack limit, and also to prevent errors if no keys match the pattern.
-        # Inspired by https://gist.github.com/ddre54/0a4751676272e0da8186
-        self.scripts["delete-keys-by-pattern"] = self.redis_store.register_script(
-            """
-            local keys = redis.call('keys', ARGV[1])
+        # delete every key listed in a set, and then the set itself. Running this as a script means nothing can be
+        # added to the set between reading and deleting it. Deletes in batches of 5000 to prevent unpack from
+        # exceeding lua's stack limit, and also to prevent errors if the set is empty.
+        self.scripts["delete-tracked-keys"] = self.redis_store.register_script("""
+            local keys = redis.call('smembers', KEYS[1])
             local deleted = 0
             for i=1, #keys, 5000 do
                 deleted = deleted + redis.call('del', unpack(keys, i, math.min(i + 4999, #keys)))
             end
+            redis.call('del', KEYS[1])
             return deleted
-            """
-        )
+            """)
+
+        # delete a key only if it still has the value we set, so a lock is only released by whoever holds it
+        self.scripts["delete-if-equal"] = self.redis_store.register_script("""
+            if redis.call('get', KEYS[1]) == ARGV[1] then
+                return redis.call('del', KEYS[1])
+            end
+            return 0
+            """)
 
     def delete_by_pattern(self, pattern, raise_exception=False):
         r"""
@@ -72,10 +82,20 @@ class RedisClient:
         * h[a-b]llo matches hallo and hbllo
 
         Use \ to escape special characters if you want to match them verbatim
+
+        This walks the keyspace with SCAN, which unlike KEYS doesn't block other clients while it runs, but still
+        takes time proportional to the number of keys in redis. Where the keys to delete are known in advance,
+        store them with set_tracked and remove them with delete_tracked instead.
         """
         if self.active:
             try:
-                return self.scripts["delete-keys-by-pattern"](args=[pattern])
+                deleted = 0
+                matching_keys = self.redis_store.scan_iter(
+                    match=pattern, count=self.SCAN_BATCH_SIZE
+                )
+                for keys in batched(matching_keys, self.SCAN_BATCH_SIZE):
+                    deleted += self.redis_store.delete(*keys)
+                return deleted
             except Exception as e:
                 self.__handle_exception(
                     e, raise_exception, "delete-by-pattern", pattern
@@ -83,6 +103,64 @@ class RedisClient:
 
         return 0
 
+    def set_tracked(
+        self,
+        key,
+        value,
+        tracking_keys,
+        ex=None,
+        tracking_ex=None,
+        raise_exception=False,
+    ):
+        """
+        Sets a key, and adds its name to each of the sets in tracking_keys so that delete_tracked can remove it later
+        without searching for it. The sets expire after tracking_ex seconds, which should be at least as long as any
+        key added to them.
+        """
+        key = prepare_value(key)
+        value = prepare_value(value)
+        if self.active:
+            try:
+                pipe = self.redis_store.pipeline()
+                pipe.set(key, value, ex=ex)
+                for tracking_key in tracking_keys:
+                    pipe.sadd(tracking_key, key)
+                    pipe.expire(tracking_key, tracking_ex or ex)
+                pipe.execute()
+            except Exception as e:
+                self.__handle_exception(e, raise_exception, "set-tracked", key)
+
+    def delete_tracked(self, tracking_key, raise_exception=False):
+        """
+        Deletes every key that set_tracked added to the set called tracking_key, and the set itself. Returns how many
+        keys were deleted.
+        """
+        tracking_key = prepare_value(tracking_key)
+        if self.active:
+            try:
+                return self.scripts["delete-tracked-keys"](keys=[tracking_key])
+            except Exception as e:
+                self.__handle_exception(
+                    e, raise_exception, "delete-tracked", tracking_key
+                )
+
+        return 0
+
+    def delete_if_equal(self, key, value, raise_exception=False):
+        """
+        Deletes key if it's still set to value, checking and deleting in one step. For releasing a lock without
+        deleting one that someone else has taken since ours expired. Returns how many keys were deleted.
+        """
+        key = prepare_value(key)
+        value = prepare_value(value)
+        if self.active:
+            try:
+                return self.scripts["delete-if-equal"](keys=[key], args=[value])
+            except Exception as e:
+                self.__handle_exception(e, raise_exception, "delete-if-equal", key)
+
+        return 0
+
     def exceeded_rate_limit(self, cache_key, limit, interval, raise_exception=False):
         """
         Rate limiting.
@@ -139,7 +217,7 @@ class RedisClient:
         key = prepare_value(key)
         value = prepare_value(value)
         if self.active:
-            self.redis_store.set(key, value, ex, px, nx, xx)
+            return self.redis_store.set(key, value, ex, px, nx, xx)
 
     def incr(self, key, raise_exception=False):
         key = prepare_value(key)
@@ -149,6 +227,45 @@ class RedisClient:
             except Exception as e:
                 self.__handle_exception(e, raise_exception, "incr", key)
 
+    def expire(self, key, seconds, raise_exception=False):
+        key = prepare_value(key)
+        if self.active:
+            try:
+                return self.redis_store.expire(key, seconds)
+            except Exception as e:
+                self.__handle_exception(e, raise_exception, "expire", key)
+
+    def publish(self, channel, message, raise_exception=False):
+        if self.active:
+            try:
+                return self.redis_store.publish(channel, message)
+            except Exception as e:
+                self.__handle_exception(e, raise_exception, "publish", channel)
+
+    def scan_key_details(self, pattern="*"):
+        """
+        Yields (key, type, ttl, bytes of memory used) for every key matching pattern. Keys are found with SCAN, and
+        their details fetched with one pipelined round trip per batch, so redis is never blocked for long.
+        """
+        if not self.active:
+            return
+
+        matching_keys = self.redis_store.scan_iter(
+            match=pattern, count=self.SCAN_BATCH_SIZE
+        )
+        for keys in batched(matching_keys, self.SCAN_BATCH_SIZE):
+            pipe = self.redis_store.pipeline(transaction=False)
+            for key in keys:
+                pipe.type(key)
+                pipe.ttl(key)
+                pipe.memory_usage(key)
+            results = pipe.execute()
+            for key, (key_type, ttl, size) in zip(keys, batched(results, 3)):
+                if ttl == -2:
+                    # expired since it was scanned
+                    continue
+                yield key, key_type, ttl, size
+
     def info(self, key):
         if self.active:
             return self.redis_store.info(key)
@@ -1,15 +1,184 @@
-import json
+import logging
+import os
+import zlib
 from contextlib import suppress
 from datetime import timedelta
 from functools import wraps
 from inspect import signature
+from math import log
+from random import random
+from secrets import token_hex
+from time import monotonic, time
+
+import gevent
+from gevent import monkey
+
+from notifications_utils import json_codec
+from notifications_utils.clients.redis.local_cache import LocalCache
+
+logger = logging.getLogger(__name__)
 
 
 class RequestCache:
     DEFAULT_TTL = int(timedelta(days=7).total_seconds())
+    INVALIDATION_CHANNEL = "request-cache-invalidation"
+    NAMESPACE_KEY_FORMAT = "request-cache-namespace-{}"
+    LOCK_KEY_FORMAT = "request-cache-lock-{}"
+    LOCK_TTL = 10
+    LOCK_WAIT_IN_SECONDS = 5
+    LOCK_POLL_INTERVAL_IN_SECONDS = 0.05
+    EARLY_REFRESH_BETA = 1.0
+    COMPRESSED_VALUE_MARKER = b"zlib:"
 
     def __init__(self, redis_client):
         self.redis_client = redis_client
+        self.local_cache = None
+        self._listener_pid = None
+        self._namespace_formats = []
+        self.compression_threshold = None
+        self.namespace_scan_fallback = False
+        self.stampede_protection = False
+
+    def init_app(self, app):
+        """
+        Optionally put a per-process cache in front of Redis, so that hot keys
+        don't cost a round trip every time they're read.
+
+        Deletes made through this class are applied to the local cache straight
+        away and published to every other process over Redis pub/sub. Entries
+        also expire after REDIS_LOCAL_CACHE_TTL seconds, which bounds how stale
+        a read can be if an invalidation message is missed.
+        """
+        if app.config.get("REDIS_LOCAL_CACHE_ENABLED") and self.redis_client.active:
+            self.local_cache = LocalCache(
+                max_size=app.config["REDIS_LOCAL_CACHE_MAX_SIZE"],
+                ttl_in_seconds=app.config["REDIS_LOCAL_CACHE_TTL"],
+            )
+        else:
+            self.local_cache = None
+
+        # values stored compressed are always decompressed, whatever this is set
+        # to, so a release can read them before any worker starts writing them
+        self.compression_threshold = app.config.get("REDIS_COMPRESSION_THRESHOLD")
+        self.namespace_scan_fallback = bool(
+            app.config.get("REDIS_NAMESPACE_SCAN_FALLBACK")
+        )
+        # entries written with stale_ttl_in_seconds are read whatever this is
+        # set to, so it can be turned on once every worker can read them
+        self.stampede_protection = bool(
+            app.config.get("REDIS_STAMPEDE_PROTECTION_ENABLED")
+        )
+
+    def get(self, key):
+        if self.local_cache is None:
+            return self._decompress(self.redis_client.get(key))
+
+        self._ensure_listening_for_invalidations()
+        cached = self.local_cache.get(key)
+        if cached is None:
+            cached = self._decompress(self.redis_client.get(key))
+            if cached:
+                self.local_cache.set(key, cached)
+        return cached
+
+    def _compress(self, value):
+        # a threshold of 0 or None turns compression off
+        encoded = value.encode("utf-8")
+        if not self.compression_threshold or len(encoded) <= self.compression_threshold:
+            return value
+        return self.COMPRESSED_VALUE_MARKER + zlib.compress(encoded)
+
+    def _decompress(self, cached):
+        if isinstance(cached, bytes) and cached.startswith(
+            self.COMPRESSED_VALUE_MARKER
+        ):
+            return zlib.decompress(cached.removeprefix(self.COMPRESSED_VALUE_MARKER))
+        return cached
+
+    def _store(self, key, value, ttl_in_seconds, namespaces=()):
+        stored = self._compress(value)
+        if namespaces:
+            self.redis_client.set_tracked(
+                key,
+                stored,
+                [
+                    self.NAMESPACE_KEY_FORMAT.format(namespace)
+                    for namespace in namespaces
+                ],
+                ex=int(ttl_in_seconds),
+                tracking_ex=max(int(ttl_in_seconds), self.DEFAULT_TTL),
+            )
+        else:
+            self.redis_client.set(key, stored, ex=int(ttl_in_seconds))
+        if self.local_cache is not None:
+            self.local_cache.set(key, value)
+
+    def invalidate(self, *keys):
+        self.redis_client.delete(*keys)
+        if self.local_cache is not None:
+            self.local_cache.delete(*keys)
+            self._publish_invalidation({"keys": list(keys)})
+
+    def invalidate_pattern(self, pattern):
+        deleted = self.redis_client.delete_by_pattern(pattern)
+        if self.local_cache is not None:
+            self.local_cache.delete_by_pattern(pattern)
+            self._publish_invalidation({"pattern": pattern})
+        return deleted
+
+    def invalidate_namespace(self, namespace):
+        """
+        Deletes every key starting with namespace that was stored by a `set`
+        decorator, without searching the keyspace for them. Only namespaces
+        declared by a `delete_by_pattern` decorator are tracked.
+
+        With REDIS_NAMESPACE_SCAN_FALLBACK, keys stored before their namespace
+        was tracked are found with SCAN and deleted as well.
+        """
+        deleted = self.redis_client.delete_tracked(
+            self.NAMESPACE_KEY_FORMAT.format(namespace)
+        )
+        if self.namespace_scan_fallback:
+            deleted += self.redis_client.delete_by_pattern(f"{namespace}*") or 0
+        if self.local_cache is not None:
+            self.local_cache.delete_by_pattern(f"{namespace}*")
+            self._publish_invalidation({"pattern": f"{namespace}*"})
+        return deleted
+
+    def _publish_invalidation(self, message):
+        self.redis_client.publish(self.INVALIDATION_CHANNEL, json_codec.dumps(message))
+
+    def _apply_invalidation(self, message):
+        message = json_codec.loads(message)
+        if "keys" in message:
+            self.local_cache.delete(*message["keys"])
+        if "pattern" in message:
+            self.local_cache.delete_by_pattern(message["pattern"])
+
+    def _ensure_listening_for_invalidations(self):
+        # a blocking subscription would stall the whole process without gevent's
+        # monkey patching, in which case we rely on entries expiring
+        if not monkey.is_module_patched("socket"):
+            return
+        if self._listener_pid != os.getpid():
+            # start listening on first use, which is after gunicorn has forked the worker
+            self._listener_pid = os.getpid()
+            gevent.spawn(self._listen_for_invalidations)
+
+    def _listen_for_invalidations(self):
+        while True:
+            try:
+                pubsub = self.redis_client.redis_store.pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                # anything deleted while we weren't subscribed could still be held locally
+                self.local_cache.clear()
+                for message in pubsub.listen():
+                    self._apply_invalidation(message["data"])
+            except Exception:
+                logger.exception("Error listening for request cache invalidations")
+            gevent.sleep(1)
 
     @staticmethod
     def _get_argument(argument_name, client_method, args, kwargs):
@@ -42,23 +211,183 @@ class RequestCache:
             }
         )
 
-    def set(self, key_format, *, ttl_in_seconds=DEFAULT_TTL):
+    @staticmethod
+    def _get_namespace_format(pattern_format):
+        # a pattern that's a fixed prefix followed by * can be tracked as a namespace
+        prefix, star = pattern_format[:-1], pattern_format[-1:]
+        if star == "*" and not any(char in prefix for char in "*?[\\"):
+            return prefix
+        return None
+
+    def _get_namespaces(self, redis_key, client_method, args, kwargs):
+        namespaces = []
+        for namespace_format in self._namespace_formats:
+            try:
+                namespace = self._make_key(
+                    namespace_format, client_method, args, kwargs
+                )
+            except (KeyError, IndexError):
+                # the namespace depends on an argument this method doesn't take
+                continue
+            if redis_key.startswith(namespace):
+                namespaces.append(namespace)
+        return namespaces
+
+    @staticmethod
+    def _load_entry(cached):
+        """
+        Returns the value from a cached entry, when it stops being fresh, and how
+        long it took to fetch
+        """
+        entry = json_codec.loads(cached)
+        if isinstance(entry, dict) and entry.keys() == {
+            "value",
+            "fresh_until",
+            "delta",
+        }:
+            return entry["value"], entry["fresh_until"], entry["delta"]
+        # stored without stale_ttl_in_seconds, so fresh until it expires
+        return entry, float("inf"), 0
+
+    @classmethod
+    def _should_refresh(cls, fresh_until, delta):
+        # refresh early with a probability that rises as the entry gets closer to
+        # going stale, and sooner for values that are slow to fetch, so that one
+        # worker usually refreshes it before the rest of them notice
+        # https://cseweb.ucsd.edu/~avattani/papers/cache_stampede.pdf
+        return (
+            time() - delta * cls.EARLY_REFRESH_BETA * log(1 - random()) >= fresh_until
+        )
+
+    def _acquire_lock(self, redis_key):
+        """
+        Returns a token to release the lock with, or None if someone else holds it
+        """
+        token = token_hex(16)
+        if self.redis_client.set(
+            self.LOCK_KEY_FORMAT.format(redis_key), token, ex=self.LOCK_TTL, nx=True
+        ):
+            return token
+        return None
+
+    def _release_lock(self, redis_key, token):
+        # if fetching took longer than LOCK_TTL the lock may be someone else's now
+        self.redis_client.delete_if_equal(self.LOCK_KEY_FORMAT.format(redis_key), token)
+
+    def _wait_for(self, redis_key):
+        waited_until = monotonic() + self.LOCK_WAIT_IN_SECONDS
+        while monotonic() < waited_until:
+            gevent.sleep(self.LOCK_POLL_INTERVAL_IN_SECONDS)
+            cached = self.get(redis_key)
+            if cached:
+                return cached
+        return None
+
+    def _fetch(
+        self,
+        redis_key,
+        ttl_in_seconds,
+        stale_ttl_in_seconds,
+        client_method,
+        args,
+        kwargs,
+    ):
+        namespaces = self._get_namespaces(redis_key, client_method, args, kwargs)
+        if stale_ttl_in_seconds is None:
+            api_response = client_method(*args, **kwargs)
+            self._store(
+                redis_key,
+                json_codec.dumps(api_response),
+                ttl_in_seconds,
+                namespaces=namespaces,
+            )
+            return api_response
+
+        started = monotonic()
+        api_response = client_method(*args, **kwargs)
+        entry = {
+            "value": api_response,
+            "fresh_until": time() + int(ttl_in_seconds),
+            "delta": monotonic() - started,
+        }
+        self._store(
+            redis_key,
+            json_codec.dumps(entry),
+            int(ttl_in_seconds) + int(stale_ttl_in_seconds),
+            namespaces=namespaces,
+        )
+        return api_response
+
+    def _fetch_holding_lock(self, redis_key, token, *fetch_args):
+        try:
+            return self._fetch(redis_key, *fetch_args)
+        finally:
+            self._release_lock(redis_key, token)
+
+    def set(self, key_format, *, ttl_in_seconds=DEFAULT_TTL, stale_ttl_in_seconds=None):
+        """
+        Setting stale_ttl_in_seconds protects a popular key from stampedes. Only
+        one worker (holding a short lock in redis) fetches a missing value, while
+        the others wait for it to appear. Values are refreshed by one worker,
+        sometimes a little before ttl_in_seconds is up, and for a further
+        stale_ttl_in_seconds everyone else carries on using the old value while
+        that happens.
+
+        Workers running code from before stale_ttl_in_seconds existed can't read
+        the entries it writes, so it has no effect until
+        REDIS_STAMPEDE_PROTECTION_ENABLED is turned on, once they've all been
+        replaced.
+        """
+
         def _set(client_method):
             @wraps(client_method)
             def new_client_method(*args, **kwargs):
                 redis_key = RequestCache._make_key(
                     key_format, client_method, args, kwargs
                 )
-                cached = self.redis_client.get(redis_key)
-                if cached:
-                    return json.loads(cached.decode("utf-8"))
-                api_response = client_method(*args, **kwargs)
-                self.redis_client.set(
-                    redis_key,
-                    json.dumps(api_response),
-                    ex=int(ttl_in_seconds),
+                # the lock needs redis, so without it there's no protection
+                protected = (
+                    stale_ttl_in_seconds is not None
+                    and self.stampede_protection
+                    and self.redis_client.active
                 )
-                return api_response
+                fetch_args = (
+                    ttl_in_seconds,
+                    stale_ttl_in_seconds if protected else None,
+                    client_method,
+                    args,
+                    kwargs,
+                )
+                cached = self.get(redis_key)
+
+                if not protected:
+                    if cached and stale_ttl_in_seconds is not None:
+                        # another worker may have stored it with protection on
+                        return self._load_entry(cached)[0]
+                    if cached:
+                        return json_codec.loads(cached)
+                    return self._fetch(redis_key, *fetch_args)
+
+                if cached:
+                    value, fresh_until, delta = self._load_entry(cached)
+                    if not self._should_refresh(fresh_until, delta):
+                        return value
+                    token = self._acquire_lock(redis_key)
+                    if token is None:
+                        # someone else is already refreshing it
+                        return value
+                    return self._fetch_holding_lock(redis_key, token, *fetch_args)
+
+                token = self._acquire_lock(redis_key)
+                if token is not None:
+                    return self._fetch_holding_lock(redis_key, token, *fetch_args)
+
+                cached = self._wait_for(redis_key)
+                if cached:
+                    return self._load_entry(cached)[0]
+
+                # whoever holds the lock is taking too long, so fetch it ourselves
+                return self._fetch(redis_key, *fetch_args)
 
             return new_client_method
 
@@ -72,7 +401,7 @@ class RequestCache:
                     api_response = client_method(*args, **kwargs)
                 finally:
                     redis_key = self._make_key(key_format, client_method, args, kwargs)
-                    self.redis_client.delete(redis_key)
+                    self.invalidate(redis_key)
                 return api_response
 
             return new_client_method
@@ -80,14 +409,34 @@ class RequestCache:
         return _delete
 
     def delete_by_pattern(self, key_format):
+        """
+        Patterns like `service-{service_id}-template-*` declare a namespace: keys
+        in it are tracked as they're set, so they can be deleted without scanning
+        redis. Any other pattern falls back to RedisClient.delete_by_pattern.
+        """
+        namespace_format = self._get_namespace_format(key_format)
+        if (
+            namespace_format is not None
+            and namespace_format not in self._namespace_formats
+        ):
+            self._namespace_formats.append(namespace_format)
+
         def _delete(client_method):
             @wraps(client_method)
             def new_client_method(*args, **kwargs):
                 try:
                     api_response = client_method(*args, **kwargs)
                 finally:
-                    redis_key = self._make_key(key_format, client_method, args, kwargs)
-                    self.redis_client.delete_by_pattern(redis_key)
+                    if namespace_format is not None:
+                        namespace = self._make_key(
+                            namespace_format, client_method, args, kwargs
+                        )
+                        self.invalidate_namespace(namespace)
+                    else:
+                        redis_key = self._make_key(
+                            key_format, client_method, args, kwargs
+                        )
+                        self.invalidate_pattern(redis_key)
                 return api_response
 
             return new_client_method
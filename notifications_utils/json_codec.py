@@ -0,0 +1,57 @@
+"""
+JSON encoding and decoding for API responses and cached values.
+
+A thin wrapper around the standard library which writes compact JSON (no
+whitespace between items, non-ASCII characters left as they are), so cached
+values and requests to the API are as small as they can be, and which is
+shared by the API client, the request cache and Flask so they all agree.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+
+def dumps(obj, *, default=None, sort_keys=False):
+    """
+    Serialise obj to a JSON string
+
+    :param default: called with any object that can't otherwise be serialised
+    :param sort_keys: output dictionaries sorted by key
+    """
+    return json.dumps(
+        obj,
+        default=default,
+        sort_keys=sort_keys,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
+def loads(data):
+    """
+    Deserialise JSON from a str or UTF-8 encoded bytes
+
+    :raises ValueError: if data isn't valid JSON
+    """
+    return json.loads(data)
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """
+    Flask's default JSON provider (used by jsonify and request.get_json), but
+    encoding and decoding with this module. Dates, decimals and dataclasses are
+    still converted by DefaultJSONProvider.default, so responses decode to the
+    same values.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # eg indent, when pretty printing responses in debug mode
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, default=self.default, sort_keys=self.sort_keys)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
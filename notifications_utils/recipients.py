@@ -1,11 +1,11 @@
 import csv
 import re
 import sys
-from collections import namedtuple
+from array import array
+from collections import Counter, namedtuple
+from collections.abc import Sequence
 from contextlib import suppress
 from functools import lru_cache
-from io import StringIO
-from itertools import islice
 
 import phonenumbers
 from flask import current_app
@@ -13,6 +13,7 @@ from ordered_set import OrderedSet
 from phonenumbers.phonenumberutil import NumberParseException
 
 from notifications_utils.formatters import (
+    ALL_WHITESPACE,
     strip_all_whitespace,
     strip_and_remove_obscure_whitespace,
 )
@@ -55,8 +56,14 @@ class RecipientCSV:
         allow_international_sms=False,
         allow_international_letters=False,
         should_validate=True,
+        on_progress=None,
     ):
-        self.file_data = strip_all_whitespace(file_data, extra_characters=",")
+        if isinstance(file_data, str):
+            self.file_data = strip_all_whitespace(file_data, extra_characters=",")
+        else:
+            # UTF-8 encoded bytes, or a file mapped into memory with mmap, which
+            # is decoded a line at a time rather than all at once
+            self.file_data = file_data
         self.max_errors_shown = max_errors_shown
         self.max_initial_rows_shown = max_initial_rows_shown
         self.guestlist = guestlist
@@ -66,15 +73,22 @@ class RecipientCSV:
         self.remaining_messages = remaining_messages
         self.rows_as_list = None
         self.should_validate = should_validate
+        # called with the number of rows checked so far, every few rows
+        self.on_progress = on_progress
 
     def __len__(self):
-        if not hasattr(self, "_len"):
-            self._len = len(self.rows)
-        return self._len
+        return self.summary.row_count
 
     def __getitem__(self, requested_index):
+        # the file is read once into a compact RowList on the first lookup, so
+        # looking up every row in turn doesn't read the file again each time
         return self.rows[requested_index]
 
+    def __iter__(self):
+        if self.rows_as_list is not None:
+            return iter(self.rows_as_list)
+        return self.get_rows()
+
     @property
     def guestlist(self):
         return self._guestlist
@@ -85,6 +99,8 @@ class RecipientCSV:
             self._guestlist = list(value)
         except TypeError:
             self._guestlist = []
+        self.guestlist_index = get_allowlist_index(self._guestlist)
+        self._summary = None
 
     @property
     def template(self):
@@ -119,6 +135,7 @@ class RecipientCSV:
             InsensitiveDict.make_key(placeholder)
             for placeholder in self.recipient_column_headers
         ]
+        self._summary = None
 
     @property
     def has_errors(self):
@@ -128,36 +145,39 @@ class RecipientCSV:
             or self.more_rows_than_can_send
             or self.too_many_rows
             or (not self.allowed_to_send_to)
-            or any(self.rows_with_errors)
+            or self.summary.counts["has_error"]
         )  # `or` is 3x faster than using `any()` here
 
     @property
     def allowed_to_send_to(self):
-        if self.template_type == "letter":
-            return True
-        if not self.guestlist:
-            return True
-        return all(
-            allowed_to_send_to(row.recipient, self.guestlist) for row in self.rows
-        )
+        return self.summary.allowed_to_send_to
+
+    @property
+    def summary(self):
+        if self._summary is None:
+            self._summary = RecipientCSVSummary(self)
+        return self._summary
 
     @property
     def rows(self):
         if self.rows_as_list is None:
-            self.rows_as_list = list(self.get_rows())
+            self.rows_as_list = RowList(self)
         return self.rows_as_list
 
     @property
     def _rows(self):
         return csv.reader(
-            StringIO(self.file_data.strip()),
+            (
+                _iter_lines(self.file_data.strip())
+                if isinstance(self.file_data, str)
+                else _iter_encoded_lines(self.file_data)
+            ),
             quoting=csv.QUOTE_MINIMAL,
             skipinitialspace=True,
         )
 
     def get_rows(self):
         column_headers = self._raw_column_headers  # this is for caching
-        length_of_column_headers = len(column_headers)
 
         rows_as_lists_of_columns = self._rows
 
@@ -168,39 +188,42 @@ class RecipientCSV:
                 yield None
                 continue
 
-            output_dict = {}
+            yield self._make_row(index, row, column_headers)
 
-            for column_name, column_value in zip(column_headers, row):
-                column_value = strip_and_remove_obscure_whitespace(column_value)
+    def _make_row(self, index, row, column_headers):
+        length_of_column_headers = len(column_headers)
 
-                if (
-                    InsensitiveDict.make_key(column_name)
-                    in self.recipient_column_headers_as_column_keys
-                ):
-                    output_dict[column_name] = column_value or None
-                else:
-                    insert_or_append_to_dict(
-                        output_dict, column_name, column_value or None
-                    )
+        output_dict = {}
 
-            length_of_row = len(row)
-
-            if length_of_column_headers < length_of_row:
-                output_dict[None] = row[length_of_column_headers:]
-            elif length_of_column_headers > length_of_row:
-                for key in column_headers[length_of_row:]:
-                    insert_or_append_to_dict(output_dict, key, None)
-
-            yield Row(
-                output_dict,
-                index=index,
-                error_fn=self._get_error_for_field,
-                recipient_column_headers=self.recipient_column_headers,
-                placeholders=self.placeholders_as_column_keys,
-                template=self.template,
-                allow_international_letters=self.allow_international_letters,
-                validate_row=self.should_validate,
-            )
+        for column_name, column_value in zip(column_headers, row):
+            column_value = strip_and_remove_obscure_whitespace(column_value)
+
+            if (
+                InsensitiveDict.make_key(column_name)
+                in self.recipient_column_headers_as_column_keys
+            ):
+                output_dict[column_name] = column_value or None
+            else:
+                insert_or_append_to_dict(output_dict, column_name, column_value or None)
+
+        length_of_row = len(row)
+
+        if length_of_column_headers < length_of_row:
+            output_dict[None] = row[length_of_column_headers:]
+        elif length_of_column_headers > length_of_row:
+            for key in column_headers[length_of_row:]:
+                insert_or_append_to_dict(output_dict, key, None)
+
+        return Row(
+            output_dict,
+            index=index,
+            error_fn=self._get_error_for_field,
+            recipient_column_headers=self.recipient_column_headers,
+            placeholders=self.placeholders_as_column_keys,
+            template=self.template,
+            allow_international_letters=self.allow_international_letters,
+            validate_row=self.should_validate,
+        )
 
     @property
     def more_rows_than_can_send(self):
@@ -212,16 +235,18 @@ class RecipientCSV:
 
     @property
     def initial_rows(self):
-        return islice(self.rows, self.max_initial_rows_shown)
+        return iter(self.summary.initial_rows)
 
     @property
     def displayed_rows(self):
-        if any(self.rows_with_errors) and not self.missing_column_headers:
+        if self.summary.counts["has_error"] and not self.missing_column_headers:
             return self.initial_rows_with_errors
         return self.initial_rows
 
     def _filter_rows(self, attr):
-        return (row for row in self.rows if row and getattr(row, attr))
+        if isinstance(self.rows_as_list, RowList):
+            return self.rows_as_list.rows_with(attr)
+        return (row for row in self if row and getattr(row, attr))
 
     @property
     def rows_with_errors(self):
@@ -245,7 +270,7 @@ class RecipientCSV:
 
     @property
     def initial_rows_with_errors(self):
-        return islice(self.rows_with_errors, self.max_errors_shown)
+        return iter(self.summary.initial_rows_with_errors)
 
     @property
     def _raw_column_headers(self):
@@ -359,6 +384,225 @@ class RecipientCSV:
             return Cell.missing_field_error
 
 
+def _iter_lines(data):
+    # the same lines as iterating over StringIO(data), without copying the
+    # whole of data into a StringIO, which stores 4 bytes for every character
+    start = 0
+    while start < len(data):
+        end = data.find("\n", start)
+        end = len(data) if end == -1 else end + 1
+        yield data[start:end]
+        start = end
+
+
+def _encode_characters(characters):
+    return tuple(character.encode("utf-8") for character in characters)
+
+
+# what strip_all_whitespace(data, ",") removes, then what data.strip() removes
+_STRIPPED_ENCODED_CHARACTERS = (
+    _encode_characters(ALL_WHITESPACE + ","),
+    # U+3000, the ideographic space, is the last whitespace character
+    _encode_characters(chr(i) for i in range(0x3001) if chr(i).isspace()),
+)
+
+
+def _get_stripped_span(data):
+    # where data starts and ends once it's been stripped in the same way as a
+    # string, without decoding it
+    start, end = 0, len(data)
+    for stripped_characters in _STRIPPED_ENCODED_CHARACTERS:
+        while start < end:
+            for character in stripped_characters:
+                character_end = start + len(character)
+                if data[start:character_end] == character:
+                    start = character_end
+                    break
+            else:
+                break
+        while end > start:
+            for character in stripped_characters:
+                character_start = max(end - len(character), start)
+                if data[character_start:end] == character:
+                    end = character_start
+                    break
+            else:
+                break
+    return start, end
+
+
+def _iter_encoded_lines(data):
+    # the same lines as _iter_lines for the decoded and stripped data,
+    # decoding one at a time so that data is never all decoded at once
+    start, end = _get_stripped_span(data)
+    while start < end:
+        line_end = data.find(b"\n", start, end)
+        line_end = end if line_end == -1 else line_end + 1
+        yield data[start:line_end].decode("utf-8")
+        start = line_end
+
+
+class RecipientCSVSummary:
+    """
+    Everything we need to know about a RecipientCSV's rows, worked out by
+    reading the file once. Only the rows which get displayed are kept, so
+    memory use doesn't grow with the size of the file.
+    """
+
+    progress_interval = 1000
+
+    row_flags = (
+        "has_error",
+        "has_bad_recipient",
+        "has_missing_data",
+        "message_too_long",
+        "message_empty",
+    )
+
+    def __init__(self, recipients):
+        self.row_count = 0
+        self.counts = Counter()
+        # how many rows have an error in each column, keyed like a Row
+        self.column_error_counts = Counter()
+        self.initial_rows = []
+        self.initial_rows_with_errors = []
+        self.allowed_to_send_to = True
+
+        check_guestlist = bool(
+            recipients.template_type != "letter" and recipients.guestlist
+        )
+        # recipients as they're written in the file which we've already found
+        # in the guestlist, so each one is only formatted once
+        recipients_in_guestlist = set()
+
+        for row in recipients:
+            self.row_count += 1
+
+            if recipients.on_progress and self.row_count % self.progress_interval == 0:
+                recipients.on_progress(self.row_count)
+
+            if len(self.initial_rows) < recipients.max_initial_rows_shown:
+                self.initial_rows.append(row)
+
+            if row is None:
+                # beyond max_rows, so not processed
+                continue
+
+            cell_errors = row.cell_errors
+            flags = self.get_row_flags(row, cell_errors)
+            self.counts.update(flags)
+            self.column_error_counts.update(cell_errors.keys())
+
+            if (
+                "has_error" in flags
+                and len(self.initial_rows_with_errors) < recipients.max_errors_shown
+            ):
+                self.initial_rows_with_errors.append(row)
+
+            if (
+                check_guestlist
+                and self.allowed_to_send_to
+                and row.recipient not in recipients_in_guestlist
+            ):
+                if format_recipient(row.recipient) in recipients.guestlist_index:
+                    recipients_in_guestlist.add(row.recipient)
+                else:
+                    self.allowed_to_send_to = False
+
+    @staticmethod
+    def get_row_flags(row, cell_errors):
+        """
+        Which of `row_flags` apply to the row. This gives the same answers as
+        the properties of `Row`, but reads each of the row's cells once, from
+        `cell_errors`, rather than once for every property.
+        """
+        flags = set()
+        if cell_errors or row.has_error_spanning_multiple_cells:
+            flags.add("has_error")
+        if row.has_bad_recipient:
+            flags.add("has_bad_recipient")
+        if Cell.missing_field_error in cell_errors.values():
+            flags.add("has_missing_data")
+        if row.message_too_long:
+            flags.add("message_too_long")
+        if row.message_empty:
+            flags.add("message_empty")
+        return flags
+
+    def errors_in_column(self, column):
+        return self.column_error_counts[InsensitiveDict.make_key(column)]
+
+
+class RowList(Sequence):
+    """
+    The rows of a RecipientCSV, stored as a list of values for each column of
+    the file and a byte of flags for each row. A `Row` and its `Cell`s take
+    many times more memory than the values they hold, so they're only made
+    (and validated again) when a row is looked at.
+    """
+
+    def __init__(self, recipients):
+        self._recipients = recipients
+        self._column_headers = recipients._raw_column_headers
+        self._columns = []
+        # how many values each row has, or -1 for rows beyond max_rows
+        self._lengths = array("l")
+        self._flags = bytearray()
+
+        rows = recipients._rows
+        next(rows, None)  # skip the header row
+
+        for index, values in enumerate(rows):
+            if index >= recipients.max_rows:
+                self._lengths.append(-1)
+                self._flags.append(0)
+                continue
+
+            while len(self._columns) < len(values):
+                self._columns.append([None] * len(self._lengths))
+            for column_index, column in enumerate(self._columns):
+                column.append(
+                    values[column_index] if column_index < len(values) else None
+                )
+            self._lengths.append(len(values))
+
+            if not recipients.should_validate:
+                self._flags.append(0)
+                continue
+            row = recipients._make_row(index, values, self._column_headers)
+            flags = RecipientCSVSummary.get_row_flags(row, row.cell_errors)
+            self._flags.append(
+                sum(
+                    1 << bit
+                    for bit, flag in enumerate(RecipientCSVSummary.row_flags)
+                    if flag in flags
+                )
+            )
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("RowList index out of range")
+
+        length = self._lengths[index]
+        if length < 0:
+            return None
+
+        return self._recipients._make_row(
+            index,
+            [column[index] for column in self._columns[:length]],
+            self._column_headers,
+        )
+
+    def rows_with(self, flag):
+        bit = 1 << RecipientCSVSummary.row_flags.index(flag)
+        return (self[index] for index, flags in enumerate(self._flags) if flags & bit)
+
+
 class Row(InsensitiveDict):
     message_too_long = False
     message_empty = False
@@ -419,6 +663,10 @@ class Row(InsensitiveDict):
             cell.error for cell in self.values()
         )
 
+    @property
+    def cell_errors(self):
+        return {key: cell.error for key, cell in self.items() if cell.error}
+
     @property
     def has_bad_recipient(self):
         if self.template_type == "letter":
@@ -465,6 +713,8 @@ class Row(InsensitiveDict):
 
 
 class Cell:
+    __slots__ = ("data", "error", "ignore")
+
     missing_field_error = "Missing"
 
     def __init__(self, key=None, value=None, error_fn=None, placeholders=None):
@@ -524,14 +774,26 @@ international_phone_info = namedtuple(
 )
 
 
+phone_number_check = namedtuple(
+    "PhoneNumberCheck",
+    [
+        "number",
+        "country_prefix",
+        "international",
+        "error",
+    ],
+)
+
+
 def get_international_phone_info(number):
-    number = validate_phone_number(number, international=True)
-    prefix = _get_country_code(number)
+    check = check_phone_number(number, international=True)
+    if check.error:
+        raise InvalidPhoneError(check.error)
 
     return international_phone_info(
-        international=(prefix != us_prefix),
-        country_prefix=prefix,
-        billable_units=get_billable_units_for_prefix(prefix),
+        international=check.international,
+        country_prefix=check.country_prefix,
+        billable_units=get_billable_units_for_prefix(check.country_prefix),
     )
 
 
@@ -561,7 +823,10 @@ _NANP_COUNTRY_AREA_CODES = [
 
 
 def _get_country_code(number):
-    parsed = phonenumbers.parse(number, "US")
+    return _get_country_code_for_parsed_number(phonenumbers.parse(number, "US"))
+
+
+def _get_country_code_for_parsed_number(parsed):
     country_code = str(parsed.country_code)
     if country_code == us_prefix:
         area_code = str(parsed.national_number)[:3]
@@ -585,39 +850,75 @@ def use_numeric_sender(number):
 
 
 def validate_us_phone_number(number):
+    return validate_phone_number(number)
+
+
+def validate_phone_number(number, international=False):
+    check = check_phone_number(number, international)
+    if check.error:
+        raise InvalidPhoneError(check.error)
+    return check.number
+
+
+@lru_cache(maxsize=10_000, typed=False)
+def check_phone_number(number, international=False):
+    """
+    Validates and formats a phone number, and works out its country prefix, by
+    parsing it once (or twice for international numbers from outside the US).
+
+    The same numbers turn up many times in a spreadsheet, and on pages which
+    list notifications, so the outcome is cached rather than parsed again.
+    """
     try:
         parsed = phonenumbers.parse(number, "US")
-        if not is_us_phone_number(number):
-            raise InvalidPhoneError("Not a US number")
-        if phonenumbers.is_valid_number(parsed):
-            return normalize_phone_number(parsed)
-        if len(str(parsed.national_number)) > 10:
-            raise InvalidPhoneError("Too many digits")
-        if len(str(parsed.national_number)) < 10:
-            raise InvalidPhoneError("Not enough digits")
-        if phonenumbers.is_possible_number(parsed):
-            raise InvalidPhoneError("Phone number range is not in use")
-        raise InvalidPhoneError("Phone number is not possible")
     except NumberParseException as exc:
-        raise InvalidPhoneError(exc._msg) from exc
+        if international:
+            return _check_international_phone_number(number)
+        return phone_number_check(None, None, False, exc._msg)
 
+    country_prefix = _get_country_code_for_parsed_number(parsed)
+
+    if international and country_prefix != us_prefix:
+        return _check_international_phone_number(number)
+
+    if country_prefix != us_prefix:
+        error = "Not a US number"
+    elif phonenumbers.is_valid_number(parsed):
+        return phone_number_check(
+            normalize_phone_number(parsed), country_prefix, False, None
+        )
+    elif len(str(parsed.national_number)) > 10:
+        error = "Too many digits"
+    elif len(str(parsed.national_number)) < 10:
+        error = "Not enough digits"
+    elif phonenumbers.is_possible_number(parsed):
+        error = "Phone number range is not in use"
+    else:
+        error = "Phone number is not possible"
+    return phone_number_check(None, country_prefix, False, error)
 
-def validate_phone_number(number, international=False):
-    if (not international) or is_us_phone_number(number):
-        return validate_us_phone_number(number)
 
+def _check_international_phone_number(number):
     try:
         parsed = phonenumbers.parse(number, None)
-        number = f"{parsed.country_code}{parsed.national_number}"
-        if len(number) < 8:
-            raise InvalidPhoneError("Not enough digits")
-        if len(number) > 15:
-            raise InvalidPhoneError("Too many digits")
-        return normalize_phone_number(parsed)
     except NumberParseException as exc:
         if exc._msg == "Could not interpret numbers after plus-sign.":
-            raise InvalidPhoneError("Not a valid country prefix") from exc
-        raise InvalidPhoneError(exc._msg) from exc
+            return phone_number_check(None, None, True, "Not a valid country prefix")
+        return phone_number_check(None, None, True, exc._msg)
+
+    digits = f"{parsed.country_code}{parsed.national_number}"
+    if len(digits) < 8:
+        return phone_number_check(None, None, True, "Not enough digits")
+    if len(digits) > 15:
+        return phone_number_check(None, None, True, "Too many digits")
+
+    country_prefix = _get_country_code_for_parsed_number(parsed)
+    return phone_number_check(
+        normalize_phone_number(parsed),
+        country_prefix,
+        country_prefix != us_prefix,
+        None,
+    )
 
 
 validate_and_format_phone_number = validate_phone_number
@@ -703,25 +1004,31 @@ def format_recipient(recipient):
 
 
 def format_phone_number_human_readable(phone_number):
-    try:
-        phone_number = validate_phone_number(phone_number, international=True)
-    except InvalidPhoneError:
+    check = check_phone_number(phone_number, international=True)
+    if check.error:
         # if there was a validation error, we want to shortcut out here, but still display the number on the front end
         return phone_number
-    international_phone_info = get_international_phone_info(phone_number)
 
     return phonenumbers.format_number(
-        phonenumbers.parse(phone_number, None),
+        phonenumbers.parse(check.number, None),
         (
             phonenumbers.PhoneNumberFormat.INTERNATIONAL
-            if international_phone_info.international
+            if check.international
             else phonenumbers.PhoneNumberFormat.NATIONAL
         ),
     )
 
 
+def get_allowlist_index(allowlist):
+    """
+    Formats every recipient in an allowlist once, so that checking lots of
+    recipients against it doesn't have to format them all again each time
+    """
+    return frozenset(format_recipient(recipient) for recipient in allowlist)
+
+
 def allowed_to_send_to(recipient, allowlist):
-    return format_recipient(recipient) in {format_recipient(x) for x in allowlist}
+    return format_recipient(recipient) in get_allowlist_index(allowlist)
 
 
 def insert_or_append_to_dict(dict_, key, value):
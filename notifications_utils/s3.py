@@ -1,4 +1,5 @@
 import os
+import threading
 import urllib
 
 import botocore
@@ -21,6 +22,61 @@ default_secret_access_key = os.environ.get("AWS_SECRET_ACCESS_KEY")
 default_region = os.environ.get("AWS_REGION")
 
 
+class S3Resources:
+    """
+    boto3 S3 resources, made once for each set of credentials, region and
+    config and then reused. Making a new session for every call looks up
+    credentials and endpoints again and opens new connections.
+
+    Greenlets in a worker share them, which is safe because they run in the
+    same thread. They're made again after a fork, because the connections in
+    their pools can't be shared between processes.
+    """
+
+    def __init__(self):
+        self.max_pool_connections = None
+        self._resources = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_pool_connections = app.config["S3_MAX_POOL_CONNECTIONS"]
+        self.clear()
+
+    def get(self, access_key, secret_key, region, config=None):
+        if self._pid != os.getpid():
+            self.clear()
+        key = (access_key, secret_key, region, config)
+        resource = self._resources.get(key)
+        if resource is None:
+            with self._lock:
+                resource = self._resources.get(key)
+                if resource is None:
+                    resource = self._resources[key] = self._create(
+                        access_key, secret_key, region, config
+                    )
+        return resource
+
+    def _create(self, access_key, secret_key, region, config):
+        session = Session(
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+        )
+        if self.max_pool_connections:
+            config = (config or Config()).merge(
+                Config(max_pool_connections=self.max_pool_connections)
+            )
+        return session.resource("s3", config=config)
+
+    def clear(self):
+        self._resources = {}
+        self._pid = os.getpid()
+
+
+s3_resources = S3Resources()
+
+
 def s3upload(
     filedata,
     region,
@@ -32,15 +88,7 @@ def s3upload(
     access_key=default_access_key_id,
     secret_key=default_secret_access_key,
 ):
-    session = Session(
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        region_name=region,
-    )
-    _s3 = session.resource(
-        "s3",
-        config=AWS_CLIENT_CONFIG,
-    )
+    _s3 = s3_resources.get(access_key, secret_key, region, config=AWS_CLIENT_CONFIG)
     # This 'proves' that use of moto in the relevant tests in test_send.py
     # mocks everything related to S3.  What you will see in the logs is:
     # Exception: CREATED AT <MagicMock name='resource().Bucket().creation_date' id='4665562448'>
@@ -89,12 +137,7 @@ def s3download(
     secret_key=default_secret_access_key,
 ):
     try:
-        session = Session(
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region,
-        )
-        s3 = session.resource("s3", config=AWS_CLIENT_CONFIG)
+        s3 = s3_resources.get(access_key, secret_key, region, config=AWS_CLIENT_CONFIG)
         key = s3.Object(bucket_name, filename)
         # This 'proves' that use of moto in the relevant tests in test_send.py
         # mocks everything related to S3.  What you will see in the logs is:
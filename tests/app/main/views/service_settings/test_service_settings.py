@@ -2038,7 +2038,7 @@ def test_archive_service_after_confirm(
     redis_delete_mock = mocker.patch(
         "app.notify_client.service_api_client.redis_client.delete"
     )
-    mocker.patch("app.notify_client.service_api_client.redis_client.delete_by_pattern")
+    mocker.patch("app.notify_client.service_api_client.redis_client.delete_tracked")
 
     client_request.login(user)
     page = client_request.post(
@@ -2085,7 +2085,7 @@ def test_archive_service_after_confirm_error(
     mocker.patch("app.service_api_client.post")
     mocker.patch("app.main.views.service_settings.create_archive_service_event")
     mocker.patch("app.notify_client.service_api_client.redis_client.delete")
-    mocker.patch("app.notify_client.service_api_client.redis_client.delete_by_pattern")
+    mocker.patch("app.notify_client.service_api_client.redis_client.delete_tracked")
 
     client_request.login(user)
     with pytest.raises(expected_exception=AssertionError):
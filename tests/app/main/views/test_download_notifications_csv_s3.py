@@ -1,6 +1,7 @@
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 from app.main.views.notifications import PERIOD_TO_S3_FILENAME
+from notifications_utils.s3 import S3ObjectNotFound
 from tests.conftest import SERVICE_ONE_ID
 
 
@@ -113,3 +114,57 @@ def test_s3_csv_gets_timezone_converted(
     assert call_args[0][0] == b"csv,data"
     assert "user_timezone" in call_args[1]
     assert response.status_code == 200
+
+
+@patch("app.main.views.notifications.get_converted_report_url")
+@patch("app.main.views.notifications.s3download")
+def test_general_reports_redirect_to_s3_if_enabled(
+    mock_s3download,
+    mock_get_converted_report_url,
+    notify_admin,
+    mocker,
+    client_request,
+    service_one,
+    mock_get_service_data_retention,
+):
+    mocker.patch.dict(notify_admin.config, {"REPORT_DOWNLOAD_PRESIGNED_URLS": True})
+    mock_get_converted_report_url.return_value = "https://s3.example.com/report.csv"
+
+    client_request.get(
+        "main.download_notifications_csv",
+        service_id=SERVICE_ONE_ID,
+        number_of_days="seven_day",
+        message_type="sms",
+        _expected_redirect="https://s3.example.com/report.csv",
+    )
+
+    mock_get_converted_report_url.assert_called_once_with(
+        SERVICE_ONE_ID, "7-day-report", "America/New_York", ANY
+    )
+    assert mock_get_converted_report_url.call_args[0][3].endswith(
+        " - sms - service one report.csv"
+    )
+    mock_s3download.assert_not_called()
+
+
+@patch("app.main.views.notifications.get_converted_report_url")
+def test_missing_s3_file_redirects_gracefully_if_redirecting_to_s3(
+    mock_get_converted_report_url,
+    notify_admin,
+    mocker,
+    client_request,
+    service_one,
+    mock_get_service_data_retention,
+):
+    mocker.patch.dict(notify_admin.config, {"REPORT_DOWNLOAD_PRESIGNED_URLS": True})
+    mock_get_converted_report_url.side_effect = S3ObjectNotFound(
+        {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+    )
+
+    client_request.get(
+        "main.download_notifications_csv",
+        service_id=SERVICE_ONE_ID,
+        number_of_days="five_day",
+        message_type="sms",
+        _expected_redirect=f"/activity/services/{SERVICE_ONE_ID}",
+    )
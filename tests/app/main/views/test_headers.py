@@ -1,5 +1,9 @@
 from re import search
 
+import pytest
+
+from app import _csp
+
 
 def test_owasp_useful_headers_set(
     client_request,
@@ -51,3 +55,32 @@ def test_owasp_useful_headers_set(
 
     # Test for Cross-Origin-Embedder-Policy header
     assert response.headers["Cross-Origin-Embedder-Policy"] == "credentialless"
+
+
+@pytest.mark.parametrize(
+    ("enabled", "expected_source_count"),
+    [
+        (True, 1),
+        (False, 0),
+    ],
+)
+def test_csp_allows_direct_uploads_to_the_csv_bucket_if_enabled(
+    notify_admin, enabled, expected_source_count
+):
+    config = {
+        **notify_admin.config,
+        "CSV_DIRECT_UPLOADS": enabled,
+        "CSV_UPLOAD_BUCKET": {
+            "bucket": "test-csv-upload",
+            "region": "us-gov-west-1",
+            "access_key_id": "testing",
+            "secret_access_key": "testing",
+        },
+    }
+
+    assert (
+        _csp(config)["connect-src"].count(
+            "https://test-csv-upload.s3-fips.us-gov-west-1.amazonaws.com"
+        )
+        == expected_source_count
+    )
@@ -12,6 +12,7 @@ from app.enums import ServicePermission
 from app.main.views.platform_admin import (
     create_global_stats,
     format_stats_by_service,
+    get_redis_key_family,
     get_tech_failure_status_box_data,
     is_over_threshold,
     sum_service_usage,
@@ -743,6 +744,64 @@ def test_platform_admin_displays_stats_in_right_boxes_and_with_correct_styling(
     )
 
 
+def test_get_redis_report_streams_keys_and_aggregates_key_families(
+    client_request,
+    platform_admin_user,
+    mocker,
+):
+    redis = mocker.patch("app.main.views.platform_admin.redis_client")
+    redis.info.return_value = {
+        "used_memory_human": "1M",
+        "maxmemory_human": "0B",
+        "mem_fragmentation_ratio": 1.2,
+    }
+    redis.scan_key_details.return_value = iter(
+        [
+            (f"service-{SERVICE_ONE_ID}-templates".encode(), b"string", 30, 1000),
+            (f"service-{SERVICE_TWO_ID}-templates".encode(), b"string", 3600, 3000),
+            (b"login-state-Zx_9-Kp2aLq8", b"string", 300, 100),
+            (b"some-counter", b"string", -1, 50),
+        ]
+    )
+    client_request.login(platform_admin_user)
+
+    response = client_request.get_response("main.get_redis_report")
+
+    assert response.is_streamed
+    report = response.get_data(as_text=True)
+    assert ",300 seconds,string,login-state-Zx_9-Kp2aLq8,100\r\n" in report
+    assert ",No Expiry,string,some-counter,50\r\n" in report
+    assert report.split("Key Families\r\n")[1].splitlines() == [
+        ",Key Family,Keys,Total Bytes,Under A Minute,Under An Hour,Under A Day,"
+        "Under A Week,A Week Or More,No Expiry",
+        ",service-*-templates,2,4000,1,0,1,0,0,0",
+        ",login-state-*,1,100,0,1,0,0,0,0",
+        ",some-counter,1,50,0,0,0,0,0,1",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("key", "expected_family"),
+    [
+        (f"service-{SERVICE_ONE_ID}", "service-*"),
+        (
+            f"service-{SERVICE_ONE_ID}-template-{SERVICE_TWO_ID}-version-None",
+            "service-*-template-*-version-*",
+        ),
+        (
+            f"service-{SERVICE_ONE_ID}-template-{SERVICE_TWO_ID}-version-12",
+            "service-*-template-*-version-*",
+        ),
+        (f"has_jobs-{SERVICE_ONE_ID}", "has_jobs-*"),
+        ("login-state-Zx_9-abcdefghijklmnopqrstuvwxyz", "login-state-*"),
+        ("performance-stats-2024-01-01-to-2024-01-07", "performance-stats-*-to-*"),
+        ("organizations", "organizations"),
+    ],
+)
+def test_get_redis_key_family(key, expected_family):
+    assert get_redis_key_family(key) == expected_family
+
+
 def test_clear_cache_shows_form(
     client_request,
     platform_admin_user,
@@ -807,7 +866,7 @@ def test_clear_cache_submits_and_tells_you_how_many_things_were_deleted(
     expected_calls,
     expected_confirmation,
 ):
-    redis = mocker.patch("app.main.views.platform_admin.redis_client")
+    redis = mocker.patch("app.main.views.platform_admin.cache.redis_client")
     redis.delete_by_pattern.return_value = 2
     client_request.login(platform_admin_user)
 
@@ -1,3 +1,5 @@
+import json
+import pickle
 import uuid
 from functools import partial
 from glob import glob
@@ -5,7 +7,7 @@ from io import BytesIO
 from itertools import repeat
 from os import path
 from random import randbytes
-from unittest.mock import ANY
+from unittest.mock import ANY, call
 from uuid import uuid4
 from zipfile import BadZipFile
 
@@ -15,8 +17,12 @@ from xlrd.biffh import XLRDError
 from xlrd.xldate import XLDateAmbiguous, XLDateError, XLDateNegative, XLDateTooLarge
 
 from app.enums import ServicePermission
+from app.models.spreadsheet import TooManyRowsError
+from app.utils.csv import report_csv_check_progress
+from app.utils.spool import SpooledFile, upload_spool
 from notifications_python_client.errors import HTTPError
 from notifications_utils.recipients import RecipientCSV
+from notifications_utils.s3 import S3ObjectNotFound
 from notifications_utils.template import SMSPreviewTemplate
 from tests import (
     sample_uuid,
@@ -547,6 +553,13 @@ def test_send_messages_sanitises_and_truncates_file_name_for_metadata(
                 "Try formatting all columns as ‘text’ or export your file as CSV."
             ),
         ),
+        (
+            TooManyRowsError,
+            (
+                "example.xlsx has too many rows. "
+                "Notify can process up to 100,000 rows at once."
+            ),
+        ),
     ],
 )
 def test_shows_error_if_parsing_exception(
@@ -1060,6 +1073,50 @@ def test_upload_valid_csv_shows_preview_and_table(
             assert normalize_spaces(str(row.select("td")[index])) == cell
 
 
+def test_check_messages_shows_how_many_errors_there_are_in_each_column(
+    client_request,
+    mocker,
+    mock_get_live_service,
+    mock_get_service_template_with_placeholders,
+    mock_get_users_by_service,
+    mock_get_service_statistics,
+    mock_get_job_doesnt_exist,
+    mock_get_jobs,
+    fake_uuid,
+):
+    mocker.patch(
+        "app.main.views.send.get_csv_metadata",
+        return_value={"original_file_name": "example.csv"},
+    )
+    with client_request.session_transaction() as session:
+        session["file_uploads"] = {fake_uuid: {"template_id": fake_uuid}}
+
+    mocker.patch(
+        "app.main.views.send.s3download",
+        return_value="""
+        phone number,name
+        12345,Jo
+        2028675301,
+        12345,
+        2028675302,Sam
+    """,
+    )
+
+    page = client_request.get(
+        "main.check_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=fake_uuid,
+        _test_page_title=False,
+    )
+
+    assert [normalize_spaces(heading.text) for heading in page.select("thead th")] == [
+        "Row in file1",
+        "phone number 2 errors",
+        "name 2 errors",
+    ]
+
+
 def test_show_all_columns_if_there_are_duplicate_recipient_columns(
     client_request,
     mocker,
@@ -1157,6 +1214,46 @@ def test_404_for_previewing_a_row_out_of_range(
     )
 
 
+def test_previewing_a_row_not_shown_on_the_check_page_reads_only_that_far(
+    client_request,
+    mocker,
+    mock_get_live_service,
+    mock_get_service_template_with_placeholders,
+    mock_get_users_by_service,
+    mock_get_service_statistics,
+    mock_get_job_doesnt_exist,
+    mock_get_jobs,
+    fake_uuid,
+):
+    mocker.patch("app.main.views.send.set_metadata_on_csv_upload")
+    mocker.patch(
+        "app.main.views.send.get_csv_metadata",
+        return_value={"original_file_name": "example.csv"},
+    )
+    with client_request.session_transaction() as session:
+        session["file_uploads"] = {fake_uuid: {"template_id": fake_uuid}}
+    contents = "phone number,name\n" + "".join(
+        f"202867{i:04},name {i}\n" for i in range(100)
+    )
+    mocker.patch("app.main.views.send.s3download", return_value=contents)
+    mock_get_csv_upload_rows = mocker.patch(
+        "app.main.views.send.get_csv_upload_rows",
+        return_value=mocker.Mock(get_rows=mocker.Mock(return_value=contents)),
+    )
+
+    page = client_request.get(
+        "main.check_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=fake_uuid,
+        row_index=80,
+    )
+
+    assert "name 78" in page.select_one(".sms-message-wrapper").text
+    mock_get_csv_upload_rows.assert_called_once_with(SERVICE_ONE_ID, fake_uuid)
+    mock_get_csv_upload_rows.return_value.get_rows.assert_called_once_with(79)
+
+
 @pytest.mark.parametrize("template_type", ["sms", "email"])
 def test_send_one_off_step_redirects_to_start_if_session_not_setup(
     mocker,
@@ -1979,7 +2076,7 @@ def test_upload_csvfile_with_international_validates(
 
     mocker.patch("app.main.views.send.s3download", return_value="")
     mock_recipients = mocker.patch(
-        "app.main.views.send.RecipientCSV",
+        "app.utils.csv.RecipientCSV",
         return_value=RecipientCSV(
             "", template=SMSPreviewTemplate({"content": "foo", "template_type": "sms"})
         ),
@@ -2295,6 +2392,654 @@ def test_check_messages_back_link(
     assert actual_href == expected_href
 
 
+def test_upload_starts_checking_the_file_in_the_background(
+    client_request,
+    service_one,
+    mocker,
+    mock_get_service_template,
+    mock_get_users_by_service,
+    fake_uuid,
+):
+    mocker.patch("app.main.views.send.set_metadata_on_csv_upload")
+    mocker.patch("app.main.views.send.s3upload", return_value=sample_uuid())
+    mocker.patch("app.main.views.send.monkey.is_module_patched", return_value=True)
+    mocker.patch("app.main.views.send.process_pool.enabled", True)
+    mocker.patch("app.extensions.redis_client.active", True)
+    mock_redis_set = mocker.patch("app.extensions.redis_client.set")
+    mock_spawn = mocker.patch("app.main.views.send.gevent.spawn")
+
+    client_request.post(
+        "main.send_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        _data={"file": (BytesIO(b"phone number\n202 867 5301"), "example.csv")},
+        _content_type="multipart/form-data",
+        _expected_status=302,
+    )
+
+    key, progress = mock_redis_set.call_args.args
+    assert key == f"csv-check-progress-{SERVICE_ONE_ID}-{sample_uuid()}"
+    assert json.loads(progress) == {
+        "status": "checking",
+        "rows_checked": 0,
+        "total_rows": None,
+    }
+    assert mock_redis_set.call_args.kwargs == {"ex": 300}
+    assert mock_spawn.call_args.args[0].__name__ == "_run_csv_check"
+    assert mock_spawn.call_args.args[2:4] == (SERVICE_ONE_ID, sample_uuid())
+
+
+@pytest.mark.parametrize(
+    ("gevent_patched", "process_pool_enabled"),
+    [
+        (False, True),
+        (True, False),
+    ],
+)
+def test_upload_does_not_check_the_file_in_the_background_without_gevent_or_the_pool(
+    client_request,
+    mocker,
+    mock_get_service_template,
+    fake_uuid,
+    gevent_patched,
+    process_pool_enabled,
+):
+    mocker.patch("app.main.views.send.set_metadata_on_csv_upload")
+    mocker.patch("app.main.views.send.s3upload", return_value=sample_uuid())
+    mocker.patch(
+        "app.main.views.send.monkey.is_module_patched", return_value=gevent_patched
+    )
+    mocker.patch("app.main.views.send.process_pool.enabled", process_pool_enabled)
+    mocker.patch("app.extensions.redis_client.active", True)
+    mock_spawn = mocker.patch("app.main.views.send.gevent.spawn")
+
+    client_request.post(
+        "main.send_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        _data={"file": (BytesIO(b"phone number\n202 867 5301"), "example.csv")},
+        _content_type="multipart/form-data",
+        _expected_status=302,
+    )
+
+    assert not mock_spawn.called
+
+
+def test_upload_spools_big_files_to_disk(
+    client_request,
+    mocker,
+    mock_get_service_template,
+    fake_uuid,
+    tmp_path,
+):
+    mocker.patch.object(upload_spool, "threshold", 10)
+    mocker.patch.object(upload_spool, "directory", str(tmp_path))
+    mocker.patch("app.main.views.send.set_metadata_on_csv_upload")
+    uploaded = {}
+
+    def _s3upload(service_id, filedata):
+        with filedata["data"].open() as file:
+            uploaded[filedata["file_name"]] = file.read()
+        return sample_uuid()
+
+    mocker.patch("app.main.views.send.s3upload", side_effect=_s3upload)
+
+    client_request.post(
+        "main.send_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        _data={
+            "file": (
+                BytesIO(b"phone number\n\n202 867 5301\n202 867 5302\n"),
+                "example.csv",
+            )
+        },
+        _content_type="multipart/form-data",
+        _expected_status=302,
+    )
+
+    assert uploaded == {"example.csv": b"phone number\r\n202 867 5301\r\n202 867 5302"}
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    ("enabled", "expected_url"),
+    [
+        (True, f"/services/{SERVICE_ONE_ID}/send/{sample_uuid()}/csv/direct-upload"),
+        (False, None),
+    ],
+)
+def test_send_messages_page_only_offers_direct_uploads_if_enabled(
+    client_request,
+    notify_admin,
+    mocker,
+    mock_get_service_template,
+    enabled,
+    expected_url,
+):
+    mocker.patch.dict(notify_admin.config, {"CSV_DIRECT_UPLOADS": enabled})
+
+    page = client_request.get(
+        "main.send_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=sample_uuid(),
+    )
+
+    form = page.select_one("form[data-module=file-upload]")
+    assert form.get("data-direct-upload-url") == expected_url
+
+
+def test_get_direct_csv_upload_form(
+    client_request,
+    notify_admin,
+    mocker,
+    mock_get_service_template,
+    fake_uuid,
+):
+    mocker.patch.dict(notify_admin.config, {"CSV_DIRECT_UPLOADS": True})
+    mocker.patch("app.main.views.send.uuid.uuid4", return_value=sample_uuid())
+    mock_get_direct_upload_form = mocker.patch(
+        "app.main.views.send.get_direct_upload_form",
+        return_value={"url": "https://example.com/", "fields": {"key": "value"}},
+    )
+
+    response = client_request.get_response(
+        "main.get_direct_csv_upload_form",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+    )
+
+    mock_get_direct_upload_form.assert_called_once_with(
+        SERVICE_ONE_ID, sample_uuid(), max_size=10_000_000
+    )
+    assert response.json == {
+        "url": "https://example.com/",
+        "fields": {"key": "value"},
+        "complete_url": url_for(
+            "main.send_messages_from_direct_upload",
+            service_id=SERVICE_ONE_ID,
+            template_id=fake_uuid,
+            upload_id=sample_uuid(),
+        ),
+    }
+
+
+def test_direct_uploads_are_not_found_unless_enabled(
+    client_request,
+    mock_get_service_template,
+    fake_uuid,
+):
+    client_request.get(
+        "main.get_direct_csv_upload_form",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        _expected_status=404,
+    )
+    client_request.post(
+        "main.send_messages_from_direct_upload",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=sample_uuid(),
+        _data={"file_name": "example.csv"},
+        _expected_status=404,
+    )
+
+
+@pytest.mark.parametrize("spool_threshold", [None, 10])
+def test_send_messages_from_direct_upload(
+    client_request,
+    notify_admin,
+    mocker,
+    mock_get_service_template,
+    fake_uuid,
+    tmp_path,
+    spool_threshold,
+):
+    mocker.patch.dict(notify_admin.config, {"CSV_DIRECT_UPLOADS": True})
+    mocker.patch.object(upload_spool, "threshold", spool_threshold)
+    mocker.patch.object(upload_spool, "directory", str(tmp_path))
+    contents = b"phone number\n\n202 867 5301\n202 867 5302\n"
+    mocker.patch(
+        "app.main.views.send.download_direct_upload",
+        side_effect=lambda service_id, upload_id: (
+            upload_spool.spool(BytesIO(contents))
+            if upload_spool.should_spool(len(contents))
+            else contents
+        ),
+    )
+    mock_delete_direct_upload = mocker.patch("app.main.views.send.delete_direct_upload")
+    mock_s3_set_metadata = mocker.patch(
+        "app.main.views.send.set_metadata_on_csv_upload"
+    )
+    uploaded = {}
+
+    def _s3upload(service_id, filedata, upload_id):
+        if isinstance(filedata["data"], SpooledFile):
+            with filedata["data"].open() as file:
+                uploaded[upload_id] = file.read().decode("utf-8")
+        else:
+            uploaded[upload_id] = filedata["data"]
+        return upload_id
+
+    mocker.patch("app.main.views.send.s3upload", side_effect=_s3upload)
+
+    client_request.post(
+        "main.send_messages_from_direct_upload",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=sample_uuid(),
+        _data={"file_name": "example.csv"},
+        _expected_redirect=url_for(
+            "main.check_messages",
+            service_id=SERVICE_ONE_ID,
+            template_id=fake_uuid,
+            upload_id=sample_uuid(),
+        ),
+    )
+
+    assert {upload_id: data.strip() for upload_id, data in uploaded.items()} == {
+        sample_uuid(): "phone number\r\n202 867 5301\r\n202 867 5302"
+    }
+    mock_s3_set_metadata.assert_called_once_with(
+        SERVICE_ONE_ID, sample_uuid(), original_file_name="example.csv"
+    )
+    mock_delete_direct_upload.assert_called_once_with(SERVICE_ONE_ID, sample_uuid())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_send_messages_from_direct_upload_deletes_it_if_the_csv_cant_be_stored(
+    client_request,
+    notify_admin,
+    mocker,
+    mock_get_service_template,
+    fake_uuid,
+):
+    mocker.patch.dict(notify_admin.config, {"CSV_DIRECT_UPLOADS": True})
+    mocker.patch(
+        "app.main.views.send.download_direct_upload",
+        return_value=b"phone number\n202 867 5301\n",
+    )
+    mock_delete_direct_upload = mocker.patch("app.main.views.send.delete_direct_upload")
+    mocker.patch("app.main.views.send.s3upload", side_effect=RuntimeError("S3 is down"))
+
+    with pytest.raises(RuntimeError):
+        client_request.post(
+            "main.send_messages_from_direct_upload",
+            service_id=SERVICE_ONE_ID,
+            template_id=fake_uuid,
+            upload_id=sample_uuid(),
+            _data={"file_name": "example.csv"},
+        )
+
+    mock_delete_direct_upload.assert_called_once_with(SERVICE_ONE_ID, sample_uuid())
+
+
+@pytest.mark.parametrize(
+    ("file_name", "download_side_effect", "expected_error_message", "expect_deleted"),
+    [
+        (
+            "",
+            None,
+            "Please pick a file",
+            False,
+        ),
+        (
+            "example.pdf",
+            None,
+            "example.pdf is not a spreadsheet that Notify can read",
+            False,
+        ),
+        (
+            "example.csv",
+            S3ObjectNotFound({}, ""),
+            "Could not find example.csv. Try uploading it again.",
+            False,
+        ),
+        (
+            "example.xlsx",
+            [b"not a spreadsheet"],
+            "Could not read example.xlsx. Try using a different file format.",
+            True,
+        ),
+    ],
+    ids=["no-file", "not-a-spreadsheet", "not-uploaded", "unreadable"],
+)
+def test_send_messages_from_direct_upload_shows_errors(
+    client_request,
+    notify_admin,
+    mocker,
+    mock_get_service_template,
+    fake_uuid,
+    file_name,
+    download_side_effect,
+    expected_error_message,
+    expect_deleted,
+):
+    mocker.patch.dict(notify_admin.config, {"CSV_DIRECT_UPLOADS": True})
+    mocker.patch(
+        "app.main.views.send.download_direct_upload",
+        side_effect=download_side_effect,
+    )
+    mock_delete_direct_upload = mocker.patch("app.main.views.send.delete_direct_upload")
+    mock_s3_upload = mocker.patch("app.main.views.send.s3upload")
+
+    page = client_request.post(
+        "main.send_messages_from_direct_upload",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=sample_uuid(),
+        _data={"file_name": file_name},
+        _follow_redirects=True,
+    )
+
+    assert not mock_s3_upload.called
+    assert normalize_spaces(
+        page.select_one(".usa-alert--error .usa-alert__text").text
+    ) == (expected_error_message)
+    assert mock_delete_direct_upload.called is expect_deleted
+
+
+def test_check_messages_checks_spooled_files_from_disk(
+    client_request,
+    mocker,
+    mock_get_live_service,
+    mock_get_service_template_with_placeholders,
+    mock_get_users_by_service,
+    mock_get_service_statistics,
+    mock_get_job_doesnt_exist,
+    mock_get_jobs,
+    fake_uuid,
+    tmp_path,
+):
+    mocker.patch(
+        "app.main.views.send.get_csv_metadata",
+        return_value={"original_file_name": "example.csv"},
+    )
+    with client_request.session_transaction() as session:
+        session["file_uploads"] = {fake_uuid: {"template_id": fake_uuid}}
+
+    spooled_file = SpooledFile.create(str(tmp_path))
+    with spooled_file.open("wb") as file:
+        file.write(b"phone number,name\r\n12345,Jo\r\n2028675301,Sam")
+    mock_s3download = mocker.patch(
+        "app.main.views.send.s3download", return_value=spooled_file
+    )
+
+    page = client_request.get(
+        "main.check_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=fake_uuid,
+        _test_page_title=False,
+    )
+
+    mock_s3download.assert_called_once_with(
+        SERVICE_ONE_ID, fake_uuid, spool_if_large=True
+    )
+    assert "You need to fix 1 phone number." in normalize_spaces(page.text)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    ("outcome", "expected_progress"),
+    [
+        (
+            {"row_count": 2},
+            {"status": "finished", "rows_checked": 2, "total_rows": 2},
+        ),
+        (
+            ValueError("Something went wrong"),
+            {"status": "failed"},
+        ),
+    ],
+)
+def test_run_csv_check_records_the_outcome(
+    notify_admin, mocker, fake_uuid, outcome, expected_progress
+):
+    from app.main.views.send import _keep_csv_check_progress, _run_csv_check
+
+    mock_get_csv_check = mocker.patch(
+        "app.main.views.send._get_csv_check", side_effect=[outcome]
+    )
+    mock_keep_alive = mocker.patch("app.main.views.send.gevent.spawn")
+    mock_redis_set = mocker.patch("app.extensions.redis_client.set")
+
+    _run_csv_check(notify_admin, SERVICE_ONE_ID, fake_uuid, "abc", {})
+
+    mock_get_csv_check.assert_called_once_with(
+        SERVICE_ONE_ID, fake_uuid, "abc", {}, report_progress=True
+    )
+    key, progress = mock_redis_set.call_args.args
+    assert key == f"csv-check-progress-{SERVICE_ONE_ID}-{fake_uuid}"
+    assert json.loads(progress) == expected_progress
+    mock_keep_alive.assert_called_once_with(
+        _keep_csv_check_progress, notify_admin, SERVICE_ONE_ID, fake_uuid
+    )
+    mock_keep_alive.return_value.kill.assert_called_once_with()
+
+
+def test_keep_csv_check_progress_stops_the_progress_expiring(
+    notify_admin, mocker, fake_uuid
+):
+    from app.main.views.send import _keep_csv_check_progress
+
+    mock_sleep = mocker.patch(
+        "app.main.views.send.gevent.sleep", side_effect=[None, None, StopIteration]
+    )
+    mock_redis_expire = mocker.patch("app.extensions.redis_client.expire")
+
+    with pytest.raises(StopIteration):
+        _keep_csv_check_progress(notify_admin, SERVICE_ONE_ID, fake_uuid)
+
+    assert mock_sleep.call_args_list == [call(60)] * 3
+    assert (
+        mock_redis_expire.call_args_list
+        == [call(f"csv-check-progress-{SERVICE_ONE_ID}-{fake_uuid}", 300)] * 2
+    )
+
+
+def test_get_csv_check_reports_progress_from_the_process_pool(
+    notify_admin, mocker, fake_uuid
+):
+    from app.main.views.send import _get_csv_check
+
+    mocker.patch(
+        "app.main.views.send.s3download",
+        return_value="phone number\n2028675301\n2028675302\n",
+    )
+    mock_run = mocker.patch(
+        "app.main.views.send.process_pool.run", return_value={"row_count": 2}
+    )
+
+    _get_csv_check(SERVICE_ONE_ID, fake_uuid, "abc", {}, report_progress=True)
+
+    on_progress = mock_run.call_args.kwargs["on_progress"]
+    # it's sent to another process
+    on_progress = pickle.loads(pickle.dumps(on_progress))
+    assert on_progress.func is report_csv_check_progress
+    assert on_progress.args == (
+        notify_admin.config["REDIS_URL"],
+        f"csv-check-progress-{SERVICE_ONE_ID}-{fake_uuid}",
+        300,
+        3,
+    )
+
+
+def test_check_messages_waits_for_the_file_to_be_checked(
+    client_request,
+    mocker,
+    fake_uuid,
+):
+    mocker.patch(
+        "app.extensions.redis_client.get",
+        return_value=b'{"status": "checking", "rows_checked": 3000, "total_rows": 12345}',
+    )
+    mock_s3_download = mocker.patch("app.main.views.send.s3download")
+
+    page = client_request.get(
+        "main.check_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=fake_uuid,
+    )
+
+    assert normalize_spaces(page.select_one("h1").text) == "Checking your file"
+    assert normalize_spaces(
+        page.select_one("[data-module=csv-check-polling]").text
+    ) == ("Checked 3,000 of about 12,345 rows.")
+    assert page.select_one("[data-module=csv-check-polling]")[
+        "data-status-url"
+    ] == url_for(
+        "main.check_messages_status",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=fake_uuid,
+    )
+    assert not mock_s3_download.called
+
+
+@pytest.mark.parametrize(
+    ("progress", "expected_json"),
+    [
+        (
+            b'{"status": "checking", "rows_checked": 1000, "total_rows": 2000}',
+            {"finished": False, "rows_checked": 1000, "total_rows": 2000},
+        ),
+        (
+            b'{"status": "finished", "rows_checked": 1999, "total_rows": 1999}',
+            {"finished": True, "rows_checked": 1999, "total_rows": 1999},
+        ),
+        (
+            b'{"status": "failed"}',
+            {"finished": True, "rows_checked": None, "total_rows": None},
+        ),
+        (
+            None,
+            {"finished": True, "rows_checked": None, "total_rows": None},
+        ),
+    ],
+)
+def test_check_messages_status(
+    client_request,
+    mocker,
+    fake_uuid,
+    progress,
+    expected_json,
+):
+    mock_redis_get = mocker.patch(
+        "app.extensions.redis_client.get", return_value=progress
+    )
+
+    response = client_request.get_response(
+        "main.check_messages_status",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=fake_uuid,
+    )
+
+    assert response.json == expected_json
+    mock_redis_get.assert_called_once_with(
+        f"csv-check-progress-{SERVICE_ONE_ID}-{fake_uuid}"
+    )
+
+
+def test_check_messages_reuses_cached_check(
+    mocker,
+    client_request,
+    mock_get_service,
+    mock_get_users_by_service,
+    mock_get_service_template,
+    mock_get_job_doesnt_exist,
+    mock_get_jobs,
+    fake_uuid,
+):
+    mocker.patch(
+        "app.main.views.send.get_csv_metadata",
+        return_value={"original_file_name": "example.csv"},
+    )
+    mock_s3_download = mocker.patch(
+        "app.main.views.send.s3download",
+        return_value="phone number\n202 867 5301\n202 867 5302\n",
+    )
+    cached = {}
+    mocker.patch(
+        "app.extensions.redis_client.get",
+        side_effect=lambda key: cached.get(key),
+    )
+    mocker.patch(
+        "app.extensions.redis_client.set",
+        side_effect=lambda key, value, **kwargs: cached.__setitem__(key, value),
+    )
+    mocker.patch("app.extensions.redis_client.active", True)
+
+    with client_request.session_transaction() as session:
+        session["file_uploads"] = {fake_uuid: {"template_id": fake_uuid}}
+
+    for _ in range(2):
+        page = client_request.get(
+            "main.check_messages",
+            service_id=SERVICE_ONE_ID,
+            template_id=fake_uuid,
+            upload_id=fake_uuid,
+        )
+        assert "202 867 5302" in page.text
+
+    assert mock_s3_download.call_count == 1
+    assert any(key.startswith(f"csv-check-{SERVICE_ONE_ID}-") for key in cached)
+
+
+def test_preview_job_reuses_the_check_from_check_messages(
+    mocker,
+    client_request,
+    mock_get_service,
+    mock_get_users_by_service,
+    mock_get_service_template,
+    mock_get_job_doesnt_exist,
+    mock_get_jobs,
+    fake_uuid,
+):
+    mocker.patch(
+        "app.main.views.send.get_csv_metadata",
+        return_value={"original_file_name": "example.csv"},
+    )
+    mock_s3_download = mocker.patch(
+        "app.main.views.send.s3download",
+        return_value="phone number\n202 867 5301\n202 867 5302\n",
+    )
+    mock_recipient_csv = mocker.patch("app.utils.csv.RecipientCSV", wraps=RecipientCSV)
+    cached = {}
+    mocker.patch(
+        "app.extensions.redis_client.get",
+        side_effect=lambda key: cached.get(key),
+    )
+    mocker.patch(
+        "app.extensions.redis_client.set",
+        side_effect=lambda key, value, **kwargs: cached.__setitem__(key, value),
+    )
+    mocker.patch("app.extensions.redis_client.active", True)
+
+    with client_request.session_transaction() as session:
+        session["file_uploads"] = {fake_uuid: {"template_id": fake_uuid}}
+
+    client_request.get(
+        "main.check_messages",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=fake_uuid,
+    )
+    page = client_request.post(
+        "main.preview_job",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        upload_id=fake_uuid,
+        _expected_status=200,
+    )
+    assert "202 867 5302" in page.text
+
+    assert mock_s3_download.call_count == 1
+    assert mock_recipient_csv.call_count == 1
+
+
 @pytest.mark.parametrize(
     ("num_requested", "expected_msg"),
     [
@@ -2330,7 +3075,12 @@ def test_check_messages_shows_too_many_messages_errors(
             + ([mock_get_users_by_service(None)[0]["mobile_number"]] * 1234)
         ),
     )
-    mocker.patch("app.extensions.redis_client.get", return_value=num_requested)
+    mocker.patch(
+        "app.extensions.redis_client.get",
+        side_effect=lambda key: (
+            num_requested if key.startswith("notification-count-") else None
+        ),
+    )
 
     with client_request.session_transaction() as session:
         session["file_uploads"] = {
@@ -2619,7 +3369,9 @@ def test_check_messages_shows_over_max_row_error(
         "app.main.views.send.get_csv_metadata",
         return_value={"original_file_name": "example.csv"},
     )
-    mock_recipients = mocker.patch("app.main.views.send.RecipientCSV").return_value
+    mock_recipients = mocker.patch(
+        "app.main.views.send.CheckedRecipientCSV"
+    ).return_value
     mock_recipients.max_rows = 11111
     mock_recipients.__len__.return_value = 99999
     mock_recipients.too_many_rows.return_value = True
@@ -1,9 +1,22 @@
+import inspect
 from collections import OrderedDict
+from io import BytesIO
 from pathlib import Path
 
+import openpyxl
+import pyexcel
 import pytest
 
-from app.models.spreadsheet import Spreadsheet
+from app.models.spreadsheet import (
+    HIDDEN,
+    Spreadsheet,
+    TooManyRowsError,
+    WorkSheetParser,
+    convert_spooled_file,
+    normalise_lines,
+    write_normalised_lines,
+)
+from app.utils.spool import SpooledFile
 
 
 def test_can_create_spreadsheet_from_large_excel_file():
@@ -47,3 +60,214 @@ def test_spreadsheet_checks_for_bad_arguments(args, kwargs):
         str(exception.value)
         == "Spreadsheet must be created from either rows or CSV data"
     )
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        ("", ""),
+        ("a,b\r\nc,d", "a,b\r\nc,d"),
+        ("a,b\nc,d\n", "a,b\r\nc,d"),
+        ("a,b\r\nc,d\ne,f", "a,b\r\nc,d\r\ne,f"),
+        ("a,b\rc,d\r", "a,b\r\nc,d"),
+        ("\r\n\r\na,b\r\n\r\n  \r\nc,d\r\n\r\n\r\n", "a,b\r\nc,d"),
+        ("a,b\u2028c,d\x0be,f", "a,b\r\nc,d\r\ne,f"),
+        ('a,"b\nc"\n', 'a,"b\r\nc"'),
+    ],
+)
+def test_normalise_lines(data, expected):
+    assert normalise_lines(data) == expected
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "",
+        "  \r\n",
+        "a,b\r\nc,d",
+        "\ufeff a,b\nc,d \n",
+        "a,b\rc,d\r\n\r\n  \r\ne,f\u2028g,h\r\n",
+        # longer than TextIOWrapper reads at once, with a \r\n across the boundary
+        "a,b\r\n" + "x" * 8190 + "\r\nc,d",
+    ],
+)
+def test_write_normalised_lines_matches_normalise_lines(data):
+    destination = BytesIO()
+    write_normalised_lines(BytesIO(data.encode("utf-8")), destination)
+    assert destination.getvalue().decode("utf-8") == normalise_lines(data)
+
+
+def test_convert_spooled_csv_file(tmp_path):
+    spooled_file = SpooledFile.create(str(tmp_path))
+    with spooled_file.open("wb") as file:
+        file.write(b"phone number,name\n\n2028675309,Jo\n")
+
+    converted = convert_spooled_file(spooled_file, "example.csv")
+
+    assert converted["file_name"] == "example.csv"
+    assert isinstance(converted["data"], SpooledFile)
+    assert converted["data"].path != spooled_file.path
+    with converted["data"].open() as file:
+        assert file.read() == b"phone number,name\r\n2028675309,Jo"
+
+
+def test_convert_spooled_csv_file_deletes_what_it_wrote_if_it_fails(tmp_path):
+    spooled_file = SpooledFile.create(str(tmp_path))
+    with spooled_file.open("wb") as file:
+        file.write(b"phone number\n\xff\n")
+
+    with pytest.raises(UnicodeDecodeError):
+        convert_spooled_file(spooled_file, "example.csv")
+
+    assert [path.name for path in tmp_path.iterdir()] == [Path(spooled_file.path).name]
+
+
+def test_convert_spooled_excel_file(tmp_path):
+    spooled_file = SpooledFile.create(str(tmp_path))
+    with spooled_file.open("wb") as file:
+        file.write(
+            (
+                Path.cwd() / "tests" / "spreadsheet_files" / "excel 2007.xlsx"
+            ).read_bytes()
+        )
+
+    converted = convert_spooled_file(spooled_file, "example.xlsx")
+
+    assert isinstance(converted["data"], SpooledFile)
+    with converted["data"].open() as file:
+        assert file.read().decode("utf-8") == normalise_lines(
+            Spreadsheet.from_file(
+                spooled_file.open(), filename="example.xlsx"
+            ).as_csv_data
+        )
+
+
+def test_normalise_lines_does_not_copy_data_which_is_already_normalised():
+    data = "a,b\r\n" * 10 + "c,d"
+    assert normalise_lines(data) is data
+
+
+def _workbook(*rows, hidden_row=None, hidden_column=None, merged=None):
+    workbook = openpyxl.Workbook()
+    hidden_sheet = workbook.active
+    hidden_sheet.append(["hidden sheet"])
+    hidden_sheet.sheet_state = "hidden"
+    sheet = workbook.create_sheet()
+    for row in rows:
+        sheet.append(row)
+    if hidden_row:
+        sheet.row_dimensions[hidden_row].hidden = True
+    if hidden_column:
+        sheet.column_dimensions[hidden_column].hidden = True
+    if merged:
+        sheet.merge_cells(merged)
+    data = BytesIO()
+    workbook.save(data)
+    return data.getvalue()
+
+
+@pytest.mark.parametrize("extension", ["xlsx", "xlsm"])
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"hidden_row": 3},
+        {"hidden_column": "B"},
+        {"merged": "A2:B3"},
+    ],
+)
+def test_reads_excel_files_the_same_as_pyexcel(extension, kwargs):
+    data = _workbook(
+        ["phone number", "name", "secret"],
+        ["2028675309", "Jo", "s"],
+        ["2028675301", None, "", None],
+        [],
+        [None, None, 0, None],
+        [1.5, False, "=1+1"],
+        **kwargs,
+    )
+
+    expected = Spreadsheet.from_rows(
+        pyexcel.iget_array(file_type="xlsx", file_content=data)
+    ).as_csv_data
+    pyexcel.free_resources()
+
+    assert normalise_lines(
+        Spreadsheet.from_file(
+            BytesIO(data), filename=f"example.{extension}"
+        ).as_csv_data
+    ) == normalise_lines(expected)
+
+
+def test_openpyxl_still_has_what_iter_xlsx_rows_uses():
+    # iter_xlsx_rows uses private parts of openpyxl. If this fails after
+    # upgrading openpyxl, change iter_xlsx_rows to match, or pin it back.
+    assert WorkSheetParser is not None
+    assert {
+        "src",
+        "shared_strings",
+        "data_only",
+        "epoch",
+        "date_formats",
+        "timedelta_formats",
+    } <= set(inspect.signature(WorkSheetParser).parameters)
+
+    workbook = openpyxl.load_workbook(
+        BytesIO(_workbook(["a", "b"], ["c"], hidden_row=2, hidden_column="B")),
+        read_only=True,
+        data_only=True,
+    )
+    sheet = workbook.worksheets[1]
+    with sheet._get_source() as source:
+        parser = WorkSheetParser(
+            source,
+            sheet._shared_strings,
+            data_only=True,
+            epoch=workbook.epoch,
+            date_formats=workbook._date_formats,
+            timedelta_formats=workbook._timedelta_formats,
+        )
+        rows = [
+            (index, [(cell["column"], cell["value"]) for cell in cells])
+            for index, cells in parser.parse()
+        ]
+    workbook.close()
+
+    assert rows == [(1, [(1, "a"), (2, "b")]), (2, [(1, "c")])]
+    assert parser.column_dimensions["B"]["hidden"] in HIDDEN
+    assert parser.row_dimensions["2"]["hidden"] in HIDDEN
+
+
+def test_xlsx_files_are_read_by_pyexcel_without_the_openpyxl_parser(mocker):
+    mocker.patch("app.models.spreadsheet.WorkSheetParser", None)
+
+    assert (
+        Spreadsheet.from_file(
+            BytesIO(_workbook(["phone number"], ["2028675309"])),
+            filename="example.xlsx",
+        ).as_csv_data
+        == "phone number\r\n2028675309\r\n"
+    )
+
+
+@pytest.mark.parametrize(
+    ("filename", "data"),
+    [
+        ("example.xlsx", _workbook(["phone number"], *[["2028675309"], []] * 4)),
+        (
+            "example.xlsx",
+            _workbook(["phone number"], *[["2028675309"]] * 4, merged="A2:A3"),
+        ),
+        ("example.tsv", b"phone number\n" + b"2028675309\n\n" * 4),
+    ],
+    ids=["xlsx", "xlsx with merged cells", "tsv"],
+)
+def test_too_many_rows(mocker, filename, data):
+    mocker.patch("app.models.spreadsheet.RecipientCSV.max_rows", 3)
+
+    with pytest.raises(TooManyRowsError, match="More than 3 rows"):
+        Spreadsheet.from_file(BytesIO(data), filename=filename)
+
+    mocker.patch("app.models.spreadsheet.RecipientCSV.max_rows", 4)
+
+    assert Spreadsheet.from_file(BytesIO(data), filename=filename).as_csv_data
@@ -1,12 +1,18 @@
 from datetime import date
-from unittest.mock import patch
+from functools import partial
+from unittest.mock import Mock, patch
 
+import gevent
 import pytest
 import werkzeug
+from flask import copy_current_request_context, g, request
+from freezegun import freeze_time
 
+from app import current_service
 from app.models.service import Service
 from app.notify_client import NotifyAdminAPIClient
 from app.notify_client.notification_api_client import notification_api_client
+from notifications_python_client.errors import HTTPError
 from tests import service_json
 from tests.conftest import (
     create_api_user_active,
@@ -134,6 +140,216 @@ def test_generate_headers_sets_request_id_if_in_request_context(notify_admin):
     assert headers["X-B3-SpanId"] == request_context.request.span_id
 
 
+def test_signed_token_is_reused_within_reuse_window(notify_admin, mocker):
+    mocker.patch.dict(
+        "notifications_python_client.authentication._token_cache", clear=True
+    )
+    mock_encode = mocker.patch(
+        "notifications_python_client.authentication.jwt.encode",
+        side_effect=["token-1", "token-2"],
+    )
+    api_client = NotifyAdminAPIClient()
+    api_client.init_app(notify_admin)
+
+    with freeze_time("2020-01-01 12:00:00") as frozen_time:
+        first_token = api_client._create_request_objects("url", None, None)[1]
+        frozen_time.tick(14)
+        second_token = api_client._create_request_objects("url", None, None)[1]
+        frozen_time.tick(1)
+        third_token = api_client._create_request_objects("url", None, None)[1]
+
+    assert first_token["headers"]["Authorization"] == "Bearer token-1"
+    assert second_token["headers"]["Authorization"] == "Bearer token-1"
+    assert third_token["headers"]["Authorization"] == "Bearer token-2"
+    assert mock_encode.call_count == 2
+
+
+def test_signed_token_is_not_reused_if_reuse_fraction_is_zero(notify_admin, mocker):
+    mocker.patch.dict(
+        "notifications_python_client.authentication._token_cache", clear=True
+    )
+    mock_encode = mocker.patch(
+        "notifications_python_client.authentication.jwt.encode",
+        side_effect=["token-1", "token-2"],
+    )
+    api_client = NotifyAdminAPIClient()
+    with set_config(notify_admin, "API_TOKEN_REUSE_FRACTION", 0):
+        api_client.init_app(notify_admin)
+
+    with freeze_time("2020-01-01 12:00:00"):
+        api_client._create_request_objects("url", None, None)
+        api_client._create_request_objects("url", None, None)
+
+    assert mock_encode.call_count == 2
+
+
+def test_repeated_get_in_same_request_is_only_sent_once(notify_admin, mocker):
+    mock_perform_request = mocker.patch(
+        "notifications_python_client.base.BaseAPIClient._perform_request",
+        return_value=Mock(status_code=200, content=b'{"data": "x"}'),
+    )
+    api_client = NotifyAdminAPIClient()
+    api_client.init_app(notify_admin)
+
+    with notify_admin.test_request_context():
+        assert api_client.get("/service/1", params={"a": 1}) == {"data": "x"}
+        assert api_client.get("/service/1", params={"a": 1}) == {"data": "x"}
+        api_client.get("/service/1", params={"a": 2})
+        assert request.api_get_memo.calls_saved == 1
+
+    with notify_admin.test_request_context():
+        api_client.get("/service/1", params={"a": 1})
+
+    assert mock_perform_request.call_count == 3
+
+
+@pytest.mark.parametrize(
+    "written_url",
+    [
+        "/service/1",
+        "/service/1/template/2",
+        "/service/12",
+        "/user/1",
+        "/organizations/1",
+    ],
+)
+def test_any_write_invalidates_all_gets_in_same_request(
+    notify_admin, mocker, platform_admin_user, written_url
+):
+    mock_perform_request = mocker.patch(
+        "notifications_python_client.base.BaseAPIClient._perform_request",
+        return_value=Mock(status_code=200, content=b"{}"),
+    )
+    api_client = NotifyAdminAPIClient()
+    api_client.init_app(notify_admin)
+
+    with notify_admin.test_request_context() as request_context, notify_admin.test_client() as client:
+        client.login(platform_admin_user)
+        request_context.service = None
+        api_client.get("/service/1")
+        api_client.get("/service/1/template")
+        mock_perform_request.reset_mock()
+
+        api_client.post(written_url, {})
+        api_client.get("/service/1")
+        api_client.get("/service/1/template")
+
+    assert [
+        call.args[1]
+        for call in mock_perform_request.call_args_list
+        if call.args[0] == "GET"
+    ] == [
+        "http://you-forgot-to-mock-an-api-call-to/service/1",
+        "http://you-forgot-to-mock-an-api-call-to/service/1/template",
+    ]
+
+
+def test_failed_get_is_not_memoised(notify_admin, mocker):
+    mock_perform_request = mocker.patch(
+        "notifications_python_client.base.BaseAPIClient._perform_request",
+        side_effect=[
+            HTTPError(response=Mock(status_code=500)),
+            Mock(status_code=200, content=b'{"data": "x"}'),
+        ],
+    )
+    api_client = NotifyAdminAPIClient()
+    api_client.init_app(notify_admin)
+
+    with notify_admin.test_request_context():
+        with pytest.raises(HTTPError):
+            api_client.get("/service/1")
+        assert api_client.get("/service/1") == {"data": "x"}
+
+    assert mock_perform_request.call_count == 2
+
+
+def test_concurrent_gets_share_one_in_flight_call(notify_admin, mocker):
+    def slow_response(*args):
+        gevent.sleep(0.01)
+        return Mock(status_code=200, content=b'{"data": "x"}')
+
+    mock_perform_request = mocker.patch(
+        "notifications_python_client.base.BaseAPIClient._perform_request",
+        side_effect=slow_response,
+    )
+    api_client = NotifyAdminAPIClient()
+    api_client.init_app(notify_admin)
+
+    def get_service():
+        return api_client.get("/service/1")
+
+    with notify_admin.test_request_context():
+        greenlets = [
+            gevent.spawn(copy_current_request_context(get_service)) for _ in range(3)
+        ]
+        gevent.joinall(greenlets, raise_error=True)
+
+    assert [greenlet.value for greenlet in greenlets] == [{"data": "x"}] * 3
+    assert mock_perform_request.call_count == 1
+
+
+def test_gather_runs_calls_concurrently_and_returns_results_in_order(notify_admin):
+    finished = []
+
+    def call(name, delay):
+        gevent.sleep(delay)
+        finished.append(name)
+        return name
+
+    with notify_admin.test_request_context():
+        results = NotifyAdminAPIClient.gather(
+            partial(call, "slow", 0.02),
+            partial(call, "fast", 0),
+        )
+
+    assert results == ["slow", "fast"]
+    assert finished == ["fast", "slow"]
+
+
+def test_gather_raises_first_exception_after_all_calls_finish(notify_admin):
+    finished = []
+
+    def fail(status_code):
+        gevent.sleep(0.01 * status_code / 100)
+        finished.append(status_code)
+        raise HTTPError(response=Mock(status_code=status_code))
+
+    with notify_admin.test_request_context():
+        with pytest.raises(HTTPError) as exception:
+            NotifyAdminAPIClient.gather(
+                partial(fail, 500), partial(fail, 404), lambda: "ok"
+            )
+
+    assert exception.value.status_code == 500
+    assert sorted(finished) == [404, 500]
+
+
+def test_gather_copies_request_context_into_calls(notify_admin):
+    def get_context():
+        return request.request_id, current_service, g.endpoint
+
+    with notify_admin.test_request_context() as request_context:
+        request_context.service = Service(service_json())
+        g.endpoint = "main.service_dashboard"
+        results = NotifyAdminAPIClient.gather(get_context, get_context)
+
+        assert (
+            results
+            == [(request.request_id, request_context.service, "main.service_dashboard")]
+            * 2
+        )
+
+
+def test_gather_does_not_tear_down_the_request(notify_admin, mocker):
+    mock_teardown = mocker.patch.object(notify_admin, "do_teardown_request")
+
+    with notify_admin.test_request_context():
+        NotifyAdminAPIClient.gather(lambda: "a", lambda: "b")
+
+        assert not mock_teardown.called
+        assert request.environ["werkzeug.request"] is request._get_current_object()
+
+
 def test_get_notification_status_by_service(mocker):
     mock_get = mocker.patch.object(notification_api_client, "get")
     start_date = date(2019, 4, 1)
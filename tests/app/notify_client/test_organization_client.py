@@ -41,10 +41,10 @@ from app import organizations_client
             [
                 call(
                     "organizations",
-                    '[{"domains": ["x", "y", "z"]}]',
+                    '[{"domains":["x","y","z"]}]',
                     ex=604800,
                 ),
-                call("domains", '["x", "y", "z"]', ex=604800),
+                call("domains", '["x","y","z"]', ex=604800),
             ],
             "from api",
         ),
@@ -76,7 +76,7 @@ from app import organizations_client
             [
                 call(
                     "organizations",
-                    '[{"domains": ["x", "y", "z"]}]',
+                    '[{"domains":["x","y","z"]}]',
                     ex=604800,
                 ),
             ],
@@ -48,7 +48,7 @@ def test_sets_value_in_cache(mocker):
     )
     mock_redis_set.assert_called_once_with(
         "performance-stats-2021-01-01-to-2022-02-02",
-        '{"data_from": "api"}',
+        '{"data_from":"api"}',
         ex=3600,
     )
 
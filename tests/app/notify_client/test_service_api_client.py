@@ -12,8 +12,8 @@ FAKE_TEMPLATE_ID = uuid4()
 
 def test_client_posts_archived_true_when_deleting_template(mocker):
     mocker.patch("app.notify_client.current_user", id="1")
-    mock_redis_delete_by_pattern = mocker.patch(
-        "app.extensions.RedisClient.delete_by_pattern"
+    mock_redis_delete_tracked = mocker.patch(
+        "app.extensions.RedisClient.delete_tracked"
     )
     expected_data = {"archived": True, "created_by": "1"}
     expected_url = "/service/{}/template/{}".format(SERVICE_ONE_ID, FAKE_TEMPLATE_ID)
@@ -30,8 +30,8 @@ def test_client_posts_archived_true_when_deleting_template(mocker):
     client.delete_service_template(SERVICE_ONE_ID, FAKE_TEMPLATE_ID)
     mock_post.assert_called_once_with(expected_url, data=expected_data)
     assert (
-        call(f"service-{SERVICE_ONE_ID}-template-*")
-        in mock_redis_delete_by_pattern.call_args_list
+        call(f"request-cache-namespace-service-{SERVICE_ONE_ID}-template-")
+        in mock_redis_delete_tracked.call_args_list
     )
 
 
@@ -186,7 +186,7 @@ def test_client_returns_count_of_service_templates(
             [
                 call(
                     "service-{}".format(SERVICE_ONE_ID),
-                    '{"data_from": "api"}',
+                    '{"data_from":"api"}',
                     ex=604800,
                 )
             ],
@@ -224,8 +224,10 @@ def test_client_returns_count_of_service_templates(
                     "service-{}-template-{}-version-None".format(
                         SERVICE_ONE_ID, FAKE_TEMPLATE_ID
                     ),
-                    '{"data_from": "api"}',
+                    '{"data_from":"api"}',
+                    [f"request-cache-namespace-service-{SERVICE_ONE_ID}-template-"],
                     ex=604800,
+                    tracking_ex=604800,
                 ),
             ],
             {"data_from": "api"},
@@ -268,8 +270,10 @@ def test_client_returns_count_of_service_templates(
                     "service-{}-template-{}-version-1".format(
                         SERVICE_ONE_ID, FAKE_TEMPLATE_ID
                     ),
-                    '{"data_from": "api"}',
+                    '{"data_from":"api"}',
+                    [f"request-cache-namespace-service-{SERVICE_ONE_ID}-template-"],
                     ex=604800,
+                    tracking_ex=604800,
                 ),
             ],
             {"data_from": "api"},
@@ -292,7 +296,7 @@ def test_client_returns_count_of_service_templates(
             [
                 call(
                     "service-{}-templates".format(SERVICE_ONE_ID),
-                    '{"data_from": "api"}',
+                    '{"data_from":"api"}',
                     ex=604800,
                 )
             ],
@@ -336,8 +340,10 @@ def test_client_returns_count_of_service_templates(
                     "service-{}-template-{}-versions".format(
                         SERVICE_ONE_ID, FAKE_TEMPLATE_ID
                     ),
-                    '{"data_from": "api"}',
+                    '{"data_from":"api"}',
+                    [f"request-cache-namespace-service-{SERVICE_ONE_ID}-template-"],
                     ex=604800,
+                    tracking_ex=604800,
                 ),
             ],
             {"data_from": "api"},
@@ -365,12 +371,18 @@ def test_returns_value_from_cache(
     mock_redis_set = mocker.patch(
         "app.extensions.RedisClient.set",
     )
+    mock_redis_set_tracked = mocker.patch(
+        "app.extensions.RedisClient.set_tracked",
+    )
 
     assert client_method(*extra_args) == expected_return_value
 
     assert mock_redis_get.call_args_list == expected_cache_get_calls
     assert mock_api_get.call_args_list == expected_api_calls
-    assert mock_redis_set.call_args_list == expected_cache_set_calls
+    assert (
+        mock_redis_set.call_args_list + mock_redis_set_tracked.call_args_list
+        == expected_cache_set_calls
+    )
 
 
 @pytest.mark.parametrize(
@@ -507,8 +519,8 @@ def test_deletes_caches_when_modifying_templates(
 ):
     mocker.patch("app.notify_client.current_user", id="1")
     mock_redis_delete = mocker.patch("app.extensions.RedisClient.delete")
-    mock_redis_delete_by_pattern = mocker.patch(
-        "app.extensions.RedisClient.delete_by_pattern"
+    mock_redis_delete_tracked = mocker.patch(
+        "app.extensions.RedisClient.delete_tracked"
     )
     mock_request = mocker.patch(
         "notifications_python_client.base.BaseAPIClient.request"
@@ -520,9 +532,9 @@ def test_deletes_caches_when_modifying_templates(
     assert len(mock_request.call_args_list) == 1
     if method != "create_service_template":
         # no deletes for template cach on create_service_template
-        assert len(mock_redis_delete_by_pattern.call_args_list) == 1
-        assert mock_redis_delete_by_pattern.call_args_list[0] == call(
-            f"service-{SERVICE_ONE_ID}-template-*"
+        assert len(mock_redis_delete_tracked.call_args_list) == 1
+        assert mock_redis_delete_tracked.call_args_list[0] == call(
+            f"request-cache-namespace-service-{SERVICE_ONE_ID}-template-"
         )
 
 
@@ -533,8 +545,8 @@ def test_deletes_cached_users_when_archiving_service(
         "app.notify_client.service_api_client.ServiceAPIClient.check_inactive_user"
     )
     mock_redis_delete = mocker.patch("app.extensions.RedisClient.delete")
-    mock_redis_delete_by_pattern = mocker.patch(
-        "app.extensions.RedisClient.delete_by_pattern"
+    mock_redis_delete_tracked = mocker.patch(
+        "app.extensions.RedisClient.delete_tracked"
     )
 
     mocker.patch(
@@ -548,8 +560,8 @@ def test_deletes_cached_users_when_archiving_service(
         call("user-my-user-id1", "user-my-user-id2") in mock_redis_delete.call_args_list
     )
     assert (
-        call(f"service-{SERVICE_ONE_ID}-template-*")
-        in mock_redis_delete_by_pattern.call_args_list
+        call(f"request-cache-namespace-service-{SERVICE_ONE_ID}-template-")
+        in mock_redis_delete_tracked.call_args_list
     )
 
 
@@ -586,8 +598,8 @@ def test_client_doesnt_delete_service_template_cache_when_none_exist(
     mocker.patch("app.notify_client.current_user", id="1")
     mocker.patch("notifications_python_client.base.BaseAPIClient.request")
     mock_redis_delete = mocker.patch("app.extensions.RedisClient.delete")
-    mock_redis_delete_by_pattern = mocker.patch(
-        "app.extensions.RedisClient.delete_by_pattern"
+    mock_redis_delete_tracked = mocker.patch(
+        "app.extensions.RedisClient.delete_tracked"
     )
 
     service_api_client.update_reply_to_email_address(
@@ -599,7 +611,7 @@ def test_client_doesnt_delete_service_template_cache_when_none_exist(
         "service-{}".format(SERVICE_ONE_ID)
     )
 
-    assert len(mock_redis_delete_by_pattern.call_args_list) == 1
+    assert len(mock_redis_delete_tracked.call_args_list) == 1
 
 
 def test_client_deletes_service_template_cache_when_service_is_updated(
@@ -608,8 +620,8 @@ def test_client_deletes_service_template_cache_when_service_is_updated(
     mocker.patch("app.notify_client.current_user", id="1")
     mocker.patch("notifications_python_client.base.BaseAPIClient.request")
     mock_redis_delete = mocker.patch("app.extensions.RedisClient.delete")
-    mock_redis_delete_by_pattern = mocker.patch(
-        "app.extensions.RedisClient.delete_by_pattern"
+    mock_redis_delete_tracked = mocker.patch(
+        "app.extensions.RedisClient.delete_tracked"
     )
 
     service_api_client.update_reply_to_email_address(
@@ -618,8 +630,8 @@ def test_client_deletes_service_template_cache_when_service_is_updated(
 
     assert len(mock_redis_delete.call_args_list) == 1
     assert mock_redis_delete.call_args_list[0] == call(f"service-{SERVICE_ONE_ID}")
-    assert mock_redis_delete_by_pattern.call_args_list[0] == call(
-        f"service-{SERVICE_ONE_ID}-template-*"
+    assert mock_redis_delete_tracked.call_args_list[0] == call(
+        f"request-cache-namespace-service-{SERVICE_ONE_ID}-template-"
     )
 
 
@@ -30,7 +30,7 @@ def test_sets_value_in_cache(mocker):
         url="/_status/live-service-and-organization-counts"
     )
     mock_redis_set.assert_called_once_with(
-        "live-service-and-organization-counts", '{"data_from": "api"}', ex=3600
+        "live-service-and-organization-counts", '{"data_from":"api"}', ex=3600
     )
 
 
@@ -31,7 +31,7 @@ def test_create_template_folder_calls_correct_api_endpoint(mocker, parent_id):
 
 def test_get_template_folders_calls_correct_api_endpoint(mocker):
     mock_redis_get = mocker.patch("app.extensions.RedisClient.get", return_value=None)
-    mock_redis_set = mocker.patch("app.extensions.RedisClient.set")
+    mock_redis_set_tracked = mocker.patch("app.extensions.RedisClient.set_tracked")
     mock_api_get = mocker.patch(
         "app.notify_client.NotifyAdminAPIClient.get",
         return_value={"template_folders": {"a": "b"}},
@@ -49,7 +49,13 @@ def test_get_template_folders_calls_correct_api_endpoint(mocker):
 
     mock_redis_get.assert_called_once_with(redis_key)
     mock_api_get.assert_called_once_with(expected_url)
-    mock_redis_set.assert_called_once_with(redis_key, '{"a": "b"}', ex=604800)
+    mock_redis_set_tracked.assert_called_once_with(
+        redis_key,
+        '{"a":"b"}',
+        [f"request-cache-namespace-service-{some_service_id}-template-"],
+        ex=604800,
+        tracking_ex=604800,
+    )
 
 
 def test_move_templates_and_folders(mocker):
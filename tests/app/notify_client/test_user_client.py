@@ -160,7 +160,7 @@ def test_client_converts_admin_permissions_to_db_permissions_on_add_to_service(
             [call("user-{}".format(user_id))],
             None,
             [call("/user/{}".format(user_id))],
-            [call("user-{}".format(user_id), '{"data": "from api"}', ex=604800)],
+            [call("user-{}".format(user_id), '{"data":"from api"}', ex=604800)],
             "from api",
         ),
     ],
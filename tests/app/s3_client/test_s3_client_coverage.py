@@ -1,5 +1,6 @@
 import os
-from unittest.mock import MagicMock, Mock, patch
+from io import BytesIO
+from unittest.mock import MagicMock, Mock, call, patch
 
 import botocore.exceptions
 import pytest
@@ -11,6 +12,8 @@ from app.s3_client import (
     get_s3_object,
     set_s3_metadata,
 )
+from app.utils.spool import UploadSpool
+from notifications_utils.s3 import s3_resources
 
 
 class TestS3ClientCoverage:
@@ -21,7 +24,8 @@ class TestS3ClientCoverage:
         assert AWS_CLIENT_CONFIG.s3 == {"addressing_style": "virtual"}
         assert AWS_CLIENT_CONFIG.use_fips_endpoint is True
 
-    @patch("app.s3_client.Session")
+    @patch("notifications_utils.s3.Session")
+    @patch.object(s3_resources, "max_pool_connections", None)
     @patch.dict(os.environ, {"NOTIFY_ENVIRONMENT": "production"})
     def test_get_s3_object_production(self, mock_session):
         """Test get_s3_object in production environment"""
@@ -30,6 +34,9 @@ class TestS3ClientCoverage:
         mock_session.return_value.resource.return_value = mock_resource
         mock_resource.Object.return_value = mock_obj
 
+        get_s3_object(
+            "test-bucket", "test-file.txt", "access-key", "secret-key", "us-east-1"
+        )
         result = get_s3_object(
             "test-bucket", "test-file.txt", "access-key", "secret-key", "us-east-1"
         )
@@ -42,10 +49,13 @@ class TestS3ClientCoverage:
         mock_session.return_value.resource.assert_called_once_with(
             "s3", config=AWS_CLIENT_CONFIG
         )
-        mock_resource.Object.assert_called_once_with("test-bucket", "test-file.txt")
+        assert mock_resource.Object.call_args_list == [
+            call("test-bucket", "test-file.txt"),
+            call("test-bucket", "test-file.txt"),
+        ]
         assert result == mock_obj
 
-    @patch("app.s3_client.Session")
+    @patch("notifications_utils.s3.Session")
     @patch.dict(os.environ, {"NOTIFY_ENVIRONMENT": "test"})
     def test_get_s3_object_test_env_with_mock(self, mock_session):
         """Test get_s3_object in test environment with proper mocking"""
@@ -64,7 +74,7 @@ class TestS3ClientCoverage:
 
         assert result == mock_obj
 
-    @patch("app.s3_client.Session")
+    @patch("notifications_utils.s3.Session")
     @patch.dict(os.environ, {"NOTIFY_ENVIRONMENT": "test"})
     def test_get_s3_object_test_env_without_mock(self, mock_session):
         """Test get_s3_object in test environment without proper mocking"""
@@ -146,6 +156,35 @@ class TestS3ClientCoverage:
         mock_obj.get.assert_called_once()
         mock_body.read.assert_called_once()
 
+    @pytest.mark.parametrize(
+        ("content_length", "expected_spooled"),
+        [
+            (5, False),
+            (13, True),
+        ],
+    )
+    def test_get_s3_contents_spools_large_objects(
+        self, tmp_path, content_length, expected_spooled
+    ):
+        """Test get_s3_contents writes objects over the threshold to disk"""
+        spool = UploadSpool()
+        spool.threshold = 10
+        spool.directory = str(tmp_path)
+        mock_obj = Mock()
+        mock_obj.get.return_value = {
+            "Body": BytesIO(b"Hello, World!"),
+            "ContentLength": content_length,
+        }
+
+        result = get_s3_contents(mock_obj, spool=spool)
+
+        if expected_spooled:
+            with result as spooled_file, spooled_file.open() as file:
+                assert file.read() == b"Hello, World!"
+        else:
+            assert result == "Hello, World!"
+        assert list(tmp_path.iterdir()) == []
+
     @patch("app.s3_client.current_app")
     def test_get_s3_contents_client_error(self, mock_app):
         """Test get_s3_contents with ClientError"""
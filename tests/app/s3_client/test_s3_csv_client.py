@@ -1,6 +1,28 @@
+import base64
+import json
+from datetime import datetime, timedelta
 from unittest.mock import Mock
 
-from app.s3_client.s3_csv_client import remove_blank_lines, set_metadata_on_csv_upload
+import boto3
+import pytest
+import requests
+from moto import mock_aws
+
+from app.s3_client import S3CSVRows
+from app.s3_client.s3_csv_client import (
+    delete_direct_upload,
+    download_direct_upload,
+    get_csv_upload_rows,
+    get_direct_upload_form,
+    remove_blank_lines,
+    set_metadata_on_csv_upload,
+)
+from app.utils.spool import SpooledFile, upload_spool
+from notifications_utils.recipients import RecipientCSV
+from notifications_utils.s3 import S3ObjectNotFound
+from notifications_utils.template import SMSMessageTemplate
+
+TEMPLATE = SMSMessageTemplate({"content": "Hi ((name))", "template_type": "sms"})
 
 
 def test_sets_metadata(client_request, mocker):
@@ -29,3 +51,150 @@ def test_removes_blank_lines():
     }
     file_data = remove_blank_lines(filedata)
     assert file_data == {"data": "variable,phone number\r\ntest,+15555555555"}
+
+
+@pytest.fixture
+def s3_object(mocker):
+    with mock_aws():
+        bucket = boto3.resource("s3", region_name="us-east-1").Bucket("test-bucket")
+        bucket.create()
+        obj = bucket.Object("service-1234-notify/5678.csv")
+        # wrapped so we can count the requests
+        yield mocker.Mock(wraps=obj, bucket_name=obj.bucket_name, key=obj.key)
+
+
+def test_reads_only_as_much_of_an_upload_as_it_needs(s3_object):
+    contents = "phone number,name\r\n" + "".join(
+        f"202867{i:04},name {i}\r\n" for i in range(1000)
+    )
+    s3_object.put(Body=contents.encode("utf-8"))
+    rows = S3CSVRows(s3_object, first_range_size=64)
+
+    assert rows.get_rows().startswith("phone number,name\r\n")
+    assert s3_object.get.call_count == 1
+
+    recipients = RecipientCSV(rows.get_rows(100), template=TEMPLATE)
+    assert recipients[99]["name"].data == "name 99"
+    assert not rows.complete
+    assert len(rows.get_rows(100)) < len(contents)
+    assert s3_object.get.call_count == 6
+
+    assert rows.get_rows(2000) == contents
+    assert rows.complete
+    assert s3_object.get.call_count == 9
+
+
+def test_get_csv_upload_rows_reads_the_upload(mocker):
+    mock_get_csv_upload = mocker.patch("app.s3_client.s3_csv_client.get_csv_upload")
+
+    rows = get_csv_upload_rows("1234", "5678")
+
+    mock_get_csv_upload.assert_called_once_with("1234", "5678")
+    assert rows.obj == mock_get_csv_upload.return_value
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        "",
+        "phone number",
+        "phone number\r\n2028675309\r\n",
+        # ends exactly at the end of the first range
+        "phone number\r\n" + "2028675309\r\n" * 4,
+    ],
+)
+def test_reads_all_of_a_short_upload(s3_object, contents):
+    s3_object.put(Body=contents.encode("utf-8"))
+    rows = S3CSVRows(s3_object, first_range_size=62)
+
+    assert rows.get_rows(10) == contents
+    assert rows.complete
+
+
+def test_does_not_cut_rows_or_characters_short(s3_object):
+    contents = (
+        "name,phone number\r\n"
+        '"Zoë\r\nSecond line\r\nThird line",2028675301\r\n'
+        "Zoë,2028675302\r\n"
+    ) + "Zoë,2028675303\r\n" * 100
+    s3_object.put(Body=contents.encode("utf-8"))
+    rows = S3CSVRows(s3_object, first_range_size=2)
+
+    recipients = RecipientCSV(rows.get_rows(1), template=TEMPLATE)
+
+    assert recipients[0]["name"].data == "Zoë\r\nSecond line\r\nThird line"
+    assert not rows.complete
+
+
+def test_raises_if_the_upload_does_not_exist(s3_object):
+    with pytest.raises(S3ObjectNotFound):
+        S3CSVRows(s3_object).get_rows()
+
+
+@pytest.fixture
+def csv_upload_bucket(notify_admin, mocker, monkeypatch):
+    # the real S3 client, against moto rather than mocks
+    monkeypatch.setenv("NOTIFY_ENVIRONMENT", "moto")
+    mocker.patch.dict(
+        notify_admin.config,
+        {
+            "CSV_UPLOAD_BUCKET": {
+                "bucket": "test-csv-upload",
+                "region": "us-east-1",
+                "access_key_id": "testing",
+                "secret_access_key": "testing",
+            },
+            "CSV_DIRECT_UPLOAD_EXPIRY": 60,
+        },
+    )
+    with mock_aws():
+        bucket = boto3.resource("s3", region_name="us-east-1").Bucket("test-csv-upload")
+        bucket.create()
+        yield bucket
+
+
+@pytest.mark.parametrize("spool_threshold", [None, 10])
+def test_a_browser_can_upload_straight_to_s3(
+    csv_upload_bucket, mocker, spool_threshold
+):
+    mocker.patch.object(upload_spool, "threshold", spool_threshold)
+    form = get_direct_upload_form("1234", "5678", max_size=1000)
+
+    response = requests.post(
+        form["url"],
+        data=form["fields"],
+        files={"file": b"\xd0\xcf\x11\xe0 not utf-8"},
+    )
+
+    assert response.status_code == 204
+    contents = download_direct_upload("1234", "5678")
+    if spool_threshold:
+        assert isinstance(contents, SpooledFile)
+        with contents, contents.open() as file:
+            contents = file.read()
+    assert contents == b"\xd0\xcf\x11\xe0 not utf-8"
+
+    delete_direct_upload("1234", "5678")
+    assert list(csv_upload_bucket.objects.all()) == []
+
+
+def test_direct_upload_form_limits_what_can_be_uploaded(csv_upload_bucket):
+    # moto doesn't check the policy, so check what S3 would
+    form = get_direct_upload_form("1234", "5678", max_size=1000)
+    policy = json.loads(base64.b64decode(form["fields"]["policy"]))
+
+    assert form["url"] == "https://test-csv-upload.s3-fips.us-east-1.amazonaws.com/"
+    assert form["fields"]["key"] == "1234-service-notify/5678-original"
+    assert form["fields"]["x-amz-server-side-encryption"] == "AES256"
+    assert ["content-length-range", 1, 1000] in policy["conditions"]
+    assert {"key": "1234-service-notify/5678-original"} in policy["conditions"]
+    assert {"x-amz-server-side-encryption": "AES256"} in policy["conditions"]
+    expiration = datetime.strptime(policy["expiration"], "%Y-%m-%dT%H:%M:%SZ")
+    assert (
+        timedelta(seconds=50) < expiration - datetime.utcnow() <= timedelta(seconds=60)
+    )
+
+
+def test_a_direct_upload_which_never_happened_is_not_found(csv_upload_bucket):
+    with pytest.raises(S3ObjectNotFound):
+        download_direct_upload("1234", "5678")
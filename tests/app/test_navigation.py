@@ -47,6 +47,7 @@ EXCLUDED_ENDPOINTS = tuple(
             "check_and_resend_text_code",
             "check_and_resend_verification_code",
             "check_messages",
+            "check_messages_status",
             "check_notification",
             "check_tour_notification",
             "choose_account",
@@ -103,6 +104,7 @@ EXCLUDED_ENDPOINTS = tuple(
             "get_daily_stats",
             "get_daily_stats_by_user",
             "get_volumes_by_service",
+            "get_direct_csv_upload_form",
             "get_example_csv",
             "get_redis_report",
             "get_started",
@@ -165,6 +167,7 @@ EXCLUDED_ENDPOINTS = tuple(
             "send_files_by_email",
             "send_files_by_email_contact_details",
             "send_messages",
+            "send_messages_from_direct_upload",
             "send_notification",
             "send_one_off",
             "send_one_off_step",
@@ -0,0 +1,111 @@
+from unittest.mock import Mock
+
+import pytest
+import requests
+from freezegun import freeze_time
+
+from app.utils.api_health import ApiHealthMonitor, probe_api_health
+from tests.conftest import set_config
+
+
+@pytest.fixture
+def monitor(notify_admin):
+    monitor = ApiHealthMonitor()
+    with set_config(notify_admin, "API_HEALTH_CHECK_ENABLED", True):
+        monitor.init_app(notify_admin)
+    return monitor
+
+
+def test_monitor_reports_api_up_without_probing_when_disabled(notify_admin, mocker):
+    mock_probe = mocker.patch("app.utils.api_health.probe_api_health")
+    monitor = ApiHealthMonitor()
+    monitor.init_app(notify_admin)
+
+    assert monitor.is_api_down() is False
+    assert monitor.checked_at is None
+    assert not mock_probe.called
+
+
+def test_monitor_probes_inline_at_most_once_per_interval_without_gevent(
+    monitor, mocker
+):
+    mocker.patch("app.utils.api_health.monkey.is_module_patched", return_value=False)
+    mock_probe = mocker.patch(
+        "app.utils.api_health.probe_api_health", side_effect=[True, False]
+    )
+
+    with freeze_time("2020-01-01 12:00:00") as frozen_time:
+        assert monitor.is_api_down() is True
+        frozen_time.tick(14)
+        assert monitor.is_api_down() is True
+        frozen_time.tick(1)
+        assert monitor.is_api_down() is False
+
+    assert mock_probe.call_count == 2
+    assert monitor.checked_at.isoformat() == "2020-01-01T12:00:15+00:00"
+
+
+def test_monitor_probes_in_background_greenlet_with_gevent(monitor, mocker):
+    mocker.patch("app.utils.api_health.monkey.is_module_patched", return_value=True)
+    mock_spawn = mocker.patch("app.utils.api_health.gevent.spawn")
+    mock_probe = mocker.patch("app.utils.api_health.probe_api_health")
+
+    assert monitor.is_api_down() is False
+    assert monitor.is_api_down() is False
+
+    mock_spawn.assert_called_once_with(monitor._probe_forever)
+    assert not mock_probe.called
+
+
+def test_monitor_background_probe_updates_state(monitor, mocker):
+    mocker.patch("app.utils.api_health.probe_api_health", return_value=True)
+    mocker.patch("app.utils.api_health.gevent.sleep", side_effect=StopIteration)
+
+    with pytest.raises(StopIteration):
+        monitor._probe_forever()
+
+    assert monitor.is_down is True
+    assert monitor.checked_at is not None
+
+
+def test_monitor_background_probe_keeps_going_after_an_error(monitor, mocker):
+    mocker.patch(
+        "app.utils.api_health.probe_api_health", side_effect=[ValueError, True]
+    )
+    mock_sleep = mocker.patch(
+        "app.utils.api_health.gevent.sleep", side_effect=[None, StopIteration]
+    )
+    mock_logger = mocker.patch("app.utils.api_health.logger")
+
+    with pytest.raises(StopIteration):
+        monitor._probe_forever()
+
+    mock_logger.exception.assert_called_once_with("Error probing API health")
+    assert mock_sleep.call_count == 2
+    assert monitor.is_down is True
+
+
+@pytest.mark.parametrize(
+    ("status_code", "expected_result"),
+    [
+        (200, False),
+        (503, True),
+    ],
+)
+def test_probe_api_health_checks_status_code(mocker, status_code, expected_result):
+    mock_get = mocker.patch(
+        "app.utils.api_health.requests.get",
+        return_value=Mock(status_code=status_code),
+    )
+
+    assert probe_api_health("http://api") is expected_result
+    mock_get.assert_called_once_with("http://api", timeout=2)
+
+
+def test_probe_api_health_reports_connection_errors_as_down(mocker):
+    mocker.patch(
+        "app.utils.api_health.requests.get",
+        side_effect=requests.exceptions.ConnectionError,
+    )
+
+    assert probe_api_health("http://api") is True
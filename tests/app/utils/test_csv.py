@@ -1,14 +1,23 @@
-from collections import namedtuple
+import json
+from collections import Counter, namedtuple
 from csv import DictReader
 from io import StringIO
+from unittest.mock import call
 
 import pytest
 
 from app.utils.csv import (
+    CheckedRecipientCSV,
+    PartialRecipientCSV,
     convert_report_date_to_preferred_timezone,
     generate_notifications_csv,
+    get_csv_check,
+    get_csv_check_fingerprint,
     get_errors_for_csv,
+    report_csv_check_progress,
 )
+from notifications_utils.recipients import RecipientCSV, _iter_lines
+from notifications_utils.template import SMSMessageTemplate
 from tests.conftest import fake_uuid
 
 
@@ -224,8 +233,10 @@ def test_generate_notifications_csv_returns_correct_csv_file(
     expected_1st_row,
 ):
     mocker.patch(
-        "app.s3_client.s3_csv_client.s3download",
-        return_value=original_file_contents,
+        "app.s3_client.s3_csv_client.get_csv_upload_rows",
+        return_value=mocker.Mock(
+            get_rows=mocker.Mock(return_value=original_file_contents)
+        ),
     )
     csv_content = generate_notifications_csv(
         service_id="1234", job_id=fake_uuid, template_type="sms"
@@ -251,8 +262,7 @@ def test_generate_notifications_csv_calls_twice_if_next_link(
     mocker,
     job_id,
 ):
-    mocker.patch(
-        "app.s3_client.s3_csv_client.s3download",
+    mock_get_rows = mocker.Mock(
         return_value="""
             phone_number
             2028675304
@@ -267,6 +277,10 @@ def test_generate_notifications_csv_calls_twice_if_next_link(
             2028675309
         """,
     )
+    mocker.patch(
+        "app.s3_client.s3_csv_client.get_csv_upload_rows",
+        return_value=mocker.Mock(get_rows=mock_get_rows),
+    )
 
     service_id = "1234"
     response_with_links = _get_notifications_csv(rows=7, with_links=True)
@@ -293,20 +307,46 @@ def test_generate_notifications_csv_calls_twice_if_next_link(
     assert csv[0]["phone_number"] == "2028675304"
     assert csv[9]["phone_number"] == "2028675309"
     assert mock_get_notifications.call_count == 2
+    # the header, then twice as many rows each time it needs more
+    assert mock_get_rows.call_args_list == [
+        call(),
+        call(),
+        call(1),
+        call(2),
+        call(4),
+        call(8),
+        call(16),
+    ]
     # mock_calls[0][2] is the kwargs from first call
     assert mock_get_notifications.mock_calls[0][2]["page"] == 1
     assert mock_get_notifications.mock_calls[1][2]["page"] == 2
 
 
-MockRecipients = namedtuple(
-    "RecipientCSV",
-    [
-        "rows_with_bad_recipients",
-        "rows_with_missing_data",
-        "rows_with_message_too_long",
-        "rows_with_empty_message",
-    ],
-)
+def test_partial_recipient_csv_parses_the_rows_it_has_once(mocker):
+    s3_csv_rows = mocker.Mock(
+        get_rows=mocker.Mock(
+            return_value="phone number,name\n"
+            + "".join(f"202867530{i},name {i}\n" for i in range(10))
+        )
+    )
+    original_upload = PartialRecipientCSV(
+        s3_csv_rows,
+        template=SMSMessageTemplate({"content": "foo", "template_type": "sms"}),
+    )
+    assert original_upload[9]["name"].data == "name 9"
+
+    iter_lines = mocker.patch(
+        "notifications_utils.recipients._iter_lines", side_effect=_iter_lines
+    )
+    assert [original_upload[index]["name"].data for index in range(10)] == [
+        f"name {i}" for i in range(10)
+    ]
+    assert iter_lines.call_count == 0
+    assert s3_csv_rows.get_rows.call_args_list == [call(), call(10)]
+
+
+MockRecipients = namedtuple("RecipientCSV", ["summary"])
+MockSummary = namedtuple("RecipientCSVSummary", ["counts"])
 
 
 @pytest.mark.parametrize(
@@ -371,10 +411,14 @@ def test_get_errors_for_csv(
     assert (
         get_errors_for_csv(
             MockRecipients(
-                rows_with_bad_recipients,
-                rows_with_missing_data,
-                rows_with_message_too_long,
-                rows_with_empty_message,
+                MockSummary(
+                    Counter(
+                        has_bad_recipient=len(rows_with_bad_recipients),
+                        has_missing_data=len(rows_with_missing_data),
+                        message_too_long=len(rows_with_message_too_long),
+                        message_empty=len(rows_with_empty_message),
+                    )
+                )
             ),
             template_type,
         )
@@ -382,6 +426,72 @@ def test_get_errors_for_csv(
     )
 
 
+@pytest.mark.parametrize(
+    "file_contents",
+    [
+        "phone number,name\n+12028675309,Jo\n+12028675309,Sam\n",
+        "phone number,name\n+12028675309,Jo\n\n+12028675309,Sam\n",
+        "phone number,name\n+12028675309,Jo\n12345,Sam\n+12028675309,\n",
+        "phone number,name\n"
+        + "+12028675309,Jo\n" * 5
+        + "12345,Sam\n" * 3
+        + "+12028675309,Al\n" * 5,
+    ],
+)
+def test_checked_recipient_csv_matches_recipient_csv(file_contents):
+    template = SMSMessageTemplate({"content": "Hello ((name))", "template_type": "sms"})
+    kwargs = dict(template=template, max_initial_rows_shown=3, max_errors_shown=2)
+    recipients = RecipientCSV(file_contents, **kwargs)
+
+    checked = CheckedRecipientCSV(get_csv_check(recipients), **kwargs)
+
+    assert len(checked) == len(recipients)
+    assert checked.allowed_to_send_to == recipients.allowed_to_send_to
+    assert checked.row_errors == get_errors_for_csv(recipients, "sms")
+    assert checked.column_headers == recipients.column_headers
+    assert checked.has_errors == recipients.has_errors
+    assert checked.summary.counts == recipients.summary.counts
+    assert checked.summary.column_error_counts == recipients.summary.column_error_counts
+    assert checked.missing_column_headers == recipients.missing_column_headers
+    assert [
+        (row.index, row.recipient, row.has_error) if row else None
+        for row in checked.initial_rows
+    ] == [
+        (row.index, row.recipient, row.has_error) if row else None
+        for row in recipients.initial_rows
+    ]
+    assert [
+        (row.index, row.personalisation) for row in checked.initial_rows_with_errors
+    ] == [
+        (row.index, row.personalisation) for row in recipients.initial_rows_with_errors
+    ]
+    assert checked[0].recipient == recipients[0].recipient
+
+
+def test_checked_recipient_csv_only_keeps_displayed_rows():
+    template = SMSMessageTemplate({"content": "Hello", "template_type": "sms"})
+    recipients = RecipientCSV(
+        "phone number\n" + "+12028675309\n" * 10,
+        template=template,
+        max_initial_rows_shown=2,
+    )
+
+    csv_check = get_csv_check(recipients)
+    checked = CheckedRecipientCSV(csv_check, template=template)
+
+    assert [index for index, _ in csv_check["rows"]] == [0, 1]
+    assert checked[1].recipient == "+12028675309"
+    with pytest.raises(IndexError):
+        checked[5]
+
+
+def test_get_csv_check_fingerprint():
+    assert get_csv_check_fingerprint("a", 1, {"b": 2, "c": 3}) == (
+        get_csv_check_fingerprint("a", 1, {"c": 3, "b": 2})
+    )
+    assert get_csv_check_fingerprint("a", 1) != get_csv_check_fingerprint("a", 2)
+
+
 def test_convert_report_date_to_preferred_timezone():
     """Test that timezone conversion includes AM/PM and timezone name."""
     original = "2023-11-16 05:00:00"
@@ -427,3 +537,19 @@ def test_convert_report_date_with_explicit_timezone():
 
     altered = convert_report_date_to_preferred_timezone(original, target_timezone="UTC")
     assert altered == "2023-11-16 03:22:18 PM UTC"
+
+
+def test_report_csv_check_progress(mocker):
+    mock_get_redis = mocker.patch("app.utils.csv._get_redis")
+
+    report_csv_check_progress("redis://example", "some-key", 300, 5000, 2000)
+
+    mock_get_redis.assert_called_once_with("redis://example")
+    key, progress = mock_get_redis.return_value.set.call_args.args
+    assert key == "some-key"
+    assert json.loads(progress) == {
+        "status": "checking",
+        "rows_checked": 2000,
+        "total_rows": 5000,
+    }
+    assert mock_get_redis.return_value.set.call_args.kwargs == {"ex": 300}
@@ -0,0 +1,199 @@
+import operator
+import os
+import pickle
+import subprocess
+import sys
+import time
+from concurrent.futures import CancelledError, Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+from app.utils.csv import get_csv_check_for_file
+from app.utils.process_pool import (
+    ProcessPool,
+    ProcessPoolTimeoutError,
+    ResultTooLargeError,
+)
+from app.utils.spool import SpooledFile
+from notifications_utils.template import SMSMessageTemplate
+
+
+@pytest.fixture
+def pool(notify_admin):
+    pool = ProcessPool()
+    pool.init_app(notify_admin)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def enabled_pool(pool):
+    pool.enabled = True
+    pool._max_workers = 1
+    pool._timeout = 30
+    pool._max_result_size = 1024
+    return pool
+
+
+def test_runs_in_the_request_when_disabled(pool, mocker):
+    fn = mocker.Mock(return_value="result")
+
+    assert not pool.enabled
+    assert pool.run(fn, 1, two=2) == "result"
+    fn.assert_called_once_with(1, two=2)
+    assert pool._executor is None
+
+
+def test_runs_in_another_process_when_enabled(enabled_pool):
+    assert enabled_pool.run(os.getpid) != os.getpid()
+    assert enabled_pool.run(operator.mul, "ab", 3) == "ababab"
+
+
+def test_checks_a_spreadsheet_in_another_process(enabled_pool):
+    enabled_pool._max_result_size = 1024 * 1024
+
+    csv_check = enabled_pool.run(
+        get_csv_check_for_file,
+        "phone number\n202-867-5301\n12345\n",
+        {"template": SMSMessageTemplate({"content": "hi", "template_type": "sms"})},
+    )
+
+    assert csv_check["row_count"] == 2
+    assert csv_check["row_errors"] == ["fix 1 phone number"]
+
+
+def test_checks_a_spooled_spreadsheet_in_another_process(enabled_pool, tmp_path):
+    enabled_pool._max_result_size = 1024 * 1024
+    spooled_file = SpooledFile.create(str(tmp_path))
+    with spooled_file.open("wb") as file:
+        file.write(b"phone number\r\n202-867-5301\r\n12345")
+
+    csv_check = enabled_pool.run(
+        get_csv_check_for_file,
+        spooled_file,
+        {"template": SMSMessageTemplate({"content": "hi", "template_type": "sms"})},
+    )
+
+    assert csv_check["row_count"] == 2
+    assert csv_check["row_errors"] == ["fix 1 phone number"]
+
+
+def test_raises_errors_from_the_other_process(enabled_pool):
+    with pytest.raises(TypeError):
+        enabled_pool.run(operator.mul, "ab", "cd")
+
+
+def test_raises_if_result_is_too_large(enabled_pool):
+    with pytest.raises(ResultTooLargeError):
+        enabled_pool.run(operator.mul, "a", 2048)
+
+
+def test_raises_if_it_takes_too_long(enabled_pool):
+    enabled_pool._timeout = 0.1
+
+    with pytest.raises(ProcessPoolTimeoutError):
+        enabled_pool.run(time.sleep, 1)
+
+
+def test_starts_a_new_pool_after_taking_too_long(enabled_pool):
+    enabled_pool._timeout = 0.1
+    with pytest.raises(ProcessPoolTimeoutError):
+        enabled_pool.run(time.sleep, 60)
+
+    # with only one process, this would otherwise wait for it to finish sleeping
+    enabled_pool._timeout = 30
+    assert enabled_pool.run(operator.mul, "ab", 2) == "abab"
+
+
+@pytest.mark.parametrize("error", [CancelledError, BrokenProcessPool])
+def test_runs_again_if_another_call_stopped_the_pool(enabled_pool, mocker, error):
+    stopped = Future()
+    stopped.set_exception(error())
+    finished = Future()
+    finished.set_result(pickle.dumps("result"))
+    mock_get_executor = mocker.patch.object(
+        enabled_pool,
+        "_get_executor",
+        side_effect=[
+            mocker.Mock(submit=mocker.Mock(return_value=stopped)),
+            mocker.Mock(submit=mocker.Mock(return_value=finished)),
+        ],
+    )
+
+    assert enabled_pool.run(operator.mul, "a", 2) == "result"
+    assert mock_get_executor.call_count == 2
+
+
+def test_starts_a_new_pool_if_a_process_dies(enabled_pool):
+    with pytest.raises(BrokenProcessPool):
+        enabled_pool.run(os._exit, 1)
+
+    assert enabled_pool.run(operator.mul, "ab", 2) == "abab"
+
+
+def test_starts_a_new_pool_after_forking(enabled_pool, mocker):
+    executor = enabled_pool._get_executor()
+    assert enabled_pool._get_executor() is executor
+
+    mocker.patch("app.utils.process_pool.os.getpid", return_value=-1)
+    assert enabled_pool._get_executor() is not executor
+
+
+GEVENT_WORKER_SCRIPT = """
+from gevent import monkey
+
+monkey.patch_all()
+
+import gevent
+
+from app.utils.csv import get_csv_check_for_file
+from app.utils.process_pool import ProcessPool
+from notifications_utils.template import SMSMessageTemplate
+
+if __name__ == "__main__":
+    pool = ProcessPool()
+    pool.enabled = True
+    pool._max_workers = 1
+    pool._timeout = 60
+    pool._max_result_size = 1024 * 1024
+
+    ticks = 0
+
+    def tick():
+        global ticks
+        while True:
+            gevent.sleep(0.01)
+            ticks += 1
+
+    gevent.spawn(tick)
+    csv_check = pool.run(
+        get_csv_check_for_file,
+        "phone number\\n" + "202-867-5301\\n" * 20000,
+        {"template": SMSMessageTemplate({"content": "hi", "template_type": "sms"})},
+    )
+    print(csv_check["row_count"], ticks)
+    pool.shutdown()
+"""
+
+
+def test_other_greenlets_keep_running_in_a_gevent_worker(tmp_path):
+    # like a gunicorn gevent worker: patched by gunicorn_entry.py before the app
+    # is imported, with the pool spawning its processes from inside it
+    script = tmp_path / "worker.py"
+    script.write_text(GEVENT_WORKER_SCRIPT)
+
+    result = subprocess.run(
+        [sys.executable, str(script)],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        cwd=Path(__file__).parents[3],
+        env={**os.environ, "PYTHONPATH": str(Path(__file__).parents[3])},
+    )
+
+    assert result.returncode == 0, result.stderr
+    row_count, ticks = map(int, result.stdout.split())
+    assert row_count == 20000
+    assert ticks > 0
@@ -1,6 +1,13 @@
-from unittest.mock import patch
+from unittest.mock import ANY, patch
+from urllib.parse import parse_qs, urlparse
 
-from app.utils.s3_csv import convert_s3_csv_timestamps
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.s3_client.s3_csv_client import s3download
+from app.utils.s3_csv import convert_s3_csv_timestamps, get_converted_report_url
+from notifications_utils.s3 import S3ObjectNotFound
 
 
 def test_convert_s3_csv_timestamps_with_real_format():
@@ -118,3 +125,138 @@ def test_actual_timezone_conversion():
         # Should now be in 12-hour format with AM/PM and timezone
         assert "03:30:00 PM" in result
         assert "US/Eastern" in result
+
+
+@pytest.fixture
+def csv_upload_bucket(notify_admin, mocker, monkeypatch):
+    # the real S3 client, against moto rather than mocks
+    monkeypatch.setenv("NOTIFY_ENVIRONMENT", "moto")
+    mocker.patch.dict(
+        notify_admin.config,
+        {
+            "CSV_UPLOAD_BUCKET": {
+                "bucket": "test-csv-upload",
+                "region": "us-east-1",
+                "access_key_id": "testing",
+                "secret_access_key": "testing",
+            },
+            "REPORT_DOWNLOAD_URL_EXPIRY": 60,
+        },
+    )
+    with mock_aws():
+        bucket = boto3.resource("s3", region_name="us-east-1").Bucket("test-csv-upload")
+        bucket.create()
+        yield bucket
+
+
+def test_get_converted_report_url_converts_each_report_once_per_timezone(
+    csv_upload_bucket, mocker
+):
+    mock_s3download = mocker.patch(
+        "app.utils.s3_csv.s3download", side_effect=s3download
+    )
+    report = csv_upload_bucket.Object("1234-service-notify/7-day-report.csv")
+    report.put(Body=b"Phone Number,Time\n2025550104,2024-03-15 17:19:00\n")
+
+    url = get_converted_report_url("1234", "7-day-report", "US/Eastern", "a.csv")
+
+    converted = csv_upload_bucket.Object(
+        "1234-service-notify/7-day-report-US-Eastern.csv"
+    )
+    assert converted.get()["Body"].read() == (
+        b"Phone Number,Time\r\n2025550104,2024-03-15 01:19:00 PM US/Eastern\r\n"
+    )
+    assert converted.metadata == {"source-etag": report.e_tag}
+    assert csv_upload_bucket.meta.client.get_object_tagging(
+        Bucket="test-csv-upload", Key=converted.key
+    )["TagSet"] == [{"Key": "retention", "Value": "converted-report"}]
+    assert urlparse(url).path.endswith(
+        "/1234-service-notify/7-day-report-US-Eastern.csv"
+    )
+    query = parse_qs(urlparse(url).query)
+    assert query["response-content-disposition"] == ['inline; filename="a.csv"']
+    assert query["response-content-type"] == ["text/csv"]
+    assert query["X-Amz-Expires"] == ["60"]
+
+    get_converted_report_url("1234", "7-day-report", "US/Eastern", "b.csv")
+    assert mock_s3download.call_count == 1
+
+    get_converted_report_url("1234", "7-day-report", "US/Central", "c.csv")
+    assert mock_s3download.call_count == 2
+
+    report.put(Body=b"Phone Number,Time\n2025550104,2024-03-16 17:19:00\n")
+    get_converted_report_url("1234", "7-day-report", "US/Eastern", "d.csv")
+    assert mock_s3download.call_count == 3
+    assert b"2024-03-16 01:19:00 PM" in converted.get()["Body"].read()
+
+
+def test_get_converted_report_url_raises_if_there_is_no_report(csv_upload_bucket):
+    with pytest.raises(S3ObjectNotFound):
+        get_converted_report_url("1234", "7-day-report", "US/Eastern", "a.csv")
+
+
+def test_get_converted_report_url_deletes_the_copies_of_a_deleted_report(
+    csv_upload_bucket,
+):
+    report = csv_upload_bucket.Object("1234-service-notify/7-day-report.csv")
+    report.put(Body=b"Phone Number,Time\n")
+    csv_upload_bucket.Object("1234-service-notify/1-day-report.csv").put(Body=b"")
+    get_converted_report_url("1234", "7-day-report", "US/Eastern", "a.csv")
+    get_converted_report_url("1234", "7-day-report", "US/Central", "b.csv")
+    get_converted_report_url("1234", "1-day-report", "US/Eastern", "c.csv")
+
+    report.delete()
+    with pytest.raises(S3ObjectNotFound):
+        get_converted_report_url("1234", "7-day-report", "US/Eastern", "d.csv")
+
+    assert sorted(obj.key for obj in csv_upload_bucket.objects.all()) == [
+        "1234-service-notify/1-day-report-US-Eastern.csv",
+        "1234-service-notify/1-day-report.csv",
+    ]
+
+
+def test_get_converted_report_url_converts_holding_a_lock(csv_upload_bucket, mocker):
+    mocker.patch("app.extensions.redis_client.active", True)
+    mock_redis_set = mocker.patch("app.extensions.redis_client.set", return_value=True)
+    mock_delete_if_equal = mocker.patch("app.extensions.redis_client.delete_if_equal")
+    csv_upload_bucket.Object("1234-service-notify/7-day-report.csv").put(
+        Body=b"Phone Number,Time\n"
+    )
+
+    get_converted_report_url("1234", "7-day-report", "US/Eastern", "a.csv")
+
+    lock_key = "report-conversion-lock-1234-7-day-report-US-Eastern"
+    mock_redis_set.assert_called_once_with(lock_key, ANY, ex=120, nx=True)
+    token = mock_redis_set.call_args.args[1]
+    mock_delete_if_equal.assert_called_once_with(lock_key, token)
+
+
+@pytest.mark.parametrize("other_request_converts_it", [True, False])
+def test_get_converted_report_url_waits_for_another_request_converting_it(
+    csv_upload_bucket, mocker, other_request_converts_it
+):
+    mocker.patch("app.extensions.redis_client.active", True)
+    mocker.patch("app.extensions.redis_client.set", return_value=None)
+    mocker.patch("app.extensions.redis_client.delete_if_equal")
+    mocker.patch(
+        "app.extensions.redis_client.get", side_effect=[b"their-token"] * 3 + [None]
+    )
+    mock_s3download = mocker.patch(
+        "app.utils.s3_csv.s3download", side_effect=s3download
+    )
+    report = csv_upload_bucket.Object("1234-service-notify/7-day-report.csv")
+    report.put(Body=b"Phone Number,Time\n")
+    converted = csv_upload_bucket.Object(
+        "1234-service-notify/7-day-report-US-Eastern.csv"
+    )
+
+    def convert_it(seconds):
+        if other_request_converts_it:
+            converted.put(Body=b"converted", Metadata={"source-etag": report.e_tag})
+
+    mock_sleep = mocker.patch("app.utils.s3_csv.gevent.sleep", side_effect=convert_it)
+
+    get_converted_report_url("1234", "7-day-report", "US/Eastern", "a.csv")
+
+    assert mock_sleep.call_count == 3
+    assert mock_s3download.called is not other_request_converts_it
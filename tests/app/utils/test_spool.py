@@ -0,0 +1,93 @@
+import os
+import pickle
+import time
+from io import BytesIO
+
+import pytest
+
+from app.utils.spool import SPOOLED_FILE_PREFIX, SpooledFile, UploadSpool
+
+
+@pytest.fixture
+def spool(notify_admin, tmp_path):
+    spool = UploadSpool()
+    spool.init_app(notify_admin)
+    spool.threshold = 10
+    spool.directory = str(tmp_path)
+    return spool
+
+
+@pytest.mark.parametrize(
+    ("threshold", "size", "expected"),
+    [
+        (10, 10, False),
+        (10, 11, True),
+        (0, 11, False),
+        (None, 11, False),
+    ],
+)
+def test_should_spool(spool, threshold, size, expected):
+    spool.threshold = threshold
+    assert spool.should_spool(size) is expected
+
+
+def test_spools_a_stream_to_disk(spool, tmp_path):
+    with spool.spool(BytesIO(b"phone number\n2028675309\n")) as spooled_file:
+        assert os.path.dirname(spooled_file.path) == str(tmp_path)
+        assert os.path.basename(spooled_file.path).startswith(SPOOLED_FILE_PREFIX)
+        assert spooled_file.size == 24
+        assert spooled_file.count("\n") == 2
+        with spooled_file.mapped() as mapped:
+            assert mapped[:12] == b"phone number"
+
+    assert not os.path.exists(spooled_file.path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_deletes_the_file_if_spooling_fails(spool, tmp_path, mocker):
+    stream = mocker.Mock(read=mocker.Mock(side_effect=OSError("Disk full")))
+
+    with pytest.raises(OSError, match="Disk full"):
+        spool.spool(stream)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_maps_an_empty_file(spool):
+    with spool.spool(BytesIO()) as spooled_file:
+        with spooled_file.mapped() as mapped:
+            assert mapped == b""
+
+
+def test_only_the_path_is_pickled(spool):
+    with spool.spool(BytesIO(b"hello")) as spooled_file:
+        unpickled = pickle.loads(pickle.dumps(spooled_file))
+        assert vars(unpickled) == {"path": spooled_file.path}
+        with unpickled.open() as file:
+            assert file.read() == b"hello"
+
+
+def test_removes_stale_files(spool, tmp_path):
+    spool.max_age = 60
+    stale = tmp_path / f"{SPOOLED_FILE_PREFIX}stale"
+    recent = tmp_path / f"{SPOOLED_FILE_PREFIX}recent"
+    not_spooled = tmp_path / "something-else"
+    for path in (stale, recent, not_spooled):
+        path.write_bytes(b"")
+    an_hour_ago = time.time() - 3600
+    os.utime(stale, (an_hour_ago, an_hour_ago))
+    os.utime(not_spooled, (an_hour_ago, an_hour_ago))
+
+    spool.remove_stale_files()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        f"{SPOOLED_FILE_PREFIX}recent",
+        "something-else",
+    ]
+
+
+def test_deleting_twice_is_fine(tmp_path):
+    spooled_file = SpooledFile.create(str(tmp_path))
+    spooled_file.delete()
+    spooled_file.delete()
+    assert list(tmp_path.iterdir()) == []
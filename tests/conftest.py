@@ -16,6 +16,7 @@ import app.utils.api_health
 from app import create_app
 from app.enums import AuthType, ServicePermission
 from notifications_python_client.errors import HTTPError
+from notifications_utils.s3 import s3_resources
 from notifications_utils.url_safe_token import generate_token
 
 from . import (
@@ -580,6 +581,12 @@ def _disable_e2e_mode_for_unit_tests(monkeypatch, request):
         monkeypatch.delenv("NOTIFY_E2E_TEST_PASSWORD", raising=False)
 
 
+@pytest.fixture(autouse=True)
+def _clear_s3_resources():
+    # so no test reuses an S3 resource made with another test's mocks
+    s3_resources.clear()
+
+
 SERVICE_ONE_ID = "596364a0-858e-42c8-9062-a8fe822260eb"
 SERVICE_TWO_ID = "147ad62a-2951-4fa1-9ca0-093cd1a52c52"
 ORGANISATION_ID = "c011fa40-4cbe-4524-b415-dde2f421bd9c"
@@ -1870,7 +1877,7 @@ def mock_get_users_by_service(mocker):
 
 @pytest.fixture
 def mock_s3_download(mocker):
-    def _download(service_id, upload_id):
+    def _download(service_id, upload_id, spool_if_large=False):
         return """
             phone number,name
             +12028675109,John
@@ -0,0 +1,115 @@
+const statusURL = '/services/abc/start-job/def/check/ghi/status.json';
+const checkURL = '/services/abc/start-job/def/check/ghi';
+
+let responseObj = {};
+let originalLocation;
+
+const flushPromises = async () => {
+  for (let i = 0; i < 5; i++) {
+    await Promise.resolve();
+  }
+};
+
+beforeAll(() => {
+
+  jest.useFakeTimers();
+
+  global.fetch = jest.fn(() =>
+    Promise.resolve({
+      ok: true,
+      json: () => Promise.resolve(responseObj)
+    })
+  );
+
+  originalLocation = window.location;
+  delete window.location;
+  window.location = { assign: jest.fn() };
+
+  require('../../app/assets/javascripts/csvCheckPolling.js');
+
+});
+
+afterAll(() => {
+  window.location = originalLocation;
+  require('./support/teardown.js');
+});
+
+describe('CSV check polling', () => {
+
+  beforeEach(() => {
+
+    document.body.innerHTML = `
+      <div data-module="csv-check-polling" data-status-url="${statusURL}" data-check-url="${checkURL}">
+        <p aria-live="polite">
+          Checked <span class="csv-check-rows-checked">0</span> of about 5,000 rows.
+        </p>
+      </div>
+    `;
+
+  });
+
+  afterEach(() => {
+
+    document.body.innerHTML = '';
+    global.fetch.mockClear();
+    window.location.assign.mockClear();
+    jest.clearAllTimers();
+
+  });
+
+  test('It updates the number of rows checked while the file is being checked', async () => {
+
+    responseObj = { finished: false, rows_checked: 2000, total_rows: 5000 };
+
+    window.NotifyModules.start();
+    await flushPromises();
+
+    expect(global.fetch).toHaveBeenCalledWith(statusURL, expect.anything());
+    expect(document.querySelector('.csv-check-rows-checked').textContent).toEqual('2,000');
+    expect(window.location.assign).not.toHaveBeenCalled();
+
+    responseObj = { finished: false, rows_checked: 4000, total_rows: 5000 };
+
+    jest.advanceTimersByTime(2000);
+    await flushPromises();
+
+    expect(global.fetch).toHaveBeenCalledTimes(2);
+    expect(document.querySelector('.csv-check-rows-checked').textContent).toEqual('4,000');
+
+  });
+
+  test('It goes to the check page when the file has been checked', async () => {
+
+    responseObj = { finished: true, rows_checked: 5000, total_rows: 5000 };
+
+    window.NotifyModules.start();
+    await flushPromises();
+
+    expect(window.location.assign).toHaveBeenCalledWith(checkURL);
+
+    jest.advanceTimersByTime(10000);
+    expect(global.fetch).toHaveBeenCalledTimes(1);
+
+  });
+
+  test('It keeps polling if a request fails', async () => {
+
+    global.fetch.mockImplementationOnce(() =>
+      Promise.resolve({ ok: false, status: 500, statusText: 'Internal Server Error' })
+    );
+    responseObj = { finished: true };
+
+    window.NotifyModules.start();
+    await flushPromises();
+
+    expect(window.location.assign).not.toHaveBeenCalled();
+
+    jest.advanceTimersByTime(4000);
+    await flushPromises();
+
+    expect(global.fetch).toHaveBeenCalledTimes(2);
+    expect(window.location.assign).toHaveBeenCalledWith(checkURL);
+
+  });
+
+});
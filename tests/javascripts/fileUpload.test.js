@@ -83,6 +83,128 @@ describe('File upload', () => {
 
 });
 
+describe('Direct upload to S3', () => {
+
+  const directUploadURL = '/services/abc/send/def/csv/direct-upload';
+  const completeURL = '/services/abc/send/def/csv/direct-upload/ghi';
+  const s3URL = 'https://bucket.s3-fips.us-gov-west-1.amazonaws.com/';
+
+  let form;
+  let uploadControl;
+  let file;
+
+  const flushPromises = async () => {
+    for (let i = 0; i < 5; i++) {
+      await Promise.resolve();
+    }
+  };
+
+  const respond = (ok, body) => Promise.resolve({
+    ok,
+    status: ok ? 200 : 400,
+    statusText: ok ? 'OK' : 'Bad Request',
+    json: () => Promise.resolve(body)
+  });
+
+  beforeEach(() => {
+
+    document.body.innerHTML = `
+      <form method="post" enctype="multipart/form-data" data-module="file-upload" data-direct-upload-url="${directUploadURL}">
+        <input class="file-upload-field" id="file" name="file" type="file">
+        <button type="button" class="usa-button file-upload-button">Upload</button>
+        <button type="submit" class="usa-button file-upload-submit">Submit</button>
+      </form>`;
+
+    form = document.querySelector('form');
+    form.submit = jest.fn(() => {});
+    uploadControl = form.querySelector('input[type=file]');
+    file = new File(['phone number\n2028675309\n'], 'recipients.csv', { type: 'text/csv' });
+    Object.defineProperty(uploadControl, 'files', { value: [file] });
+
+    jest.spyOn(console, 'debug').mockImplementation(() => {});
+
+  });
+
+  afterEach(() => {
+
+    document.body.innerHTML = '';
+    delete global.fetch;
+    jest.restoreAllMocks();
+
+  });
+
+  test('uploads the file to S3, then submits only its name to Notify', async () => {
+
+    global.fetch = jest.fn()
+      .mockReturnValueOnce(respond(true, {
+        url: s3URL,
+        fields: { key: 'abc-service-notify/ghi-original', policy: 'policy' },
+        complete_url: completeURL
+      }))
+      .mockReturnValueOnce(respond(true));
+
+    window.NotifyModules.start();
+    helpers.triggerEvent(uploadControl, 'change', { eventInit: { bubbles: true } });
+    await flushPromises();
+
+    expect(global.fetch).toHaveBeenCalledTimes(2);
+    expect(global.fetch.mock.calls[0][0]).toEqual(directUploadURL);
+
+    const [url, { method, body }] = global.fetch.mock.calls[1];
+    expect(url).toEqual(s3URL);
+    expect(method).toEqual('POST');
+    expect([...body.keys()]).toEqual(['key', 'policy', 'file']);
+    expect(body.get('file').name).toEqual('recipients.csv');
+
+    expect(form.getAttribute('action')).toEqual(completeURL);
+    expect(form.querySelector('input[name=file_name]').value).toEqual('recipients.csv');
+    expect(uploadControl.disabled).toBe(true);
+    expect(form.submit).toHaveBeenCalledTimes(1);
+
+  });
+
+  test.each([
+    ['getting the pre-signed POST fails', () => [respond(false)]],
+    ['S3 rejects the file', () => [
+      respond(true, { url: s3URL, fields: {}, complete_url: completeURL }),
+      respond(false)
+    ]],
+    ['the request errors', () => [Promise.reject(new Error('Network error'))]],
+  ])('sends the file through Notify if %s', async (_, responses) => {
+
+    global.fetch = jest.fn();
+    responses().forEach(response => global.fetch.mockReturnValueOnce(response));
+
+    window.NotifyModules.start();
+    helpers.triggerEvent(uploadControl, 'change', { eventInit: { bubbles: true } });
+    await flushPromises();
+
+    expect(form.submit).toHaveBeenCalledTimes(1);
+    expect(form.hasAttribute('action')).toBe(false);
+    expect(form.querySelector('input[name=file_name]')).toBeNull();
+    expect(uploadControl.disabled).toBe(false);
+
+  });
+
+  test('going back to the page puts the form back as it was', () => {
+
+    form.reset = jest.fn(() => {});
+
+    window.NotifyModules.start();
+    form.setAttribute('action', completeURL);
+    uploadControl.disabled = true;
+    form.insertAdjacentHTML('beforeend', '<input type="hidden" class="file-upload-file-name" name="file_name" value="recipients.csv">');
+
+    helpers.triggerEvent(window, 'pageshow');
+
+    expect(form.hasAttribute('action')).toBe(false);
+    expect(uploadControl.disabled).toBe(false);
+    expect(form.querySelector('input[name=file_name]')).toBeNull();
+
+  });
+
+});
+
 describe('File upload "upload-trigger" click handler', () => {
   let form;
 
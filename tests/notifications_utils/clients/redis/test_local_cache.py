@@ -0,0 +1,57 @@
+import pytest
+from freezegun import freeze_time
+
+from notifications_utils.clients.redis.local_cache import LocalCache
+
+
+def test_get_returns_none_for_missing_key():
+    assert LocalCache(max_size=2, ttl_in_seconds=5).get("foo") is None
+
+
+def test_entries_expire_after_ttl():
+    local_cache = LocalCache(max_size=2, ttl_in_seconds=5)
+
+    with freeze_time("2020-01-01 12:00:00") as frozen_time:
+        local_cache.set("foo", "bar")
+        frozen_time.tick(4)
+        assert local_cache.get("foo") == "bar"
+        frozen_time.tick(1)
+        assert local_cache.get("foo") is None
+
+    assert len(local_cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    local_cache = LocalCache(max_size=2, ttl_in_seconds=5)
+
+    local_cache.set("a", 1)
+    local_cache.set("b", 2)
+    local_cache.get("a")
+    local_cache.set("c", 3)
+
+    assert local_cache.get("a") == 1
+    assert local_cache.get("b") is None
+    assert local_cache.get("c") == 3
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected_remaining_keys"),
+    [
+        ("service-?", {"service-12", "user-1"}),
+        ("service-*", {"user-1"}),
+        ("service-[^1]*", {"service-1", "service-12", "user-1"}),
+        ("*", set()),
+    ],
+)
+def test_delete_by_pattern(pattern, expected_remaining_keys):
+    local_cache = LocalCache(max_size=10, ttl_in_seconds=5)
+    for key in ("service-1", "service-12", "user-1"):
+        local_cache.set(key, "value")
+
+    local_cache.delete_by_pattern(pattern)
+
+    assert {
+        key
+        for key in ("service-1", "service-12", "user-1")
+        if local_cache.get(key) is not None
+    } == expected_remaining_keys
@@ -34,7 +34,12 @@ def mocked_redis_client(app, mocked_redis_pipeline, delete_mock, mocker):
     )
 
     mocker.patch.object(
-        redis_client, "scripts", {"delete-keys-by-pattern": delete_mock}
+        redis_client.redis_store, "scan_iter", return_value=iter(["foo1", "foo2"])
+    )
+    mocker.patch.object(
+        redis_client,
+        "scripts",
+        {"delete-tracked-keys": delete_mock, "delete-if-equal": delete_mock},
     )
 
     mocker.patch.object(
@@ -55,7 +60,10 @@ def failing_redis_client(mocked_redis_client, delete_mock):
     mocked_redis_client.redis_store.incr.side_effect = KeyError("incr failed")
     mocked_redis_client.redis_store.pipeline.side_effect = KeyError("pipeline failed")
     mocked_redis_client.redis_store.delete.side_effect = KeyError("delete failed")
-    delete_mock.side_effect = KeyError("delete by pattern failed")
+    mocked_redis_client.redis_store.scan_iter.side_effect = KeyError(
+        "delete by pattern failed"
+    )
+    delete_mock.side_effect = KeyError("delete tracked failed")
     return mocked_redis_client
 
 
@@ -69,6 +77,9 @@ def test_should_not_raise_exception_if_raise_set_to_false(
     assert failing_redis_client.delete("delete_key") is None
     assert failing_redis_client.delete("a", "b", "c") is None
     assert failing_redis_client.delete_by_pattern("pattern") == 0
+    assert failing_redis_client.set_tracked("key", "value", ["tracking"]) is None
+    assert failing_redis_client.delete_tracked("tracking") == 0
+    assert failing_redis_client.delete_if_equal("lock", "token") == 0
 
     assert mock_logger.mock_calls == [
         call.exception("Redis error performing incr on incr_key"),
@@ -76,6 +87,9 @@ def test_should_not_raise_exception_if_raise_set_to_false(
         call.exception("Redis error performing delete on delete_key"),
         call.exception("Redis error performing delete on a, b, c"),
         call.exception("Redis error performing delete-by-pattern on pattern"),
+        call.exception("Redis error performing set-tracked on key"),
+        call.exception("Redis error performing delete-tracked on tracking"),
+        call.exception("Redis error performing delete-if-equal on lock"),
     ]
 
 
@@ -107,6 +121,10 @@ def test_should_raise_exception_if_raise_set_to_true(
         failing_redis_client.delete_by_pattern("pattern", raise_exception=True)
     assert str(e.value) == "'delete by pattern failed'"
 
+    with pytest.raises(KeyError) as e:
+        failing_redis_client.delete_tracked("tracking", raise_exception=True)
+    assert str(e.value) == "'delete tracked failed'"
+
 
 def test_should_not_call_if_not_enabled(mocked_redis_client, delete_mock):
     mocked_redis_client.active = False
@@ -117,12 +135,17 @@ def test_should_not_call_if_not_enabled(mocked_redis_client, delete_mock):
     assert mocked_redis_client.exceeded_rate_limit("rate_limit_key", 100, 100) is False
     assert mocked_redis_client.delete("delete_key") is None
     assert mocked_redis_client.delete_by_pattern("pattern") == 0
+    assert mocked_redis_client.set_tracked("key", "value", ["tracking"]) is None
+    assert mocked_redis_client.delete_tracked("tracking") == 0
+    assert mocked_redis_client.delete_if_equal("lock", "token") == 0
+    assert list(mocked_redis_client.scan_key_details()) == []
 
     mocked_redis_client.redis_store.get.assert_not_called()
     mocked_redis_client.redis_store.set.assert_not_called()
     mocked_redis_client.redis_store.incr.assert_not_called()
     mocked_redis_client.redis_store.delete.assert_not_called()
     mocked_redis_client.redis_store.pipeline.assert_not_called()
+    mocked_redis_client.redis_store.scan_iter.assert_not_called()
     delete_mock.assert_not_called()
 
 
@@ -195,6 +218,12 @@ def test_delete_multi(mocked_redis_client):
     mocked_redis_client.redis_store.delete.assert_called_with("a", "b", "c")
 
 
+def test_expire(mocker, mocked_redis_client):
+    mocker.patch.object(mocked_redis_client.redis_store, "expire")
+    mocked_redis_client.expire("foo", 300)
+    mocked_redis_client.redis_store.expire.assert_called_once_with("foo", 300)
+
+
 @pytest.mark.parametrize(
     ("input", "output"),
     [
@@ -213,7 +242,85 @@ def test_prepare_value(input, output):
     assert prepare_value(input) == output
 
 
-def test_delete_by_pattern(mocked_redis_client, delete_mock):
-    ret = mocked_redis_client.delete_by_pattern("foo")
-    assert ret == 4
-    delete_mock.assert_called_once_with(args=["foo"])
+def test_delete_by_pattern(mocked_redis_client):
+    mocked_redis_client.redis_store.delete.return_value = 2
+
+    ret = mocked_redis_client.delete_by_pattern("foo*")
+
+    assert ret == 2
+    mocked_redis_client.redis_store.scan_iter.assert_called_once_with(
+        match="foo*", count=1000
+    )
+    mocked_redis_client.redis_store.delete.assert_called_once_with("foo1", "foo2")
+
+
+def test_delete_by_pattern_deletes_in_batches(mocker, mocked_redis_client):
+    mocker.patch.object(mocked_redis_client, "SCAN_BATCH_SIZE", 2)
+    mocked_redis_client.redis_store.scan_iter.return_value = iter("abcde")
+    mocked_redis_client.redis_store.delete.side_effect = [2, 2, 1]
+
+    assert mocked_redis_client.delete_by_pattern("?") == 5
+    assert mocked_redis_client.redis_store.delete.call_args_list == [
+        call("a", "b"),
+        call("c", "d"),
+        call("e"),
+    ]
+
+
+def test_delete_by_pattern_with_no_matching_keys(mocked_redis_client):
+    mocked_redis_client.redis_store.scan_iter.return_value = iter([])
+
+    assert mocked_redis_client.delete_by_pattern("foo*") == 0
+    mocked_redis_client.redis_store.delete.assert_not_called()
+
+
+def test_scan_key_details(mocker, mocked_redis_client, mocked_redis_pipeline):
+    mocker.patch.object(mocked_redis_client, "SCAN_BATCH_SIZE", 2)
+    mocked_redis_client.redis_store.scan_iter.return_value = iter([b"a", b"b", b"c"])
+    mocked_redis_pipeline.execute.side_effect = [
+        [b"string", 10, 50, b"hash", -2, None],
+        [b"set", -1, 100],
+    ]
+
+    assert list(mocked_redis_client.scan_key_details("?")) == [
+        (b"a", b"string", 10, 50),
+        (b"c", b"set", -1, 100),
+    ]
+    mocked_redis_client.redis_store.scan_iter.assert_called_once_with(
+        match="?", count=2
+    )
+    mocked_redis_client.redis_store.pipeline.assert_called_with(transaction=False)
+    assert mocked_redis_pipeline.mock_calls[:7] == [
+        call.type(b"a"),
+        call.ttl(b"a"),
+        call.memory_usage(b"a"),
+        call.type(b"b"),
+        call.ttl(b"b"),
+        call.memory_usage(b"b"),
+        call.execute(),
+    ]
+
+
+def test_set_tracked(mocked_redis_client, mocked_redis_pipeline):
+    mocked_redis_client.set_tracked(
+        "key", "value", ["tracking-1", "tracking-2"], ex=10, tracking_ex=20
+    )
+
+    assert mocked_redis_pipeline.mock_calls == [
+        call.set("key", "value", ex=10),
+        call.sadd("tracking-1", "key"),
+        call.expire("tracking-1", 20),
+        call.sadd("tracking-2", "key"),
+        call.expire("tracking-2", 20),
+        call.execute(),
+    ]
+
+
+def test_delete_tracked(mocked_redis_client, delete_mock):
+    assert mocked_redis_client.delete_tracked("tracking") == 4
+    delete_mock.assert_called_once_with(keys=["tracking"])
+
+
+def test_delete_if_equal(mocked_redis_client, delete_mock):
+    assert mocked_redis_client.delete_if_equal("lock", "token") == 4
+    delete_mock.assert_called_once_with(keys=["lock"], args=["token"])
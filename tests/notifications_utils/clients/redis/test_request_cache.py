@@ -1,4 +1,9 @@
+import json
+import zlib
+from unittest.mock import ANY, call
+
 import pytest
+from freezegun import freeze_time
 
 from notifications_utils.clients.redis import RequestCache
 from notifications_utils.clients.redis.redis_client import RedisClient
@@ -188,3 +193,571 @@ def test_delete_by_pattern_even_if_call_raises(mocker, mocked_redis_client, cach
         foo()
 
     mock_redis_delete.assert_called_once_with("bar-???")
+
+
+def test_delete_by_pattern_deletes_tracked_namespace(
+    mocker, mocked_redis_client, cache
+):
+    mock_delete_by_pattern = mocker.patch.object(
+        mocked_redis_client, "delete_by_pattern"
+    )
+    mock_delete_tracked = mocker.patch.object(
+        mocked_redis_client, "delete_tracked", return_value=3
+    )
+
+    @cache.delete_by_pattern("service-{service_id}-template-*")
+    def foo(service_id, template_id):
+        return "bar"
+
+    assert foo(1, template_id=2) == "bar"
+
+    mock_delete_tracked.assert_called_once_with(
+        "request-cache-namespace-service-1-template-"
+    )
+    mock_delete_by_pattern.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("scan_fallback", "expected_deleted", "expected_scans"),
+    [
+        (None, 3, []),
+        (False, 3, []),
+        (True, 5, [call("service-1-template-*")]),
+    ],
+)
+def test_invalidate_namespace_only_scans_for_keys_stored_before_tracking_if_asked(
+    app,
+    mocker,
+    mocked_redis_client,
+    cache,
+    scan_fallback,
+    expected_deleted,
+    expected_scans,
+):
+    app.config["REDIS_NAMESPACE_SCAN_FALLBACK"] = scan_fallback
+    cache.init_app(app)
+    mock_delete_by_pattern = mocker.patch.object(
+        mocked_redis_client, "delete_by_pattern", return_value=2
+    )
+    mock_delete_tracked = mocker.patch.object(
+        mocked_redis_client, "delete_tracked", return_value=3
+    )
+
+    assert cache.invalidate_namespace("service-1-template-") == expected_deleted
+
+    mock_delete_tracked.assert_called_once_with(
+        "request-cache-namespace-service-1-template-"
+    )
+    assert mock_delete_by_pattern.call_args_list == expected_scans
+
+
+@pytest.mark.parametrize(
+    ("key_format", "expected_namespaces"),
+    [
+        ("service-{service_id}-template-{template_id}", ["service-1-template-"]),
+        ("service-{service_id}-template-folders", ["service-1-template-"]),
+        ("service-{service_id}-templates", []),
+        ("service-{template_id}-template-{service_id}", []),
+    ],
+)
+def test_set_tracks_keys_in_namespaces(
+    mocker, mocked_redis_client, cache, key_format, expected_namespaces
+):
+    mocker.patch.object(mocked_redis_client, "get", return_value=None)
+    mock_redis_set = mocker.patch.object(mocked_redis_client, "set")
+    mock_redis_set_tracked = mocker.patch.object(mocked_redis_client, "set_tracked")
+
+    @cache.delete_by_pattern("service-{service_id}-template-*")
+    @cache.delete_by_pattern("user-{user_id}-*")
+    @cache.delete_by_pattern("service-{service_id}-???")
+    def delete(service_id, user_id):
+        pass
+
+    @cache.set(key_format, ttl_in_seconds=60)
+    def foo(service_id, template_id):
+        return "bar"
+
+    foo(1, 2)
+
+    redis_key = key_format.format(service_id=1, template_id=2)
+    if expected_namespaces:
+        mock_redis_set_tracked.assert_called_once_with(
+            redis_key,
+            '"bar"',
+            [
+                f"request-cache-namespace-{namespace}"
+                for namespace in expected_namespaces
+            ],
+            ex=60,
+            tracking_ex=604_800,
+        )
+        mock_redis_set.assert_not_called()
+    else:
+        mock_redis_set.assert_called_once_with(redis_key, '"bar"', ex=60)
+        mock_redis_set_tracked.assert_not_called()
+
+
+@pytest.fixture
+def cache_with_local_cache(app, mocked_redis_client):
+    app.config["REDIS_LOCAL_CACHE_ENABLED"] = True
+    app.config["REDIS_LOCAL_CACHE_MAX_SIZE"] = 2
+    app.config["REDIS_LOCAL_CACHE_TTL"] = 5
+    cache = RequestCache(mocked_redis_client)
+    cache.init_app(app)
+    return cache
+
+
+def test_local_cache_is_off_by_default(app, mocked_redis_client):
+    cache = RequestCache(mocked_redis_client)
+    cache.init_app(app)
+
+    assert cache.local_cache is None
+
+
+def test_local_cache_is_off_if_redis_is_disabled(app):
+    app.config["REDIS_ENABLED"] = False
+    app.config["REDIS_LOCAL_CACHE_ENABLED"] = True
+    redis_client = RedisClient()
+    redis_client.init_app(app)
+    cache = RequestCache(redis_client)
+    cache.init_app(app)
+
+    assert cache.local_cache is None
+
+
+def test_local_cache_serves_repeat_reads_without_redis(
+    mocker, mocked_redis_client, cache_with_local_cache
+):
+    mock_redis_get = mocker.patch.object(
+        mocked_redis_client, "get", return_value=b'{"a": "b"}'
+    )
+
+    @cache_with_local_cache.set("{a}")
+    def foo(a):
+        raise RuntimeError
+
+    with freeze_time("2020-01-01 12:00:00") as frozen_time:
+        assert foo(1) == {"a": "b"}
+        frozen_time.tick(4)
+        assert foo(1) == {"a": "b"}
+        frozen_time.tick(1)
+        assert foo(1) == {"a": "b"}
+
+    assert mock_redis_get.call_args_list == [call("1"), call("1")]
+
+
+def test_local_cache_returns_a_new_copy_each_time(
+    mocker, mocked_redis_client, cache_with_local_cache
+):
+    mocker.patch.object(mocked_redis_client, "get", return_value=b'{"a": "b"}')
+
+    @cache_with_local_cache.set("foo")
+    def foo():
+        raise RuntimeError
+
+    foo()["a"] = "changed"
+
+    assert foo() == {"a": "b"}
+
+
+def test_local_cache_stores_values_fetched_from_api(
+    mocker, mocked_redis_client, cache_with_local_cache
+):
+    mocker.patch.object(mocked_redis_client, "get", return_value=None)
+    mock_redis_set = mocker.patch.object(mocked_redis_client, "set")
+    mock_api_call = mocker.Mock(return_value={"from": "api"})
+
+    @cache_with_local_cache.set("foo")
+    def foo():
+        return mock_api_call()
+
+    assert foo() == foo() == {"from": "api"}
+
+    mock_api_call.assert_called_once_with()
+    mock_redis_set.assert_called_once_with("foo", '{"from":"api"}', ex=604_800)
+
+
+def test_local_cache_evicts_least_recently_used(
+    mocker, mocked_redis_client, cache_with_local_cache
+):
+    mock_redis_get = mocker.patch.object(mocked_redis_client, "get", return_value=b"1")
+
+    @cache_with_local_cache.set("{a}")
+    def foo(a):
+        raise RuntimeError
+
+    foo("a")
+    foo("b")
+    foo("a")
+    foo("c")
+    foo("a")
+    foo("b")
+
+    assert mock_redis_get.call_args_list == [call("a"), call("b"), call("c"), call("b")]
+
+
+def test_delete_invalidates_local_cache_and_other_processes(
+    mocker, mocked_redis_client, cache_with_local_cache
+):
+    mock_redis_get = mocker.patch.object(mocked_redis_client, "get", return_value=b"1")
+    mocker.patch.object(mocked_redis_client, "delete")
+    mock_publish = mocker.patch.object(mocked_redis_client, "publish")
+
+    @cache_with_local_cache.set("{a}")
+    def get(a):
+        raise RuntimeError
+
+    @cache_with_local_cache.delete("{a}")
+    def update(a):
+        pass
+
+    get(1)
+    update(1)
+    get(1)
+
+    assert mock_redis_get.call_args_list == [call("1"), call("1")]
+    mock_publish.assert_called_once_with("request-cache-invalidation", '{"keys":["1"]}')
+
+
+def test_delete_by_pattern_invalidates_local_cache_and_other_processes(
+    mocker, mocked_redis_client, cache_with_local_cache
+):
+    mock_redis_get = mocker.patch.object(mocked_redis_client, "get", return_value=b"1")
+    mocker.patch.object(mocked_redis_client, "delete_by_pattern")
+    mock_publish = mocker.patch.object(mocked_redis_client, "publish")
+
+    @cache_with_local_cache.set("service-{a}")
+    def get(a):
+        raise RuntimeError
+
+    @cache_with_local_cache.delete_by_pattern("service-?")
+    def update():
+        pass
+
+    get(1)
+    get(22)
+    update()
+    get(1)
+    get(22)
+
+    assert mock_redis_get.call_args_list == [
+        call("service-1"),
+        call("service-22"),
+        call("service-1"),
+    ]
+    mock_publish.assert_called_once_with(
+        "request-cache-invalidation", '{"pattern":"service-?"}'
+    )
+
+
+def test_invalidation_messages_from_other_processes_are_applied(
+    mocker, mocked_redis_client, cache_with_local_cache
+):
+    local_cache = cache_with_local_cache.local_cache
+    # could have been deleted while we weren't subscribed
+    local_cache.set("stale", b"1")
+
+    def listen():
+        local_cache.set("service-1", b"1")
+        local_cache.set("user-1", b"1")
+        yield {"data": b'{"keys":["user-1"]}'}
+
+    mock_pubsub = mocker.patch.object(
+        mocked_redis_client.redis_store, "pubsub"
+    ).return_value
+    mock_pubsub.listen.side_effect = listen
+    mocker.patch(
+        "notifications_utils.clients.redis.request_cache.gevent.sleep",
+        side_effect=StopIteration,
+    )
+
+    with pytest.raises(StopIteration):
+        cache_with_local_cache._listen_for_invalidations()
+
+    mock_pubsub.subscribe.assert_called_once_with("request-cache-invalidation")
+    assert local_cache.get("stale") is None
+    assert local_cache.get("service-1") == b"1"
+    assert local_cache.get("user-1") is None
+
+
+@pytest.fixture
+def fake_redis(mocker, mocked_redis_client):
+    store = {}
+
+    def set(key, value, ex=None, px=None, nx=False, xx=False):
+        if nx and key in store:
+            return None
+        store[key] = value
+        return True
+
+    def delete(*keys):
+        for key in keys:
+            store.pop(key, None)
+
+    def delete_if_equal(key, value):
+        if store.get(key) == value:
+            del store[key]
+
+    mocker.patch.object(mocked_redis_client, "get", side_effect=store.get)
+    mocker.patch.object(mocked_redis_client, "set", side_effect=set)
+    mocker.patch.object(mocked_redis_client, "delete", side_effect=delete)
+    mocker.patch.object(
+        mocked_redis_client, "delete_if_equal", side_effect=delete_if_equal
+    )
+    return store
+
+
+@pytest.fixture
+def api_call(mocker):
+    return mocker.Mock(return_value={"data_from": "api"})
+
+
+@pytest.fixture
+def protected_get(app, cache, api_call):
+    app.config["REDIS_STAMPEDE_PROTECTION_ENABLED"] = True
+    cache.init_app(app)
+
+    @cache.set("foo", ttl_in_seconds=60, stale_ttl_in_seconds=30)
+    def get():
+        return api_call()
+
+    return get
+
+
+def _entry(value, fresh_until, delta=0):
+    return json.dumps({"value": value, "fresh_until": fresh_until, "delta": delta})
+
+
+@freeze_time("2020-01-01 00:00:00")
+def test_set_with_stale_ttl_stores_when_value_stops_being_fresh(
+    mocked_redis_client, fake_redis, protected_get
+):
+    assert protected_get() == {"data_from": "api"}
+
+    assert json.loads(fake_redis["foo"]) == {
+        "value": {"data_from": "api"},
+        "fresh_until": 1577836800 + 60,
+        "delta": 0,
+    }
+    assert mocked_redis_client.set.call_args_list == [
+        call("request-cache-lock-foo", ANY, ex=10, nx=True),
+        call("foo", ANY, ex=90),
+    ]
+    assert "request-cache-lock-foo" not in fake_redis
+
+
+def test_set_with_stale_ttl_does_not_release_someone_elses_lock(
+    fake_redis, api_call, protected_get
+):
+    def our_lock_expires_and_someone_else_takes_it():
+        fake_redis["request-cache-lock-foo"] = "their-token"
+        return {"data_from": "api"}
+
+    api_call.side_effect = our_lock_expires_and_someone_else_takes_it
+
+    assert protected_get() == {"data_from": "api"}
+    assert fake_redis["request-cache-lock-foo"] == "their-token"
+
+
+def test_locks_have_a_different_token_each_time(fake_redis, cache):
+    first_token = cache._acquire_lock("foo")
+    assert cache._acquire_lock("foo") is None
+    cache._release_lock("foo", first_token)
+    second_token = cache._acquire_lock("foo")
+
+    assert first_token is not None
+    assert second_token is not None
+    assert second_token != first_token
+
+
+@freeze_time("2020-01-01 00:00:00")
+def test_set_with_stale_ttl_is_off_unless_enabled(
+    mocked_redis_client, fake_redis, cache, api_call
+):
+    @cache.set("foo", ttl_in_seconds=60, stale_ttl_in_seconds=30)
+    def get():
+        return api_call()
+
+    assert get() == {"data_from": "api"}
+
+    # stored as before, so workers running older code can still read it
+    assert json.loads(fake_redis["foo"]) == {"data_from": "api"}
+    mocked_redis_client.set.assert_called_once_with("foo", ANY, ex=60)
+
+
+@pytest.mark.parametrize(
+    "cached",
+    [
+        _entry("cached", fresh_until=0),
+        '"cached"',
+    ],
+)
+def test_set_with_stale_ttl_reads_either_format_when_off(
+    fake_redis, cache, api_call, cached
+):
+    fake_redis["foo"] = cached
+
+    @cache.set("foo", ttl_in_seconds=60, stale_ttl_in_seconds=30)
+    def get():
+        return api_call()
+
+    assert get() == "cached"
+    api_call.assert_not_called()
+
+
+@freeze_time("2020-01-01 00:00:00")
+@pytest.mark.parametrize(
+    "cached",
+    [
+        _entry("cached", fresh_until=1577836800 + 1),
+        # stored before stale_ttl_in_seconds was set
+        '"cached"',
+    ],
+)
+def test_set_with_stale_ttl_returns_fresh_value(
+    mocker, fake_redis, api_call, protected_get, cached
+):
+    mocker.patch(
+        "notifications_utils.clients.redis.request_cache.random", return_value=0.5
+    )
+    fake_redis["foo"] = cached
+
+    assert protected_get() == "cached"
+    api_call.assert_not_called()
+
+
+@freeze_time("2020-01-01 00:00:00")
+def test_set_with_stale_ttl_refreshes_stale_value(fake_redis, api_call, protected_get):
+    fake_redis["foo"] = _entry("stale", fresh_until=1577836800 - 1)
+
+    assert protected_get() == {"data_from": "api"}
+    assert json.loads(fake_redis["foo"])["value"] == {"data_from": "api"}
+    assert "request-cache-lock-foo" not in fake_redis
+
+
+@freeze_time("2020-01-01 00:00:00")
+def test_set_with_stale_ttl_serves_stale_value_while_someone_else_refreshes_it(
+    fake_redis, api_call, protected_get
+):
+    fake_redis["foo"] = _entry("stale", fresh_until=1577836800 - 1)
+    fake_redis["request-cache-lock-foo"] = 1
+
+    assert protected_get() == "stale"
+    api_call.assert_not_called()
+
+
+@freeze_time("2020-01-01 00:00:00")
+@pytest.mark.parametrize(
+    ("random", "delta", "expected_value"),
+    [
+        (0, 10, "cached"),
+        (0.5, 1, "cached"),
+        (0.5, 10, {"data_from": "api"}),
+        (0.99, 1, {"data_from": "api"}),
+    ],
+)
+def test_set_with_stale_ttl_refreshes_early_at_random(
+    mocker, fake_redis, protected_get, random, delta, expected_value
+):
+    mocker.patch(
+        "notifications_utils.clients.redis.request_cache.random", return_value=random
+    )
+    fake_redis["foo"] = _entry("cached", fresh_until=1577836800 + 2, delta=delta)
+
+    assert protected_get() == expected_value
+
+
+def test_set_with_stale_ttl_waits_for_someone_else_to_fetch_missing_value(
+    mocker, fake_redis, api_call, protected_get
+):
+    fake_redis["request-cache-lock-foo"] = 1
+
+    def someone_else_fetches(seconds):
+        fake_redis["foo"] = _entry("theirs", fresh_until=0)
+
+    mock_sleep = mocker.patch(
+        "notifications_utils.clients.redis.request_cache.gevent.sleep",
+        side_effect=someone_else_fetches,
+    )
+
+    assert protected_get() == "theirs"
+    mock_sleep.assert_called_once_with(0.05)
+    api_call.assert_not_called()
+
+
+def test_set_with_stale_ttl_fetches_value_itself_if_waiting_takes_too_long(
+    mocker, fake_redis, api_call, protected_get
+):
+    fake_redis["request-cache-lock-foo"] = 1
+    mocker.patch.object(RequestCache, "LOCK_WAIT_IN_SECONDS", 0.1)
+    mocker.patch("notifications_utils.clients.redis.request_cache.gevent.sleep")
+
+    assert protected_get() == {"data_from": "api"}
+    api_call.assert_called_once_with()
+    assert json.loads(fake_redis["foo"])["value"] == {"data_from": "api"}
+
+
+def test_set_with_stale_ttl_releases_lock_if_call_raises(
+    fake_redis, api_call, protected_get
+):
+    api_call.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        protected_get()
+
+    assert fake_redis == {}
+
+
+@pytest.mark.parametrize(
+    ("compression_threshold", "expected_compressed"),
+    [
+        (None, False),
+        (0, False),
+        (100, True),
+        (1000, False),
+    ],
+)
+def test_set_compresses_values_over_threshold(
+    app, fake_redis, cache, compression_threshold, expected_compressed
+):
+    app.config["REDIS_COMPRESSION_THRESHOLD"] = compression_threshold
+    cache.init_app(app)
+    big_response = {"data": ["template"] * 50}
+
+    @cache.set("foo")
+    def get():
+        return big_response
+
+    assert get() == big_response
+
+    stored = fake_redis["foo"]
+    assert isinstance(stored, bytes) is expected_compressed
+    if expected_compressed:
+        assert stored.startswith(b"zlib:")
+        assert len(stored) < len(json.dumps(big_response))
+    assert get() == big_response
+
+
+def test_compressed_values_are_read_whatever_the_threshold(fake_redis, cache):
+    fake_redis["foo"] = b"zlib:" + zlib.compress(b'{"a": "b"}')
+
+    @cache.set("foo")
+    def get():
+        raise AssertionError
+
+    assert cache.compression_threshold is None
+    assert get() == {"a": "b"}
+
+
+def test_local_cache_holds_decompressed_values(
+    mocker, mocked_redis_client, cache_with_local_cache
+):
+    mock_redis_get = mocker.patch.object(
+        mocked_redis_client,
+        "get",
+        return_value=b"zlib:" + zlib.compress(b'{"a": "b"}'),
+    )
+
+    assert cache_with_local_cache.get("foo") == b'{"a": "b"}'
+    assert cache_with_local_cache.get("foo") == b'{"a": "b"}'
+    mock_redis_get.assert_called_once_with("foo")
@@ -0,0 +1,81 @@
+import json
+import math
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+from flask import Flask, jsonify
+
+from notifications_utils import json_codec
+from notifications_utils.json_codec import CodecJSONProvider
+
+PAYLOADS = [
+    {"data": [{"id": "1", "name": "Template ✉️", "version": 3, "archived": False}]},
+    [{"domains": ["x", "y", "z"]}, None, 1.5],
+    {1: "integer keys", "nested": {"list": [1, 2, 3]}},
+    {"big": 2**70},
+    "just a string",
+]
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_round_trip_matches_standard_library(payload):
+    encoded = json_codec.dumps(payload)
+
+    assert json.loads(encoded) == json.loads(json.dumps(payload))
+    assert json_codec.loads(encoded) == json.loads(json.dumps(payload))
+    assert json_codec.loads(encoded.encode("utf-8")) == json.loads(json.dumps(payload))
+
+
+def test_dumps_is_compact_and_keeps_non_ascii_characters():
+    assert json_codec.dumps({"a": [1, 2], "b": "✉️"}) == '{"a":[1,2],"b":"✉️"}'
+
+
+def test_dumps_sorts_keys():
+    assert json_codec.dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
+
+
+def test_dumps_passes_unknown_types_to_default():
+    def default(obj):
+        if isinstance(obj, (set, datetime)):
+            return "converted"
+        raise TypeError
+
+    assert json.loads(
+        json_codec.dumps({"set": {1}, "date": datetime(2020, 1, 1)}, default=default)
+    ) == {"set": "converted", "date": "converted"}
+
+
+def test_dumps_raises_type_error_for_unknown_types():
+    with pytest.raises(TypeError):
+        json_codec.dumps({"set": {1}})
+
+
+def test_loads_accepts_nan_like_standard_library():
+    assert math.isnan(json_codec.loads('{"a": NaN}')["a"])
+
+
+@pytest.mark.parametrize("invalid", ["", "{", b"\xff"])
+def test_loads_raises_value_error_for_invalid_json(invalid):
+    with pytest.raises(ValueError):  # noqa PT011
+        json_codec.loads(invalid)
+
+
+def test_codec_json_provider_matches_flask_default():
+    data = {
+        "b": datetime(2020, 1, 1, 12, 30),
+        "a": UUID(int=1),
+        "c": [1, "two"],
+    }
+    default_app = Flask(__name__)
+    codec_app = Flask(__name__)
+    codec_app.json = CodecJSONProvider(codec_app)
+
+    with default_app.app_context():
+        default_response = jsonify(data)
+    with codec_app.app_context():
+        codec_response = jsonify(data)
+
+    assert codec_response.json == default_response.json
+    assert codec_response.mimetype == "application/json"
+    assert codec_app.json.loads(codec_response.data) == default_response.json
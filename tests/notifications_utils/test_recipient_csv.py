@@ -2,6 +2,7 @@ import itertools
 import string
 import unicodedata
 from functools import partial
+from io import StringIO
 from random import choice, randrange
 from unittest.mock import Mock
 
@@ -14,7 +15,9 @@ from notifications_utils.formatters import strip_and_remove_obscure_whitespace
 from notifications_utils.recipients import (
     Cell,
     RecipientCSV,
+    RecipientCSVSummary,
     Row,
+    _iter_lines,
     first_column_headings,
 )
 from notifications_utils.template import (
@@ -340,6 +343,163 @@ def test_get_rows_with_errors():
     assert recipients.has_errors
 
 
+def test_summary_reads_the_file_once(mocker):
+    recipients = RecipientCSV(
+        "phone number,name\n"
+        + "2348675309,example\n" * 30
+        + "12345,example\n" * 20
+        + "2348675309,\n" * 10,
+        template=_sample_template("sms", "hello ((name))"),
+        max_initial_rows_shown=5,
+        max_errors_shown=4,
+        guestlist=["2348675309"],
+    )
+    get_rows = mocker.spy(recipients, "get_rows")
+
+    assert len(recipients) == 60
+    assert recipients.has_errors
+    assert not recipients.allowed_to_send_to
+    assert _index_rows(recipients.initial_rows) == {0, 1, 2, 3, 4}
+    assert _index_rows(recipients.initial_rows_with_errors) == {30, 31, 32, 33}
+    assert _index_rows(recipients.displayed_rows) == {30, 31, 32, 33}
+    assert recipients.summary.counts == {
+        "has_error": 30,
+        "has_bad_recipient": 20,
+        "has_missing_data": 10,
+    }
+    assert recipients.summary.column_error_counts == {
+        "phonenumber": 20,
+        "name": 10,
+    }
+    assert recipients.summary.errors_in_column("Phone Number") == 20
+    assert recipients.summary.errors_in_column("colour") == 0
+
+    assert get_rows.call_count == 1
+    assert recipients.rows_as_list is None
+
+
+@pytest.mark.parametrize(
+    ("template_type", "file_contents"),
+    [
+        (
+            "sms",
+            "phone number,name\n2348675309,Jo\n12345,Jo\n2348675309,\n12345,\n,\n",
+        ),
+        (
+            "email",
+            "email address,name\ntest@example.com,Jo\nnope,\n,Sam\n",
+        ),
+        (
+            "letter",
+            "address line 1,address line 2,postcode,name\n"
+            "A. Name,123 Street,SW1A 1AA,Jo\n"
+            "A. Name,,SW1A 1AA,\n"
+            ",,,Sam\n",
+        ),
+    ],
+)
+def test_summary_row_flags_match_the_row(template_type, file_contents):
+    recipients = RecipientCSV(
+        file_contents,
+        template=_sample_template(template_type, "hello ((name))"),
+    )
+
+    for row in recipients:
+        assert RecipientCSVSummary.get_row_flags(row, row.cell_errors) == {
+            flag for flag in RecipientCSVSummary.row_flags if getattr(row, flag)
+        }
+
+
+def test_rows_are_the_same_as_the_rows_from_the_file():
+    recipients = RecipientCSV(
+        """
+            phone number,name,name,colour
+            2348675309,Jo,Jo Bloggs
+            12345,,,blue,extra,columns
+            2348675309,Sam,Sam Smith,green
+        """,
+        template=_sample_template("sms", "hello ((name)) ((colour))"),
+    )
+
+    rows = recipients.rows
+
+    assert len(rows) == 3
+    assert list(rows) == list(recipients.get_rows())
+    assert [(row.index, row.has_error) for row in rows] == [
+        (0, True),
+        (1, True),
+        (2, False),
+    ]
+    assert rows[1][None].data == ["extra", "columns"]
+    assert rows[-1]["name"].data == ["Sam", "Sam Smith"]
+    with pytest.raises(IndexError):
+        rows[3]
+
+
+def test_rows_with_errors_are_found_without_validating_again(mocker):
+    recipients = RecipientCSV(
+        "phone number\n2348675309\n12345\n2348675309\n",
+        template=_sample_template("sms"),
+    )
+    recipients.rows
+    make_row = mocker.spy(recipients, "_make_row")
+
+    assert _index_rows(recipients.rows_with_bad_recipients) == {1}
+    assert make_row.call_count == 1
+
+
+def test_summary_reports_progress(mocker):
+    on_progress = mocker.Mock()
+    mocker.patch(
+        "notifications_utils.recipients.RecipientCSVSummary.progress_interval", 2
+    )
+    recipients = RecipientCSV(
+        "phone number\n" + "2348675309\n" * 5,
+        template=_sample_template("sms"),
+        on_progress=on_progress,
+    )
+
+    assert len(recipients) == 5
+    assert on_progress.call_args_list == [mocker.call(2), mocker.call(4)]
+
+
+def test_summary_is_worked_out_again_if_the_guestlist_changes():
+    recipients = RecipientCSV(
+        "phone number\n2348675309\n",
+        template=_sample_template("sms"),
+        guestlist=["2348675309"],
+    )
+    assert recipients.allowed_to_send_to
+
+    recipients.guestlist = ["2348675300"]
+    assert not recipients.allowed_to_send_to
+
+
+def test_getting_rows_by_index_reads_the_file_once(mocker):
+    recipients = RecipientCSV(
+        "phone number\n" + "".join(f"23486753{i:02}\n" for i in range(50)),
+        template=_sample_template("sms"),
+    )
+    assert [row.index for row in recipients] == list(range(50))
+    assert recipients.rows_as_list is None
+
+    make_row = mocker.spy(recipients, "_make_row")
+    iter_lines = mocker.patch(
+        "notifications_utils.recipients._iter_lines", side_effect=_iter_lines
+    )
+
+    assert [recipients[index].recipient for index in range(50)] == [
+        f"23486753{i:02}" for i in range(50)
+    ]
+    assert recipients[-1].recipient == "2348675349"
+    with pytest.raises(IndexError):
+        recipients[50]
+
+    assert iter_lines.call_count == 2  # once for the header, once for the rows
+    # once for each row when they're read, and again for each lookup
+    assert make_row.call_count == 50 + 51
+
+
 @pytest.mark.parametrize(
     ("template_type", "row_count", "header", "filler", "row_with_error"),
     [
@@ -894,6 +1054,22 @@ def test_recipient_guestlist(
     assert recipients.allowed_to_send_to
 
 
+def test_recipient_guestlist_formats_each_recipient_once(mocker):
+    format_recipient = mocker.patch(
+        "notifications_utils.recipients.format_recipient",
+        side_effect=lambda recipient: recipient.replace(" ", ""),
+    )
+    recipients = RecipientCSV(
+        "phone number\n" + "234 867 5309\n2348675300\n" * 50,
+        template=_sample_template("sms"),
+        guestlist=["2348675309", "2348675300", "test@example.com"],
+    )
+    assert format_recipient.call_count == 3
+
+    assert recipients.allowed_to_send_to
+    assert format_recipient.call_count == 3 + 2
+
+
 def test_detects_rows_which_result_in_overly_long_messages():
     template = SMSMessageTemplate(
         {"content": "((placeholder))", "template_type": "sms"},
@@ -1363,3 +1539,38 @@ def test_recipient_csv_checks_should_validate_flag(should_validate):
 
     assert template.is_message_empty.called is should_validate
     assert recipients._get_error_for_field.called is should_validate
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "",
+        "a",
+        "a\n",
+        "a\r\nb\r\n",
+        "a\nb\rc\r\n\nd",
+        '"a\r\nb",c\nd',
+    ],
+)
+def test_iter_lines_matches_string_io(data):
+    assert list(_iter_lines(data)) == list(StringIO(data))
+
+
+@pytest.mark.parametrize(
+    "file_contents",
+    [
+        "",
+        "phone number,name\r\n2348675309,Jo\r\n12345,Sam",
+        "\ufeff phone number,name\n2348675309,Jo\n\u2028,,\n\xa0",
+        'phone number,name\n2348675309,"Jo\nBloggs"\n2348675309,Sam',
+    ],
+)
+def test_rows_from_encoded_file_data_are_the_same(file_contents):
+    template = _sample_template("sms", "hello ((name))")
+
+    from_bytes = RecipientCSV(file_contents.encode("utf-8"), template=template)
+    from_string = RecipientCSV(file_contents, template=template)
+
+    assert from_bytes.column_headers == from_string.column_headers
+    assert list(from_bytes.rows) == list(from_string.rows)
+    assert from_bytes.has_errors == from_string.has_errors
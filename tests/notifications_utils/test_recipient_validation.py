@@ -1,14 +1,17 @@
+import phonenumbers
 import pytest
 
 from notifications_utils.recipients import (
     InvalidEmailError,
     InvalidPhoneError,
     allowed_to_send_to,
+    check_phone_number,
     format_phone_number_human_readable,
     format_recipient,
     get_international_phone_info,
     international_phone_info,
     is_us_phone_number,
+    phone_number_check,
     try_validate_and_format_phone_number,
     validate_and_format_phone_number,
     validate_email_address,
@@ -252,6 +255,45 @@ def test_get_international_info_raises(phone_number):
     assert str(error.value) == "Not a valid country prefix"
 
 
+@pytest.mark.parametrize(
+    ("phone_number", "international", "expected_check"),
+    [
+        ("(202) 555-0104", False, ("+12025550104", "1", False, None)),
+        ("+447123456789", True, ("+447123456789", "44", True, None)),
+        ("+1 876 555 0104", True, ("+18765550104", "1876", True, None)),
+        ("+447123456789", False, (None, "44", False, "Not a US number")),
+        ("+21 4321 0987", True, (None, None, True, "Not a valid country prefix")),
+        ("202555010", False, (None, "1", False, "Not enough digits")),
+    ],
+)
+def test_check_phone_number(phone_number, international, expected_check):
+    assert check_phone_number(phone_number, international) == phone_number_check(
+        *expected_check
+    )
+
+
+def test_check_phone_number_parses_each_number_once(mocker):
+    check_phone_number.cache_clear()
+    parse = mocker.patch(
+        "notifications_utils.recipients.phonenumbers.parse",
+        wraps=phonenumbers.parse,
+    )
+
+    for _ in range(3):
+        validate_phone_number("202-555-0199")
+        format_phone_number_human_readable("202-555-0199")
+
+    # checked once with and once without international numbers allowed, then
+    # the normalised number is parsed again to format it for humans
+    assert [call.args for call in parse.call_args_list] == [
+        ("202-555-0199", "US"),
+        ("202-555-0199", "US"),
+        ("+12025550199", None),
+        ("+12025550199", None),
+        ("+12025550199", None),
+    ]
+
+
 @pytest.mark.parametrize("phone_number", valid_us_phone_numbers)
 @pytest.mark.parametrize(
     "extra_args",
@@ -1,10 +1,18 @@
+from unittest.mock import Mock
 from urllib.parse import parse_qs
 
 import botocore
 import pytest
+from botocore.config import Config
 from moto import mock_aws
 
-from notifications_utils.s3 import S3ObjectNotFound, s3download, s3upload
+from notifications_utils.s3 import (
+    AWS_CLIENT_CONFIG,
+    S3ObjectNotFound,
+    S3Resources,
+    s3download,
+    s3upload,
+)
 
 contents = "some file data"
 region = "eu-west-1"
@@ -108,3 +116,57 @@ def test_s3download_raises_on_error(mocker):
 
     with pytest.raises(S3ObjectNotFound):
         s3download("bucket", "location.file")
+
+
+def test_s3_resources_are_reused_for_the_same_credentials_and_config(mocker):
+    mock_session = mocker.patch("notifications_utils.s3.Session")
+    mock_session.return_value.resource.side_effect = lambda *args, **kwargs: object()
+    resources = S3Resources()
+
+    first = resources.get("key", "secret", region)
+    assert resources.get("key", "secret", region) is first
+    assert resources.get("other key", "secret", region) is not first
+    assert resources.get("key", "secret", "us-east-1") is not first
+    assert resources.get("key", "secret", region, config=Config()) is not first
+    assert mock_session.call_count == 4
+
+
+def test_s3_resources_are_made_again_after_forking(mocker):
+    mock_session = mocker.patch("notifications_utils.s3.Session")
+    mock_session.return_value.resource.side_effect = lambda *args, **kwargs: object()
+    resources = S3Resources()
+    first = resources.get("key", "secret", region)
+
+    mocker.patch("notifications_utils.s3.os.getpid", return_value=-1)
+
+    assert resources.get("key", "secret", region) is not first
+    assert resources.get("key", "secret", region) is resources.get(
+        "key", "secret", region
+    )
+
+
+@pytest.mark.parametrize(
+    ("max_pool_connections", "config", "expected_max_pool_connections"),
+    [
+        (None, None, None),
+        (None, AWS_CLIENT_CONFIG, 10),
+        (25, None, 25),
+        (25, AWS_CLIENT_CONFIG, 25),
+    ],
+)
+def test_s3_resources_pool_size(
+    mocker, max_pool_connections, config, expected_max_pool_connections
+):
+    mock_session = mocker.patch("notifications_utils.s3.Session")
+    resources = S3Resources()
+    resources.init_app(Mock(config={"S3_MAX_POOL_CONNECTIONS": max_pool_connections}))
+
+    resources.get("key", "secret", region, config=config)
+
+    used_config = mock_session.return_value.resource.call_args.kwargs["config"]
+    if expected_max_pool_connections is None:
+        assert used_config is None
+    else:
+        assert used_config.max_pool_connections == expected_max_pool_connections
+    if config:
+        assert used_config.use_fips_endpoint is True